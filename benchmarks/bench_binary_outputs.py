@@ -0,0 +1,70 @@
+"""
+Array outputs: returned array as JSON text through the token comparator vs memory-mapped binary.
+Usage: python benchmarks/bench_binary_outputs.py [--n N] [--rtol R]
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from fort2py.compare import ArraySpec, Tolerance, compare_arrays, compare_outputs, open_array
+
+
+def measure(fn):
+    # Time without tracing (tracemalloc slows allocation-heavy code), then peak memory with it
+    t0 = time.perf_counter()
+    res = fn()
+    t = time.perf_counter() - t0
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return res, t, peak
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--n", type=int, default=2048, help="the arrays are n x n float64")
+    ap.add_argument("--rtol", type=float, default=1e-9)
+    args = ap.parse_args(argv)
+    rng = np.random.default_rng(0)
+    x = np.asfortranarray(rng.standard_normal((args.n, args.n)))
+    y = x * (1 + 1e-12 * rng.standard_normal(x.shape))
+    tol = Tolerance(rtol=args.rtol)
+    spec = ArraySpec("fort.bin", shape=x.shape)
+    with tempfile.TemporaryDirectory() as td:
+        fort, py = Path(td) / "fort.bin", Path(td) / "py.bin"
+        x.T.tofile(fort)
+        y.T.tofile(py)
+        mib = fort.stat().st_size / 2**20
+
+        def text():
+            # What verify did before: the Fortran side printed, the Python array via tolist()
+            ref = " ".join(map(repr, x.ravel(order="F").tolist()))
+            got = json.dumps(y.ravel(order="F").tolist()).strip("[]").replace(",", " ")
+            return compare_outputs(ref, got, tol)
+
+        def against(other):
+            return compare_arrays(open_array(fort, spec), other, tol, spec.shape)
+
+        d_txt, t_txt, m_txt = measure(text)
+        d_ret, t_ret, m_ret = measure(lambda: against(y.ravel(order="F")))
+        d_map, t_map, m_map = measure(lambda: against(open_array(py, spec)))
+    print(f"{'method':18s} {'MB/s':>8s} {'peak MiB':>9s}  result")
+    for name, d, t, m in (
+        ("text (tolist)", d_txt, t_txt, m_txt),
+        ("returned array", d_ret, t_ret, m_ret),
+        ("memmap both", d_map, t_map, m_map),
+    ):
+        print(f"{name:18s} {mib / t:8.1f} {m / 2**20:9.1f}  {'match' if d is None else d}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+OUT/INOUT scalar call overhead: Ref(...) arguments vs the tuple convention (`convert --fast`).
+Usage: python benchmarks/bench_calls.py [--calls N] [--repeat R]
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+from fort2py.codegen_python import generate_module
+from fort2py.fortran_parser import parse_sources
+from fort2py.semantics import Semantics
+from fort2py.types import Ref
+
+
+KERNELS = """module steps
+contains
+subroutine step(dt, x, t, e)
+  real(kind=8), intent(in) :: dt
+  real(kind=8), intent(in) :: x(4)
+  real(kind=8), intent(inout) :: t
+  real(kind=8), intent(out) :: e
+  t = t + dt
+  e = x(1)*t
+end subroutine step
+subroutine drive(n, x, t)
+  integer, intent(in) :: n
+  real(kind=8), intent(in) :: x(4)
+  real(kind=8), intent(inout) :: t
+  real(kind=8) :: e
+  integer :: i
+  do i = 1, n
+    call step(1.0d-3, x, t, e)
+  end do
+end subroutine drive
+end module steps
+"""
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--calls", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+    n = args.calls
+    with tempfile.TemporaryDirectory() as td:
+        src = Path(td) / "steps.f90"
+        src.write_text(KERNELS, encoding="utf-8")
+        ir = parse_sources([src])
+        Semantics(ir).analyze()
+        mod = ir.modules["steps"]
+        ref: dict = {}
+        fast: dict = {}
+        exec(generate_module(mod), ref)
+        exec(generate_module(mod, convention="tuple", checks=False), fast)
+    x = np.ones(4)
+
+    def py_loop_ref():
+        t, e = Ref(0.0), Ref(0.0)
+        for _ in range(n):
+            ref["step"](1e-3, x, t, e)
+        return t.v
+
+    def py_loop_fast():
+        t = 0.0
+        for _ in range(n):
+            t, e = fast["step"](1e-3, x, t)
+        return t
+
+    def drive_ref():
+        t = Ref(0.0)
+        ref["drive"](n, x, t)
+        return t.v
+
+    def drive_fast():
+        return fast["drive"](n, x, 0.0)
+
+    assert py_loop_ref() == py_loop_fast() and drive_ref() == drive_fast()
+    print(f"{'caller':22s} {'ref ns/call':>12s} {'fast ns/call':>13s} {'speedup':>8s}")
+    callers = (
+        ("Python loop -> step", py_loop_ref, py_loop_fast),
+        ("drive -> CALL step", drive_ref, drive_fast),
+    )
+    for label, slow, quick in callers:
+        t_ref = min(timeit.repeat(slow, number=1, repeat=args.repeat)) / n * 1e9
+        t_fast = min(timeit.repeat(quick, number=1, repeat=args.repeat)) / n * 1e9
+        print(f"{label:22s} {t_ref:12.0f} {t_fast:13.0f} {t_ref / t_fast:7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Output comparison: whole-output string equality vs the streaming fort2py.compare comparator.
+Usage: python benchmarks/bench_compare.py [--mb M] [--chunk-kb K] [--rtol R]
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from fort2py.compare import Tolerance, compare_outputs
+
+
+def write_outputs(d: Path, mb: int):
+    # Fortran-style (E format, fixed width) vs Python repr of slightly perturbed values
+    fort, py = d / "fort.out", d / "py.out"
+    rng = np.random.default_rng(0)
+    with open(fort, "w") as f, open(py, "w") as g:
+        while f.tell() < mb << 20:
+            x = rng.standard_normal((4096, 4))
+            y = x * (1 + 1e-12 * rng.standard_normal(x.shape))
+            f.write("".join(" ".join(f"{v:24.16E}" for v in row) + "\n" for row in x))
+            g.write("".join(" ".join(repr(float(v)) for v in row) + "\n" for row in y))
+    return fort, py
+
+
+def measure(fn):
+    # Time without tracing (tracemalloc slows allocation-heavy code), then peak memory with it
+    t0 = time.perf_counter()
+    res = fn()
+    t = time.perf_counter() - t0
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return res, t, peak
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--mb", type=int, default=64, help="size of the Fortran output")
+    ap.add_argument("--chunk-kb", type=int, default=1024)
+    ap.add_argument("--rtol", type=float, default=1e-9)
+    args = ap.parse_args(argv)
+    with tempfile.TemporaryDirectory() as td:
+        fort, py = write_outputs(Path(td), args.mb)
+        size = fort.stat().st_size / 2**20
+        eq, t_str, m_str = measure(lambda: fort.read_text() == py.read_text())
+        tol = Tolerance(rtol=args.rtol)
+        chunk = args.chunk_kb << 10
+        diff, t_cmp, m_cmp = measure(lambda: compare_outputs(fort, py, tol, chunk_size=chunk))
+    print(f"{'method':12s} {'MB/s':>8s} {'peak MiB':>9s}  result")
+    rows = [("str ==", t_str, m_str, "equal" if eq else "different"),
+            ("streaming", t_cmp, m_cmp, "match" if diff is None else diff)]
+    for name, t, m, result in rows:
+        print(f"{name:12s} {size / t:8.1f} {m / 2**20:9.1f}  {result}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+ELEMENTAL function benchmark: per-element ufunc (np.frompyfunc) vs whole-array kernel.
+Usage: python benchmarks/bench_elemental.py [--n N] [--repeat R]
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import timeit
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from fort2py.codegen_python import generate_module
+from fort2py.fortran_parser import parse_sources
+from fort2py.semantics import Semantics
+from fort2py.ufuncs import elemental_ufunc
+
+
+KERNELS = """module el
+contains
+elemental function softplus(x)
+  real(kind=8), intent(in) :: x
+  real(kind=8) :: softplus
+  if (x > 20.0d0) then
+    softplus = x
+  else
+    softplus = log(1.0d0 + exp(x))
+  end if
+end function softplus
+elemental function poly(x, a)
+  real(kind=8), intent(in) :: x, a
+  real(kind=8) :: poly
+  poly = a + x*(1.0d0 + x*(0.5d0 + x/6.0d0))
+end function poly
+end module el
+"""
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--n", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+    with tempfile.TemporaryDirectory() as td:
+        src = Path(td) / "el.f90"
+        src.write_text(KERNELS, encoding="utf-8")
+        ir = parse_sources([src])
+        Semantics(ir).analyze()
+        ns: dict = {}
+        exec(generate_module(ir.modules["el"]), ns)
+
+    x = np.random.default_rng(0).normal(scale=10.0, size=args.n)
+    out = np.empty_like(x)
+    print(f"{'function':10s} {'per-elem ms':>12s} {'kernel ms':>10s} {'speedup':>8s}")
+    for name, call_args in (("softplus", (x,)), ("poly", (x, 2.0))):
+        fast = ns[name]
+        slow = elemental_ufunc(np.float64, nin=len(call_args))(fast.kernel)
+        assert np.allclose(slow(*call_args), fast(*call_args))
+        t_slow, t_fast = (
+            min(timeit.repeat(partial(f, *call_args, out=out), number=1, repeat=args.repeat))
+            for f in (slow, fast)
+        )
+        print(f"{name:10s} {t_slow * 1e3:12.1f} {t_fast * 1e3:10.2f} {t_slow / t_fast:7.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Reference Fortran builds: one monolithic gfortran call vs per-file USE-ordered cached builds.
+Usage: python benchmarks/bench_fortran_build.py [--modules M] [--routines R] [--jobs J]
+"""
+from __future__ import annotations
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fort2py.fortran_runner import BASE_FLAGS, FortranBuild, find_sources
+
+
+ROUTINE = """  subroutine m{i}_step{k}(x, y)
+    real(kind=8), intent(in) :: x(:)
+    real(kind=8), intent(inout) :: y(:)
+    integer :: i
+    do i = 2, size(x) - 1
+      y(i) = y(i) + {c}d0*(x(i-1) - 2.0d0*x(i) + x(i+1))
+    end do
+  end subroutine m{i}_step{k}
+"""
+
+
+def write_project(root: Path, modules: int, routines: int):
+    # A layered project: module m<i> uses m<i//2>, so there is parallelism at every level
+    for i in range(modules):
+        use = f"  use m{i // 2}\n" if i else ""
+        body = "".join(ROUTINE.format(i=i, k=k, c=(i + k) % 7 + 1) for k in range(routines))
+        text = f"module m{i}\n{use}  implicit none\ncontains\n{body}end module m{i}\n"
+        (root / f"m{i}.f90").write_text(text)
+    uses = "".join(f"  use m{i}\n" for i in range(modules))
+    main = f"program main\n{uses}  implicit none\n  print *, 'ok'\nend program main\n"
+    (root / "main.f90").write_text(main)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--modules", type=int, default=24)
+    ap.add_argument("--routines", type=int, default=20)
+    ap.add_argument("--jobs", type=int, default=None)
+    args = ap.parse_args(argv)
+    if shutil.which("gfortran") is None:
+        print("gfortran not found", file=sys.stderr)
+        return 1
+    with tempfile.TemporaryDirectory() as td:
+        root = Path(td)
+        src = root / "src"
+        src.mkdir()
+        write_project(src, args.modules, args.routines)
+        sources = find_sources(src)
+
+        # Before: every source in one invocation (in dependency order, which it needed anyway)
+        order = [src / f"m{i}.f90" for i in range(args.modules)] + [src / "main.f90"]
+        (root / "mono").mkdir()
+        t0 = time.perf_counter()
+        cmd = ["gfortran", *BASE_FLAGS, "-o", str(root / "mono" / "prog"), *map(str, order)]
+        subprocess.run(cmd, cwd=root / "mono", check=True)
+        t_mono = time.perf_counter() - t0
+
+        exe = root / "bin" / "prog"
+        cache = root / "cache"
+        rows = [("monolithic", t_mono, "")]
+
+        def build(sources, exe, build_dir):
+            return FortranBuild(sources, exe, build_dir, cache_dir=cache).build(jobs=args.jobs)
+
+        cold = build(sources, exe, root / "b1")
+        rows.append(("per-file cold", cold.seconds, f"{len(cold.compiled)} compiled"))
+        noop = build(sources, exe, root / "b1")
+        rows.append(("unchanged", noop.seconds, "no relink" if not noop.linked else "relinked"))
+        warm = build(sources, root / "bin" / "prog2", root / "b2")
+        rows.append(("warm cache", warm.seconds, f"{len(warm.cached)} from cache"))
+        leaf = src / f"m{args.modules - 1}.f90"
+        leaf.write_text(leaf.read_text() + "! edited\n")
+        edit = build(find_sources(src), exe, root / "b1")
+        rows.append(("one file edited", edit.seconds, f"{len(edit.compiled)} compiled"))
+    print(f"{'build':16s} {'s':>7s}  notes")
+    for label, t, note in rows:
+        print(f"{label:16s} {t:7.2f}  {note}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
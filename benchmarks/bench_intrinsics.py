@@ -0,0 +1,135 @@
+"""
+Intrinsics: per-call overhead on scalars/small inputs and array throughput, for every intrinsic.
+Usage: python benchmarks/bench_intrinsics.py [--n N] [--json out.json]
+       [--baseline old.json --max-ratio 1.5]
+"""
+from __future__ import annotations
+import argparse
+import inspect
+import json
+import sys
+import timeit
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from fort2py import intrinsics
+
+
+def cases(n: int) -> Dict[str, Tuple[Callable, Optional[Callable]]]:
+    # intrinsic -> (scalar/small call, array call or None for inquiry functions)
+    rng = np.random.default_rng(0)
+    x = rng.normal(scale=10.0, size=n)
+    y = rng.normal(size=n)
+    mask = x > 0
+    m = int(n**0.5) or 1
+    a = np.asfortranarray(rng.random((m, m)))
+    small = np.zeros((3, 4), order="F")
+    buf = np.empty(n)
+    ibuf = np.empty(n, dtype=np.int64)
+    mbuf = np.empty((m, m), order="F")
+    return {
+        "present": (lambda: intrinsics.present(1.0), None),
+        "allocated": (lambda: intrinsics.allocated(small), None),
+        "associated": (lambda: intrinsics.associated(small), None),
+        "lbound": (lambda: intrinsics.lbound(small), None),
+        "ubound": (lambda: intrinsics.ubound(small, 2), None),
+        "size": (lambda: intrinsics.size(small, 1), None),
+        "shape": (lambda: intrinsics.shape(small), None),
+        "nint": (lambda: intrinsics.nint(2.5), lambda: intrinsics.nint(x, out=ibuf)),
+        "sign": (lambda: intrinsics.sign(3.0, -1.0), lambda: intrinsics.sign(x, y, out=buf)),
+        "modulo": (lambda: intrinsics.modulo(-7, 3), lambda: intrinsics.modulo(x, 3.0, out=buf)),
+        "merge": (
+            lambda: intrinsics.merge(1.0, 2.0, True),
+            lambda: intrinsics.merge(x, y, mask, out=buf),
+        ),
+        "dot_product": (
+            lambda: intrinsics.dot_product(small[0], small[0]),
+            lambda: intrinsics.dot_product(x, y),
+        ),
+        "matmul": (
+            lambda: intrinsics.matmul(small.T, small),
+            lambda: intrinsics.matmul(a, a, out=mbuf),
+        ),
+        "transpose": (
+            lambda: intrinsics.transpose(small),
+            lambda: intrinsics.transpose(a, out=mbuf),
+        ),
+        "random_seed": (lambda: intrinsics.random_seed(1), None),
+        "random_number": (
+            lambda: intrinsics.random_number(small),
+            lambda: intrinsics.random_number(buf),
+        ),
+    }
+
+
+def public_intrinsics():
+    return sorted(
+        name for name, obj in vars(intrinsics).items()
+        if inspect.isfunction(obj)
+        and obj.__module__ == intrinsics.__name__
+        and not name.startswith("_")
+    )
+
+
+def best(fn: Callable, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--n", type=int, default=1_000_000, help="Elements for array throughput")
+    ap.add_argument("--calls", type=int, default=20_000, help="Calls per timing of the scalar path")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--json", type=str, default=None, help="Write results here")
+    ap.add_argument(
+        "--baseline", type=str, default=None, help="Earlier --json output to compare against"
+    )
+    ap.add_argument(
+        "--max-ratio",
+        type=float,
+        default=1.5,
+        help="Fail if any timing exceeds baseline by this factor",
+    )
+    args = ap.parse_args(argv)
+
+    table = cases(args.n)
+    missing = sorted(set(public_intrinsics()) - set(table))
+    if missing:
+        print(f"No benchmark case for: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'intrinsic':14s} {'ns/call':>9s} {'array ms':>10s} {'Melem/s':>9s}")
+    for name in sorted(table):
+        scalar, array = table[name]
+        row = {"ns_per_call": best(scalar, args.calls, args.repeat) * 1e9}
+        line = f"{name:14s} {row['ns_per_call']:9.0f}"
+        if array is not None:
+            t = best(array, 1, args.repeat)
+            row["array_ms"] = t * 1e3
+            line += f" {t * 1e3:10.2f} {args.n / t / 1e6:9.0f}"
+        results[name] = row
+        print(line)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            data = {"n": args.n, "numpy": np.__version__, "results": results}
+            json.dump(data, f, indent=1, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            base = json.load(f)["results"]
+        slower = [
+            f"{name}.{metric}: {old:.3g} -> {row[metric]:.3g}"
+            for name, row in results.items()
+            for metric, old in base.get(name, {}).items()
+            if metric in row and row[metric] > old * args.max_ratio
+        ]
+        for s in slower:
+            print(f"REGRESSION {s}")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+IR memory benchmark: retained bytes per source line, list bodies vs compact IR.
+Usage: python benchmarks/bench_ir_memory.py [--lines N]
+"""
+from __future__ import annotations
+import argparse
+import gc
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from fort2py.fortran_parser import parse_sources
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_parser import make_source  # noqa: E402
+
+
+def retained_bytes(src: Path, compact: bool) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    ir = parse_sources([src], compact=compact)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del ir
+    return after - before
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--lines", type=int, default=200_000)
+    ap.add_argument("--body-lines", type=int, default=20, help="Executable lines per routine")
+    args = ap.parse_args(argv)
+    with tempfile.TemporaryDirectory() as td:
+        src = Path(td) / "bench.f90"
+        src.write_text(make_source(args.lines, args.body_lines), encoding="utf-8")
+        n = src.read_text(encoding="utf-8").count("\n")
+        for label, compact in (("list bodies", False), ("compact IR", True)):
+            b = retained_bytes(src, compact)
+            print(
+                f"{label:12s}: {b / 1e6:8.1f} MB retained,",
+                f"{b / n:6.1f} bytes/source line ({n} lines)",
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
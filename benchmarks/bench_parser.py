@@ -0,0 +1,66 @@
+"""
+Parser throughput micro-benchmark.
+Usage: python benchmarks/bench_parser.py [--lines N] [--repeat R] [--min-lps X]
+Exits non-zero when the best run falls below --min-lps lines/second.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fort2py.fortran_parser import parse_file
+from fort2py.ir import ProjectIR
+
+
+ROUTINE_TPL = """  subroutine kern{i}(n, alpha, x, y)
+    ! scaled update
+    integer(kind=4), intent(in) :: n
+    real(kind=8), intent(in) :: alpha
+    real(kind=8), intent(in) :: x(100)
+    real(kind=8), intent(inout) :: y(100)
+    integer :: j
+    do j=1,n
+{body}    end do
+  end subroutine kern{i}
+"""
+BODY_LINE = "      y(j) = y(j) + alpha*x(j)\n"
+
+
+def make_source(n_lines: int, body_lines: int = 1) -> str:
+    parts = ["module bench", "  use base, only: a, b", "  implicit none", "contains"]
+    routine = ROUTINE_TPL.replace("{body}", BODY_LINE * body_lines)
+    per = routine.count("\n")
+    for i in range(max(1, n_lines // per)):
+        parts.append(routine.format(i=i))
+    parts.append("end module bench\n")
+    return "\n".join(parts)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--lines", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--min-lps", type=float, default=0.0, help="Fail below this lines/second")
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as td:
+        src = Path(td) / "bench.f90"
+        src.write_text(make_source(args.lines), encoding="utf-8")
+        n = src.read_text(encoding="utf-8").count("\n")
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            parse_file(src, ProjectIR(sources=[src]))
+            best = min(best, time.perf_counter() - t0)
+    lps = n / best
+    print(f"parse_file: {n} lines, best {best * 1e3:.1f} ms, {lps:,.0f} lines/s")
+    if args.min_lps and lps < args.min_lps:
+        print(f"FAIL: below target {args.min_lps:,.0f} lines/s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Thread scopes: a matmul-heavy translated kernel, threads.deterministic() vs thread_limit().
+Usage: python benchmarks/bench_threads.py [--n N] [--iters K] [--threads T] [--repeat R]
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import timeit
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from fort2py import threads
+from fort2py.codegen_python import generate_module
+from fort2py.fortran_parser import parse_sources
+from fort2py.semantics import Semantics
+
+
+KERNELS = """module power
+contains
+subroutine iterate(a, x, k)
+  real(kind=8), intent(in) :: a({n}, {n})
+  real(kind=8), intent(inout) :: x({n}, {n})
+  integer, intent(in) :: k
+  real(kind=8) :: y({n}, {n})
+  integer :: it
+  do it = 1, k
+    y = matmul(a, x)
+    x = y / {n}.0d0
+  end do
+end subroutine iterate
+end module power
+"""
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--n", type=int, default=512)
+    ap.add_argument("--iters", type=int, default=10)
+    ap.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="thread_limit() count (default: FORT2PY_NUM_THREADS or CPU count)",
+    )
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+    with tempfile.TemporaryDirectory() as td:
+        src = Path(td) / "power.f90"
+        src.write_text(KERNELS.format(n=args.n), encoding="utf-8")
+        ir = parse_sources([src])
+        Semantics(ir).analyze()
+        ns: dict = {}
+        exec(generate_module(ir.modules["power"]), ns)
+    rng = np.random.default_rng(0)
+    a = np.asfortranarray(rng.random((args.n, args.n)))
+    x0 = np.asfortranarray(rng.random((args.n, args.n)))
+    flops = 2.0 * args.n**3 * args.iters
+
+    print(f"{'scope':22s} {'threads':>7s} {'ms':>9s} {'GFLOP/s':>8s}")
+    results = {}
+
+    def run(x):
+        ns["iterate"](a, x, args.iters)
+
+    scopes = (
+        ("deterministic()", threads.deterministic),
+        ("thread_limit()", lambda: threads.thread_limit(args.threads)),
+    )
+    for label, scope in scopes:
+        with scope() as n:
+            t = min(timeit.repeat(partial(run, x0.copy(order="F")), number=1, repeat=args.repeat))
+            x = x0.copy(order="F")
+            run(x)
+            results[label] = x
+        print(f"{label:22s} {n:7d} {t * 1e3:9.2f} {flops / t / 1e9:8.2f}")
+    diff = np.max(np.abs(results["deterministic()"] - results["thread_limit()"]))
+    print(f"max |difference| between scopes: {diff:.3g}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
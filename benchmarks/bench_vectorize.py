@@ -0,0 +1,111 @@
+"""
+DO-loop vectorization benchmark: generated scalar loops vs NumPy slice code.
+Usage: python benchmarks/bench_vectorize.py [--n N] [--repeat R]
+"""
+from __future__ import annotations
+import argparse
+import importlib.util
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+from fort2py.codegen_python import generate_module
+from fort2py.fortran_parser import parse_sources
+from fort2py.semantics import Semantics
+
+
+KERNELS = """module kernels
+contains
+subroutine axpy(n, alpha, x, y)
+  integer, intent(in) :: n
+  real(kind=8), intent(in) :: alpha
+  real(kind=8), intent(in) :: x({n})
+  real(kind=8), intent(inout) :: y({n})
+  integer :: i
+  do i = 1, n
+    y(i) = y(i) + alpha*x(i)
+  end do
+end subroutine axpy
+subroutine smooth(n, x, y)
+  integer, intent(in) :: n
+  real(kind=8), intent(in) :: x({n})
+  real(kind=8), intent(out) :: y({n})
+  integer :: i
+  do i = 2, n - 1
+    y(i) = 0.25d0*x(i-1) + 0.5d0*x(i) + 0.25d0*x(i+1)
+  end do
+end subroutine smooth
+subroutine add2(n, a, b, c)
+  integer, intent(in) :: n
+  real(kind=8), intent(in) :: a({m}, {m}), b({m}, {m})
+  real(kind=8), intent(out) :: c({m}, {m})
+  integer :: i, j
+  do j = 1, n
+    do i = 1, n
+      c(i, j) = a(i, j) + 2.0d0*sqrt(b(i, j))
+    end do
+  end do
+end subroutine add2
+function dotp(n, x, y)
+  integer, intent(in) :: n
+  real(kind=8), intent(in) :: x({n}), y({n})
+  real(kind=8) :: dotp
+  integer :: i
+  dotp = 0.0d0
+  do i = 1, n
+    dotp = dotp + x(i)*y(i)
+  end do
+end function dotp
+end module kernels
+"""
+
+
+def load(code: str, name: str, td: Path):
+    p = td / f"{name}.py"
+    p.write_text(code, encoding="utf-8")
+    spec = importlib.util.spec_from_file_location(name, str(p))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+    n = args.n
+    m = int(n**0.5)
+    with tempfile.TemporaryDirectory() as td:
+        td = Path(td)
+        src = td / "kernels.f90"
+        src.write_text(KERNELS.format(n=n, m=m), encoding="utf-8")
+        ir = parse_sources([src])
+        Semantics(ir).analyze()
+        mod = ir.modules["kernels"]
+        loop = load(generate_module(mod, vectorize=False), "k_loop", td)
+        vec = load(generate_module(mod, vectorize=True), "k_vec", td)
+
+        rng = np.random.default_rng(0)
+        x, y = rng.random(n), rng.random(n)
+        a, b = np.asfortranarray(rng.random((m, m))), np.asfortranarray(rng.random((m, m)))
+        out, c = np.zeros(n), np.zeros((m, m), order="F")
+        cases = {
+            "axpy": lambda k: k.axpy(n, 2.0, x, y.copy()),
+            "smooth": lambda k: k.smooth(n, x, out),
+            "add2": lambda k: k.add2(m, a, b, c),
+            "dotp": lambda k: k.dotp(n, x, y),
+        }
+        print(f"{'kernel':8s} {'loop ms':>10s} {'numpy ms':>10s} {'speedup':>8s}")
+        for name, call in cases.items():
+            t_loop = min(timeit.repeat(lambda call=call: call(loop), number=1, repeat=args.repeat))
+            t_vec = min(timeit.repeat(lambda call=call: call(vec), number=1, repeat=args.repeat))
+            print(f"{name:8s} {t_loop * 1e3:10.2f} {t_vec * 1e3:10.3f} {t_loop / t_vec:7.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Python-side verification cost per case: fresh entry import per case vs a warm PythonEntry.
+Usage: python benchmarks/bench_verify.py [--cases N] [--routines R]
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fort2py.codegen_python import generate_module
+from fort2py.fortran_parser import parse_sources
+from fort2py.harness import PythonEntry, SampleCase
+from fort2py.semantics import Semantics
+
+
+ROUTINE = """subroutine smooth{k}(x, y)
+  real(kind=8), intent(in) :: x(64)
+  real(kind=8), intent(out) :: y(64)
+  real(kind=8) :: t(64)
+  integer :: i
+  t = 0.0d0
+  do i = 2, 63
+    t(i) = 0.25d0*x(i-1) + 0.5d0*x(i) + 0.25d0*x(i+1)
+  end do
+  y = t
+end subroutine smooth{k}
+"""
+
+ENTRY = """import numpy as np
+from kernels import smooth0
+
+def main(seed):
+    x = np.random.default_rng(seed).random(64)
+    y = np.zeros(64)
+    smooth0(x, y)
+    return f"{y.sum():.12f}\\n"
+"""
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--cases", type=int, default=200)
+    ap.add_argument("--routines", type=int, default=40,
+                    help="routines in the generated module (import cost)")
+    args = ap.parse_args(argv)
+    td = Path(tempfile.mkdtemp())
+    src = td / "kernels.f90"
+    body = "".join(ROUTINE.format(k=k) for k in range(args.routines))
+    src.write_text("module kernels\ncontains\n" + body + "end module kernels\n")
+    ir = parse_sources([src])
+    Semantics(ir).analyze()
+    (td / "kernels.py").write_text(generate_module(ir.modules["kernels"]), encoding="utf-8")
+    (td / "entry.py").write_text(ENTRY, encoding="utf-8")
+    cases = [SampleCase(f"c{i}", inputs={"seed": i}) for i in range(args.cases)]
+
+    # Cold: what every case paid before, a fresh import of the entry and the generated module
+    t0 = time.perf_counter()
+    cold = []
+    for c in cases:
+        sys.modules.pop("kernels", None)
+        cold.append(PythonEntry(td / "entry.py", "main")(c))
+    t_cold = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    entry = PythonEntry(td / "entry.py", "main")
+    warm = [entry(c) for c in cases]
+    t_warm = time.perf_counter() - t0
+    assert cold == warm
+
+    print(f"{'entry':6s} {'cases':>6s} {'ms/case':>9s}")
+    print(f"{'cold':6s} {args.cases:6d} {t_cold / args.cases * 1e3:9.3f}")
+    print(f"{'warm':6s} {args.cases:6d} {t_warm / args.cases * 1e3:9.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
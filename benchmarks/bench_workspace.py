@@ -0,0 +1,92 @@
+"""
+Local-array benchmark: np.zeros on every call vs pooled Workspace buffers.
+Usage: python benchmarks/bench_workspace.py [--n N] [--calls C] [--repeat R]
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from fort2py.codegen_python import generate_module
+from fort2py.fortran_parser import parse_sources
+from fort2py.semantics import Semantics
+
+
+KERNELS = """module relax
+contains
+subroutine sweep(x, y)
+  real(kind=8), intent(in) :: x({n})
+  real(kind=8), intent(out) :: y({n})
+  real(kind=8) :: lap({n}), grad({n}), flux({n})
+  integer :: i
+  lap = 0.0d0
+  grad = 0.0d0
+  do i = 2, {n} - 1
+    lap(i) = x(i-1) - 2.0d0*x(i) + x(i+1)
+    grad(i) = x(i+1) - x(i-1)
+  end do
+  flux = 0.5d0*grad + 0.1d0*lap
+  y = x + flux
+end subroutine sweep
+end module relax
+"""
+
+
+def churn(fn, calls: int) -> int:
+    # Bytes passed through the allocator over `calls` calls
+    # (NumPy reports its buffers to tracemalloc)
+    tracemalloc.start()
+    total = 0
+    for _ in range(calls):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        fn()
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return total
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--calls", type=int, default=200)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+    with tempfile.TemporaryDirectory() as td:
+        src = Path(td) / "relax.f90"
+        src.write_text(KERNELS.format(n=args.n), encoding="utf-8")
+        ir = parse_sources([src])
+        Semantics(ir).analyze()
+        mod = ir.modules["relax"]
+        fresh: dict = {}
+        pooled: dict = {}
+        exec(generate_module(mod, workspace=False), fresh)
+        exec(generate_module(mod, workspace=True), pooled)
+    x = np.random.default_rng(0).random(args.n)
+    y1, y2 = np.zeros(args.n), np.zeros(args.n)
+    fresh["sweep"](x, y1)
+    pooled["sweep"](x, y2)
+    assert np.array_equal(y1, y2)
+
+    print(f"{'locals':10s} {'ms/call':>9s} {'KiB allocated/call':>19s}")
+    for label, ns, y in (("np.zeros", fresh, y1), ("workspace", pooled, y2)):
+        call = partial(ns["sweep"], x, y)
+
+        def sweeps(call=call):
+            for _ in range(args.calls):
+                call()
+
+        t = min(timeit.repeat(sweeps, number=1, repeat=args.repeat))
+        kib = churn(call, min(args.calls, 50)) / min(args.calls, 50) / 1024
+        print(f"{label:10s} {t / args.calls * 1e3:9.3f} {kib:19.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+from __future__ import annotations
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import threads
+from .harness import PythonEntry, SampleCase, VerificationConfig
+from .version import __version__
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not on Windows
+    resource = None
+
+# Fortran-vs-Python timing for the cases of a verification config.
+# Fortran times are whole process runs (start-up included), with stdout discarded and the
+# thread variables of verify; peak RSS comes from wait4. Python times are calls of an
+# already imported entry (state reset included) in a fresh worker process per case, so its
+# peak RSS is that case's, interpreter and NumPy included.
+
+HISTORY_NAME = ".fort2py_bench.json"
+
+
+def _check_platform():
+    # The launcher spawns and reaps through POSIX calls; peak RSS comes from getrusage
+    missing = [n for n in ("posix_spawn", "wait4") if not hasattr(os, n)]
+    if resource is None:
+        missing.append("resource")
+    if missing:
+        raise RuntimeError(f"fort2py bench needs a POSIX platform (missing: {', '.join(missing)})")
+
+
+@dataclass
+class Timing:
+    median_s: float
+    p95_s: float
+    peak_rss_kb: int
+
+    @staticmethod
+    def from_samples(samples: List[float], rss_kb: int) -> "Timing":
+        a = np.asarray(samples)
+        median, p95 = float(np.median(a)), float(np.percentile(a, 95))
+        return Timing(round(median, 9), round(p95, 9), int(rss_kb))
+
+
+@dataclass
+class CaseBench:
+    name: str
+    fortran: Timing
+    python: Timing
+
+    @property
+    def slowdown(self) -> float:
+        # Python median / Fortran median
+        if not self.fortran.median_s:
+            return float("inf")
+        return self.python.median_s / self.fortran.median_s
+
+
+# Runs in a bare interpreter (-S -I, no numpy): ru_maxrss survives fork+exec on Linux, so the
+# launcher's own peak RSS is a floor under every child's figure and should stay small
+_FORTRAN_TIMER = """
+import json, os, sys, time
+exe, args, stdin, cwd, env, n = json.loads(sys.argv[1])
+if cwd:
+    os.chdir(cwd)
+out = []
+for _ in range(n):
+    fa = [(os.POSIX_SPAWN_OPEN, fd, os.devnull, os.O_WRONLY, 0) for fd in (1, 2)]
+    if stdin is not None:
+        fa.append((os.POSIX_SPAWN_OPEN, 0, stdin, os.O_RDONLY, 0))
+    t0 = time.perf_counter()
+    pid = os.posix_spawn(exe, [exe] + args, env, file_actions=fa)
+    _, status, ru = os.wait4(pid, 0)
+    out.append((time.perf_counter() - t0, ru.ru_maxrss, os.waitstatus_to_exitcode(status)))
+print(json.dumps(out))
+"""
+
+
+def _time_fortran(exe: Path, case: SampleCase, repeat: int, warmup: int) -> Timing:
+    with tempfile.TemporaryDirectory() as tmp:
+        stdin = None
+        if case.stdin:
+            stdin = os.path.join(tmp, "stdin")
+            Path(stdin).write_text(case.stdin, encoding="utf-8")
+        spec = [
+            str(Path(exe).resolve()),
+            list(case.exe_args or []),
+            stdin,
+            case.cwd,
+            threads.deterministic_env(),
+            warmup + repeat,
+        ]
+        cmd = [sys.executable, "-S", "-I", "-c", _FORTRAN_TIMER, json.dumps(spec)]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"case {case.name}: timing {exe} failed:\n{proc.stderr}")
+    runs = json.loads(proc.stdout)
+    for _, _, code in runs:
+        if code != 0:
+            raise RuntimeError(f"case {case.name}: {exe} exited with status {code}")
+    runs = runs[warmup:]
+    # ru_maxrss is in kB on Linux
+    return Timing.from_samples([t for t, _, _ in runs], max(rss for _, rss, _ in runs))
+
+
+def _time_python(
+    module_path: Path, func_name: str, case: SampleCase, repeat: int, warmup: int
+) -> Tuple[List[float], int]:
+    # Runs in a fresh worker process: import once, then time calls
+    with threads.deterministic():
+        entry = PythonEntry(module_path, func_name)
+        samples = []
+        for i in range(warmup + repeat):
+            t0 = time.perf_counter()
+            entry(case)
+            dt = time.perf_counter() - t0
+            if i >= warmup:
+                samples.append(dt)
+    return samples, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_bench(
+    py_src: Path, cfg: VerificationConfig, repeat: int = 5, warmup: int = 1
+) -> List[CaseBench]:
+    _check_platform()
+    exe = Path(cfg.fortran_exe or "")
+    if not exe.exists():
+        raise RuntimeError("fortran_exe not provided or not found. Build it first.")
+    py_entry = py_src / (cfg.python_entry_module + ".py")
+    if not py_entry.exists():
+        raise RuntimeError(f"Python entry module not found: {py_entry}")
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for case in cfg.cases or []:
+        fort = _time_fortran(exe, case, repeat, warmup)
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            job = (py_entry, cfg.python_entry_function, case, repeat, warmup)
+            samples, rss = pool.submit(_time_python, *job).result()
+        results.append(CaseBench(case.name, fort, Timing.from_samples(samples, rss)))
+    return results
+
+
+def load_history(p: Path) -> List[Dict]:
+    if not p.exists():
+        return []
+    try:
+        data = json.loads(p.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    return data.get("runs", []) if isinstance(data, dict) else []
+
+
+def append_history(p: Path, results: List[CaseBench], label: str = "", repeat: int = 0) -> Dict:
+    run = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "fort2py": __version__,
+        "label": label,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "repeat": repeat,
+        "cases": {r.name: {**asdict(r), "slowdown": round(r.slowdown, 3)} for r in results},
+    }
+    runs = load_history(p) + [run]
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(json.dumps({"runs": runs}, indent=1) + "\n", encoding="utf-8")
+    return run
+
+
+def previous_run(history: List[Dict], label: str) -> Optional[Dict]:
+    # Latest recorded run with the same label
+    for run in reversed(history):
+        if run.get("label", "") == label:
+            return run
+    return None
+
+
+def regressions(
+    results: List[CaseBench], baseline: Dict, max_ratio: float
+) -> List[Tuple[str, float]]:
+    # Cases whose Python median grew by more than max_ratio against the baseline run
+    out = []
+    for r in results:
+        old = baseline.get("cases", {}).get(r.name)
+        if old and old["python"]["median_s"] > 0:
+            ratio = r.python.median_s / old["python"]["median_s"]
+            if ratio > max_ratio:
+                out.append((r.name, ratio))
+    return out
+
+
+def format_table(results: List[CaseBench], baseline: Optional[Dict] = None) -> str:
+    head = (
+        f"{'case':20s} {'fortran ms':>11s} {'p95':>8s} {'python ms':>10s} {'p95':>8s}"
+        f" {'slowdown':>9s} {'F RSS MiB':>10s} {'P RSS MiB':>10s}"
+    )
+    if baseline:
+        head += f" {'vs last':>8s}"
+    lines = [head]
+    for r in results:
+        f, p = r.fortran, r.python
+        line = (
+            f"{r.name:20s} {f.median_s * 1e3:11.3f} {f.p95_s * 1e3:8.3f}"
+            f" {p.median_s * 1e3:10.3f} {p.p95_s * 1e3:8.3f}"
+            f" {r.slowdown:8.2f}x {f.peak_rss_kb / 1024:10.1f} {p.peak_rss_kb / 1024:10.1f}"
+        )
+        if baseline:
+            old = baseline.get("cases", {}).get(r.name)
+            if old and old["python"]["median_s"]:
+                line += f" {p.median_s / old['python']['median_s']:7.2f}x"
+            else:
+                line += f" {'-':>8s}"
+        lines.append(line)
+    return "\n".join(lines)
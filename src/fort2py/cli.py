@@ -2,15 +2,59 @@ import argparse
 import sys
 from pathlib import Path
 
-from .scanner import scan_fortran_files
+from .scanner import scan_fortran_files, FileManifest, ScanDelta, MANIFEST_NAME
 from .converter import convert_project
+from .ir_cache import IRCache, CACHE_DIR_NAME, DEFAULT_MAX_BYTES
 from .package_builder import build_python_package
+from .bench import (
+    HISTORY_NAME,
+    append_history,
+    format_table,
+    load_history,
+    previous_run,
+    regressions,
+    run_bench,
+)
+from .compare import Tolerance
+from .golden import GOLDEN_DIR_NAME, GoldenStore
 from .harness import VerificationConfig, verify_equivalence
-from .fortran_runner import compile_and_run_project
-from .utils import set_determinism_env
+from .profiling import DEFAULT_TOP
+from .fortran_runner import BUILD_CACHE_DIR_NAME, BuildResult, FortranBuild, find_sources
 from .gui_app import launch_gui
 
 
+def _report_delta(delta: ScanDelta, list_files: bool = True):
+    if list_files:
+        for f in delta.added:
+            print(f"A {f}")
+        for f in delta.changed:
+            print(f"M {f}")
+        for f in delta.removed:
+            print(f"D {f}")
+    print(
+        f"{len(delta.added)} added, {len(delta.changed)} changed, "
+        f"{len(delta.removed)} removed, {len(delta.unchanged)} unchanged"
+    )
+
+
+def _report_build(res: BuildResult):
+    link = "relinked" if res.linked else "up to date"
+    print(
+        f"{res.exe}: {len(res.compiled)} compiled, {len(res.cached)} from cache, "
+        f"{link} ({res.seconds:.2f}s)"
+    )
+
+
+def _prebuild(cfg: VerificationConfig, fort_src: Path, jobs=None):
+    if cfg.fortran_build_dir and cfg.fortran_exe:
+        # Build (or just re-validate) the reference executable from --fort-src first
+        build_dir = Path(cfg.fortran_build_dir)
+        build = FortranBuild(
+            find_sources(fort_src), Path(cfg.fortran_exe), build_dir, cache_dir=build_dir / "cache"
+        )
+        _report_build(build.build(jobs=jobs))
+
+
 def main():
     parser = argparse.ArgumentParser(prog="fort2py", description="Fortran to Python+NumPy translator")
     sub = parser.add_subparsers(dest="cmd", required=True)
@@ -18,12 +62,86 @@ def main():
     p_scan = sub.add_parser("scan", help="Scan a local folder for Fortran files")
     p_scan.add_argument("--path", type=str, required=True)
     p_scan.add_argument("--include-legacy", action="store_true", help="Include .f, .for files")
+    p_scan.add_argument(
+        "--exclude", action="append", default=[], help="Glob of paths to skip (repeatable)"
+    )
+    p_scan.add_argument(
+        "--jobs", type=int, default=None, help="Threads for directory walking and hashing"
+    )
+    p_scan.add_argument(
+        "--changed",
+        action="store_true",
+        help="Report only files added/changed/removed since last scan",
+    )
+    p_scan.add_argument(
+        "--manifest",
+        type=str,
+        default=None,
+        help=f"Manifest path (default: <path>/{MANIFEST_NAME})",
+    )
 
     p_convert = sub.add_parser("convert", help="Convert a Fortran project to Python")
     p_convert.add_argument("--path", type=str, required=True)
     p_convert.add_argument("--out", type=str, required=True)
     p_convert.add_argument("--include-legacy", action="store_true")
     p_convert.add_argument("--fail-on-unsupported", action="store_true", help="Stop on first unsupported construct")
+    p_convert.add_argument(
+        "--exclude", action="append", default=[], help="Glob of paths to skip (repeatable)"
+    )
+    p_convert.add_argument("--jobs", type=int, default=None, help="Worker processes for parsing")
+    p_convert.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Regenerate only changed modules and their USE dependents",
+    )
+    p_convert.add_argument(
+        "--backend",
+        choices=["numpy", "numba"],
+        default="numpy",
+        help="numba: also emit @njit variants where possible",
+    )
+    p_convert.add_argument(
+        "--no-vectorize", action="store_true", help="Keep DO loops as Python loops"
+    )
+    p_convert.add_argument(
+        "--calling-convention",
+        choices=["ref", "tuple"],
+        default=None,
+        help="OUT/INOUT scalars: Ref(...) arguments (default) or returned values (tuple)",
+    )
+    p_convert.add_argument(
+        "--fast",
+        action="store_true",
+        help="Performance profile: tuple calling convention, no argument checks",
+    )
+    p_convert.add_argument(
+        "--no-workspace",
+        action="store_true",
+        help="Allocate local arrays on every call instead of pooling them",
+    )
+    p_convert.add_argument(
+        "--compact-ir", action="store_true", help="Lower-memory IR for very large projects"
+    )
+    p_convert.add_argument(
+        "--cache-dir", type=str, default=CACHE_DIR_NAME, help="Parsed-IR cache directory"
+    )
+    p_convert.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024))
+    p_convert.add_argument(
+        "--no-cache", action="store_true", help="Parse every file, ignoring the IR cache"
+    )
+    p_convert.add_argument(
+        "--manifest", type=str, default=None, help=f"Manifest path (default: <out>/{MANIFEST_NAME})"
+    )
+
+    p_cache = sub.add_parser("cache", help="Inspect or prune the parsed-IR cache")
+    p_cache.add_argument("action", choices=["stats", "prune"])
+    p_cache.add_argument("--cache-dir", type=str, default=CACHE_DIR_NAME)
+    p_cache.add_argument(
+        "--max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Prune down to this size (0 clears)",
+    )
 
     p_build = sub.add_parser("build-package", help="Create a Python package from generated sources")
     p_build.add_argument("--in", dest="in_dir", type=str, required=True)
@@ -34,23 +152,173 @@ def main():
     p_verify.add_argument("--fort-src", type=str, required=True)
     p_verify.add_argument("--py-src", type=str, required=True)
     p_verify.add_argument("--sample-config", type=str, required=True)
+    p_verify.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Cases run concurrently (Fortran and Python sides overlap)",
+    )
+    p_verify.add_argument(
+        "--report",
+        type=str,
+        default=None,
+        help="Write a JSON report with per-case status and timings",
+    )
+    p_verify.add_argument(
+        "--atol", type=float, default=None, help="Absolute tolerance for numbers in the outputs"
+    )
+    p_verify.add_argument(
+        "--rtol", type=float, default=None, help="Relative tolerance (to the Fortran value)"
+    )
+    p_verify.add_argument(
+        "--ulps", type=int, default=None, help="Accept numbers at most this many float64 ULPs apart"
+    )
+    p_verify.add_argument(
+        "--golden-dir", type=str, default=GOLDEN_DIR_NAME, help="Store of reference Fortran outputs"
+    )
+    p_verify.add_argument(
+        "--no-golden", action="store_true", help="Run the Fortran executable for every case"
+    )
+    p_verify.add_argument(
+        "--refresh-golden",
+        action="store_true",
+        help="Re-run every case and overwrite its stored output",
+    )
+    p_verify.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the Python side of each case; hotspots are mapped to Fortran lines",
+    )
+    p_verify.add_argument(
+        "--profile-top",
+        type=int,
+        default=DEFAULT_TOP,
+        help="Hotspots shown per view with --profile",
+    )
+
+    p_bench = sub.add_parser(
+        "bench", help="Time the Fortran executable and the Python entry on the sample cases"
+    )
+    p_bench.add_argument("--fort-src", type=str, required=True)
+    p_bench.add_argument("--py-src", type=str, required=True)
+    p_bench.add_argument("--sample-config", type=str, required=True)
+    p_bench.add_argument("--repeat", type=int, default=5, help="Timed runs per case and side")
+    p_bench.add_argument("--warmup", type=int, default=1, help="Untimed runs before the timed ones")
+    p_bench.add_argument(
+        "--history", type=str, default=HISTORY_NAME, help="JSON file the results are appended to"
+    )
+    p_bench.add_argument(
+        "--label",
+        type=str,
+        default="",
+        help="Run label (e.g. codegen mode); compared with the last run of the same label",
+    )
+    p_bench.add_argument(
+        "--max-ratio",
+        type=float,
+        default=None,
+        help="Exit 1 if a case's Python median exceeds the last run's by this factor",
+    )
+    p_bench.add_argument(
+        "--no-history", action="store_true", help="Print results without recording them"
+    )
+
+    p_fbuild = sub.add_parser(
+        "build-fortran",
+        help="Build the reference Fortran executable (cached, parallel, USE-ordered)",
+    )
+    p_fbuild.add_argument("--path", type=str, required=True, help="Fortran source tree")
+    p_fbuild.add_argument("--exe", type=str, required=True)
+    p_fbuild.add_argument(
+        "--build-dir",
+        type=str,
+        default=None,
+        help=f"Objects and .mod files (default: <exe dir>/{BUILD_CACHE_DIR_NAME})",
+    )
+    p_fbuild.add_argument(
+        "--cache-dir", type=str, default=None, help="Artifact cache (default: <build dir>/cache)"
+    )
+    p_fbuild.add_argument("--jobs", type=int, default=None, help="Parallel compiler processes")
+    p_fbuild.add_argument(
+        "--flag", dest="flags", action="append", default=[], help="Extra gfortran flag (repeatable)"
+    )
+
+    p_golden = sub.add_parser("golden", help="Inspect or invalidate stored reference outputs")
+    p_golden.add_argument("action", choices=["stats", "clear"])
+    p_golden.add_argument("--golden-dir", type=str, default=GOLDEN_DIR_NAME)
+    p_golden.add_argument(
+        "--exe",
+        type=str,
+        default=None,
+        help="clear: only entries of this executable's current build",
+    )
 
     p_gui = sub.add_parser("gui", help="Launch GUI")
     args = parser.parse_args()
 
-    set_determinism_env()
-
     if args.cmd == "scan":
-        files = scan_fortran_files(Path(args.path), include_legacy=args.include_legacy)
-        for f in files:
-            print(f)
-        print(f"Found {len(files)} Fortran files")
+        root = Path(args.path)
+        files = scan_fortran_files(
+            root, include_legacy=args.include_legacy, exclude=args.exclude, jobs=args.jobs
+        )
+        if args.changed:
+            manifest = FileManifest.load(
+                Path(args.manifest) if args.manifest else root / MANIFEST_NAME, root
+            )
+            _report_delta(manifest.update(files, jobs=args.jobs))
+            manifest.save()
+        else:
+            for f in files:
+                print(f)
+            print(f"Found {len(files)} Fortran files")
     elif args.cmd == "convert":
-        files = scan_fortran_files(Path(args.path), include_legacy=args.include_legacy)
+        root = Path(args.path)
+        files = scan_fortran_files(
+            root, include_legacy=args.include_legacy, exclude=args.exclude, jobs=args.jobs
+        )
         out_dir = Path(args.out)
         out_dir.mkdir(parents=True, exist_ok=True)
-        convert_project(files, out_dir, fail_on_unsupported=args.fail_on_unsupported)
+        manifest = FileManifest.load(
+            Path(args.manifest) if args.manifest else out_dir / MANIFEST_NAME, root
+        )
+        delta = manifest.update(files, jobs=args.jobs)
+        _report_delta(delta, list_files=False)
+        cache = (
+            None
+            if args.no_cache
+            else IRCache(Path(args.cache_dir), max_bytes=args.cache_max_mb * 1024 * 1024)
+        )
+        digests = {f: manifest.digest_of(f) for f in files}
+        written = convert_project(
+            files,
+            out_dir,
+            fail_on_unsupported=args.fail_on_unsupported,
+            jobs=args.jobs,
+            cache=cache,
+            digests=digests,
+            incremental=args.incremental,
+            compact_ir=args.compact_ir,
+            vectorize=not args.no_vectorize,
+            backend=args.backend,
+            convention=args.calling_convention or ("tuple" if args.fast else "ref"),
+            checks=not args.fast,
+            workspace=not args.no_workspace,
+        )
+        print(f"Generated {len(written)} module(s)")
+        manifest.save()
+        if cache is not None:
+            print(f"IR cache: {cache.hits} hits, {cache.misses} misses")
         print(f"Conversion complete. Output: {out_dir}")
+    elif args.cmd == "cache":
+        cache = IRCache(Path(args.cache_dir), max_bytes=args.max_mb * 1024 * 1024)
+        if args.action == "prune":
+            print(f"Removed {cache.prune()} cache entries")
+        st = cache.stats()
+        mib = 1024 * 1024
+        print(
+            f"{st.entries} entries, {st.total_bytes / mib:.1f} MiB "
+            f"of {st.max_bytes / mib:.1f} MiB in {cache.root}"
+        )
     elif args.cmd == "build-package":
         in_dir = Path(args.in_dir)
         out_dir = Path(args.out)
@@ -59,7 +327,64 @@ def main():
         print(f"Package scaffold created: {out_dir}")
     elif args.cmd == "verify":
         cfg = VerificationConfig.from_yaml(Path(args.sample_config))
-        ok = verify_equivalence(Path(args.fort_src), Path(args.py_src), cfg)
+        _prebuild(cfg, Path(args.fort_src), jobs=args.jobs)
+        report = Path(args.report) if args.report else None
+        tol = None
+        if (args.atol, args.rtol, args.ulps) != (None, None, None):
+            # Flags replace the config's tolerance; unset ones are 0
+            tol = Tolerance(atol=args.atol or 0.0, rtol=args.rtol or 0.0, ulps=args.ulps or 0)
+        golden = None if args.no_golden else GoldenStore(Path(args.golden_dir))
+        ok = verify_equivalence(
+            Path(args.fort_src),
+            Path(args.py_src),
+            cfg,
+            jobs=args.jobs,
+            report=report,
+            tolerance=tol,
+            golden=golden,
+            refresh_golden=args.refresh_golden,
+            profile=max(args.profile_top, 1) if args.profile else 0,
+        )
+        if golden is not None:
+            print(
+                f"Golden outputs: {golden.hits} hits, {golden.misses} misses "
+                f"({golden.saved_s:.1f}s of Fortran runs skipped)"
+            )
         sys.exit(0 if ok else 1)
+    elif args.cmd == "bench":
+        if args.repeat < 1:
+            parser.error("--repeat must be at least 1")
+        cfg = VerificationConfig.from_yaml(Path(args.sample_config))
+        _prebuild(cfg, Path(args.fort_src))
+        results = run_bench(Path(args.py_src), cfg, repeat=args.repeat, warmup=args.warmup)
+        history = Path(args.history)
+        baseline = previous_run(load_history(history), args.label)
+        print(format_table(results, baseline))
+        if not args.no_history:
+            append_history(history, results, label=args.label, repeat=args.repeat)
+            print(f"Appended to {history}")
+        slow = regressions(results, baseline, args.max_ratio) if baseline and args.max_ratio else []
+        for name, ratio in slow:
+            print(
+                f"[Regression] case={name}: Python median {ratio:.2f}x the previous run",
+                file=sys.stderr,
+            )
+        sys.exit(1 if slow else 0)
+    elif args.cmd == "build-fortran":
+        exe = Path(args.exe)
+        build_dir = Path(args.build_dir) if args.build_dir else exe.parent / BUILD_CACHE_DIR_NAME
+        cache_dir = Path(args.cache_dir) if args.cache_dir else build_dir / "cache"
+        sources = find_sources(Path(args.path))
+        build = FortranBuild(sources, exe, build_dir, flags=args.flags, cache_dir=cache_dir)
+        res = build.build(jobs=args.jobs)
+        _report_build(res)
+    elif args.cmd == "golden":
+        golden = GoldenStore(Path(args.golden_dir))
+        if args.action == "clear":
+            removed = golden.invalidate(Path(args.exe) if args.exe else None)
+            print(f"Removed {removed} golden outputs")
+        st = golden.stats()
+        size_mib = st.total_bytes / (1024 * 1024)
+        print(f"{st.entries} golden outputs, {size_mib:.1f} MiB in {golden.root}")
     elif args.cmd == "gui":
         launch_gui()
@@ -1,10 +1,27 @@
 from __future__ import annotations
+import re
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
+import numpy as np
+
+from .fortran_expr import (
+    NUMPY_ELEMENTAL,
+    identifiers,
+    matching_paren,
+    python_ops,
+    rewrite_refs,
+    split_assignment,
+    split_top_level,
+    zero_based,
+)
 from .ir import ProjectIR, Module, Subroutine, Function, Argument, VarDecl
 from .types import DTYPE_MAP, as_fortran_array
 from .utils import write_text
+from .numba_backend import plan_numba
+from .sourcemap import SourceMap
+from .parallel_loops import ParallelLoop, find_parallel_loops, has_parallel_loops, is_omp_directive
+from .vectorize import VectorizedLoop, elemental_kernel_body, vectorize_loops
 
 
 HEADER = """# Auto-generated by fort2py. Deterministic and explicit; do not edit manually.
@@ -16,13 +33,42 @@ from fort2py.intrinsics import *
 """
 
 
+class SourceLine(str):
+    # A generated line that remembers the Fortran line it was translated from
+    origin: int = 0
+
+
+def _at(text: str, line: int) -> str:
+    if not line:
+        return text
+    s = SourceLine(text)
+    s.origin = line
+    return s
+
+
+def _origin(text: str) -> int:
+    return getattr(text, "origin", 0)
+
+
+def line_map(lines: Sequence[str]) -> Dict[int, int]:
+    # 1-based line of "\n".join(lines) -> Fortran line, for lines that carry an origin
+    out = {}
+    n = 1
+    for s in lines:
+        k = s.count("\n") + 1
+        if _origin(s):
+            out.update((n + i, s.origin) for i in range(k))
+        n += k
+    return out
+
+
 def _py_type_for(v: VarDecl) -> str:
     if v.type_spec == "real":
         dt = DTYPE_MAP.real_from_kind(v.kind)
-        return f"np.{dt.name}"
+        return f"np.{np.dtype(dt).name}"
     if v.type_spec == "integer":
         dt = DTYPE_MAP.int_from_kind(v.kind)
-        return f"np.{dt.name}"
+        return f"np.{np.dtype(dt).name}"
     if v.type_spec == "logical":
         return "bool"
     if v.type_spec == "character":
@@ -42,12 +88,38 @@ def _default_value_for(v: VarDecl) -> str:
     return "None"
 
 
-def _emit_args(args: List[Argument]) -> Tuple[str, List[str]]:
+# OUT/INOUT scalar calling conventions:
+#   ref   - the caller passes Ref(...) wrappers; the routine reads .v on entry and writes it
+#           back on exit
+#   tuple - OUT scalars are not passed at all, INOUT scalars are passed by value, and both are
+#           returned (one value bare, several as a tuple); no wrapper is allocated per call
+CONVENTIONS = ("ref", "tuple")
+
+
+def _returned_args(unit: Subroutine | Function, convention: str) -> List[Argument]:
+    # Functions keep Ref arguments so that calls stay usable inside expressions
+    if convention != "tuple" or not isinstance(unit, Subroutine):
+        return []
+    return [a for a in unit.args if a.byref]
+
+
+def _dropped(a: Argument) -> bool:
+    # OUT scalars the tuple convention does not take as parameters
+    return a.byref and a.intent == "out" and not a.optional
+
+
+def _emit_args(
+    args: List[Argument], returned: Iterable[Argument] = (), checks: bool = True
+) -> Tuple[str, List[str]]:
     # Build Python signature with optional default None to mimic Fortran OPTIONAL
+    returned_names = {a.name for a in returned}
     parts = []
     prelude: List[str] = []
     for a in args:
         nm = a.name
+        if nm in returned_names and _dropped(a):
+            prelude.append(f"    {nm} = {_default_value_for(a)}")
+            continue
         default = "None" if a.optional else None
         if default is None:
             parts.append(nm)
@@ -55,11 +127,31 @@ def _emit_args(args: List[Argument]) -> Tuple[str, List[str]]:
             parts.append(f"{nm}=None")
         if a.optional:
             prelude.append(f"    # OPTIONAL argument: {nm}")
-        if a.byref:
-            prelude.append(f"    assert isinstance({nm}, Ref), 'Argument {nm} must be Ref(...) for OUT/INOUT scalar'")
+        if a.byref and nm not in returned_names:
+            if checks:
+                prelude.append(
+                    f"    assert isinstance({nm}, Ref), "
+                    f"'Argument {nm} must be Ref(...) for OUT/INOUT scalar'"
+                )
+            guard = f"if {nm} is not None: " if a.optional else ""
+            prelude.append(f"    _ref_{nm} = {nm}")
+            prelude.append(f"    {guard}{nm} = {nm}.v")
     return ", ".join(parts), prelude
 
 
+def _emit_epilogue(args: List[Argument], returned: List[Argument]) -> List[str]:
+    # Ref arguments get their final values written back; tuple-convention values are returned
+    returned_names = {a.name for a in returned}
+    out = []
+    for a in args:
+        if a.byref and a.name not in returned_names:
+            guard = f"if _ref_{a.name} is not None: " if a.optional else ""
+            out.append(f"    {guard}_ref_{a.name}.v = {a.name}")
+    if returned:
+        out.append(f"    return {', '.join(a.name for a in returned)}")
+    return out
+
+
 def _emit_decl_init(v: VarDecl) -> str:
     # For local vars with SAVE or allocatable defaults, we create local initialization at entry.
     if v.dims:
@@ -70,94 +162,676 @@ def _emit_decl_init(v: VarDecl) -> str:
         return f"    {v.name} = {_default_value_for(v)}"
 
 
-def _translate_exec_line(line: str) -> str:
+def _translate_expr(expr: str, arrays: Dict[str, VarDecl]) -> str:
+    # Array element references become 0-based NumPy indexing: a(i, j) -> a[i - 1, j - 1]
+    def fn(name: str, args: List[str]) -> str:
+        low = name.lower()
+        if low in arrays:
+            return f"{name}[{', '.join(zero_based(a) for a in args)}]"
+        if low in NUMPY_ELEMENTAL:
+            return f"{NUMPY_ELEMENTAL[low]}({','.join(args)})"
+        return f"{name}({','.join(args)})"
+
+    return python_ops(rewrite_refs(expr, fn))
+
+
+def _range_for(bounds: str, arrays: Dict[str, VarDecl]) -> str:
+    # DO variables keep their Fortran values; Python range is exclusive at the end
+    parts = [_translate_expr(b.strip(), arrays) for b in split_top_level(bounds)]
+    if len(parts) == 2:
+        return f"range({parts[0]}, {parts[1]} + 1)"
+    if len(parts) == 3:
+        step = parts[2].replace(" ", "")
+        if step.lstrip("-").isdigit() and int(step) != 0:
+            end = f"{parts[1]} + 1" if int(step) > 0 else f"{parts[1]} - 1"
+            return f"range({parts[0]}, {end}, {step})"
+    raise NotImplementedError(f"Unsupported DO bounds (literal non-zero step required): {bounds}")
+
+
+# Array intrinsics taking out=: `c = matmul(a, b)` is emitted as `matmul(a, b, out=c)`
+_OUT_INTRINSICS = {"matmul", "transpose", "merge", "nint", "modulo"}
+_re_call = re.compile(r"^([A-Za-z_]\w*)\s*\(")
+
+
+def _out_call(name: str, rhs: str, arrays: Dict[str, VarDecl]) -> Optional[str]:
+    # Whole-array assignment from one out=-capable intrinsic that does not read the target
+    m = _re_call.match(rhs)
+    if (
+        not m
+        or m.group(1).lower() not in _OUT_INTRINSICS
+        or matching_paren(rhs, m.end() - 1) != len(rhs) - 1
+    ):
+        return None
+    if name.lower() in identifiers(rhs[m.end() :]):
+        return None
+    call = _translate_expr(rhs, arrays)
+    return f"{call[:-1]}, out={name})"
+
+
+_re_do = re.compile(r"^do\s+(\w+)\s*=\s*(.+)$", re.I)
+_re_if_then = re.compile(r"^if\s*\((.*)\)\s*then$", re.I)
+_re_else_if = re.compile(r"^else\s*if\s*\((.*)\)\s*then$", re.I)
+_re_else = re.compile(r"^else$", re.I)
+_re_end_block = re.compile(r"^end\s*(do|if)$", re.I)
+
+
+def _bind_call(call: str, dummies: List[Argument]) -> Tuple[str, List[Tuple[Argument, str, bool]]]:
+    # CALL text -> (callee, [(dummy, actual, passed by keyword)]) in the order written
+    m = re.match(r"(\w+)\s*(?:\((.*)\))?\s*$", call, re.S)
+    if not m:
+        raise NotImplementedError(f"Unsupported CALL form: {call}")
+    actuals = (
+        [a.strip() for a in split_top_level(m.group(2))]
+        if m.group(2) and m.group(2).strip()
+        else []
+    )
+    bound = []
+    for pos, act in enumerate(actuals):
+        kw = re.match(r"(\w+)\s*=(?!=)\s*(.+)$", act, re.S)
+        if kw:
+            dummy = next((d for d in dummies if d.name.lower() == kw.group(1).lower()), None)
+        else:
+            dummy = dummies[pos] if pos < len(dummies) else None
+        if dummy is None:
+            raise NotImplementedError(f"CALL argument does not match a dummy argument: {call}")
+        bound.append((dummy, kw.group(2) if kw else act, kw is not None))
+    return m.group(1), bound
+
+
+def _convention_call(
+    call: str, dummies: List[Argument], arrays: Dict[str, VarDecl], convention: str
+) -> str:
+    # tuple: `call s(a, x, y)` with x OUT, y INOUT -> `x, y = s(a, y)`
+    # ref:   actuals for OUT/INOUT scalars are wrapped in Ref and read back after the call
+    name, bound = _bind_call(call, dummies)
+    passed: List[str] = []
+    wrap: List[str] = []
+    unwrap: List[str] = []
+    values = {d.name.lower(): _translate_expr(v, arrays) for d, v, _ in bound}
+    for d, _, kw in bound:
+        arg = values[d.name.lower()]
+        if d.byref and convention == "ref":
+            tmp = f"_r{len(wrap)}"
+            wrap.append(f"{tmp} = Ref({arg})")
+            unwrap.append(f"{arg} = {tmp}.v")
+            arg = tmp
+        elif d.byref and _dropped(d):
+            continue
+        passed.append(f"{d.name}={arg}" if kw else arg)
+    rhs = f"{name}({', '.join(passed)})"
+    if convention == "ref":
+        return "; ".join(wrap + [rhs] + unwrap)
+    targets = [values.get(d.name.lower(), "_") for d in dummies if d.byref]
+    return f"{', '.join(targets)} = {rhs}"
+
+
+def _translate_exec_line(
+    line: str,
+    arrays: Optional[Dict[str, VarDecl]] = None,
+    calls: Optional[Dict[str, List[Argument]]] = None,
+    convention: str = "ref",
+) -> str:
     # Very conservative MVP translation; raise on unsupported constructs.
+    # Returns one unindented Python statement; block structure is handled by _translate_body.
+    arrays = arrays or {}
     s = line.strip()
     if not s:
         return ""
-    # Assignment
-    if "=" in s and not s.lower().startswith("if"):
-        # Basic transform; full expression parser is out-of-scope for MVP
-        # Replace Fortran .and., .or., .not., .eq., .ne., .lt., .le., .gt., .ge.
-        py = (
-            s.replace(".and.", " and ")
-            .replace(".or.", " or ")
-            .replace(".not.", " not ")
-            .replace(".eq.", "==")
-            .replace(".ne.", "!=")
-            .replace(".lt.", "<")
-            .replace(".le.", "<=")
-            .replace(".gt.", ">")
-            .replace(".ge.", ">=")
-        )
-        # Array indexing: Fortran 1-based to Python 0-based adjustment is complex.
-        # MVP leaves indices as-is and documents requirement to ensure translations handle i-1 externally.
-        return f"    {py}"
-    # IF ... THEN single-line (no else)
-    if s.lower().startswith("if") and "then" in s.lower():
-        cond = s[s.find("(") + 1 : s.rfind(")")]
-        return f"    if {cond}:"
-    if s.lower().startswith("end if"):
+    low = s.lower()
+    if is_omp_directive(s):
+        # Directives other than `parallel do` have no effect on the sequential translation
+        return f"pass  # {s}"
+    m = _re_if_then.match(s)
+    if m:
+        return f"if {_translate_expr(m.group(1), arrays)}:"
+    m = _re_else_if.match(s)
+    if m:
+        return f"elif {_translate_expr(m.group(1), arrays)}:"
+    if _re_else.match(s):
+        return "else:"
+    if _re_end_block.match(s):
         return ""
-    if s.lower().startswith("do "):
-        # Handle "do i=1,n"
-        body = s[3:].strip()
-        if "=" in body:
-            var, rng = body.split("=", 1)
-            var = var.strip()
-            a, b = [t.strip() for t in rng.split(",")[:2]]
-            # Fortran inclusive range and 1-based; Python range is exclusive end
-            return f"    for {var} in range({a}-1, {b}):"
+    m = _re_do.match(s)
+    if m:
+        return f"for {m.group(1)} in {_range_for(m.group(2), arrays)}:"
+    if re.match(r"do\b", low):
         raise NotImplementedError(f"Unsupported DO form: {s}")
-    if s.lower().startswith("end do"):
-        return ""
-    if s.lower().startswith("call "):
+    if re.match(r"call\s", low):
         call = s[5:].strip()
-        return f"    {call}"
+        callee = re.match(r"\w+", call).group(0).lower()
+        target = re.match(r"random_number\s*\(\s*(\w+)\s*\)$", call, re.I)
+        if target and target.group(1).lower() not in arrays:
+            # A scalar cannot be filled in place: RANDOM_NUMBER(x) becomes an assignment
+            return f"{target.group(1)} = random_number()"
+        if calls and callee in calls:
+            return _convention_call(call, calls[callee], arrays, convention)
+        return _translate_expr(call, arrays)
     # Printing / I/O placeholders: raise to avoid silent format loss
-    if s.lower().startswith(("print", "write", "read", "open", "close", "rewind", "format")):
+    if low.startswith(("print", "write", "read", "open", "close", "rewind", "format")):
         raise NotImplementedError(f"I/O translation requires format handling; not supported in MVP: {s}")
+    # Assignment
+    asg = split_assignment(s)
+    if asg is not None:
+        name, subs, rhs = asg
+        if subs is not None:
+            lhs = _translate_expr(f"{name}({','.join(subs)})", arrays)
+        else:
+            # Whole-array assignment writes into the existing (possibly caller-owned) storage
+            if name.lower() in arrays:
+                direct = _out_call(name, rhs, arrays)
+                if direct is not None:
+                    return direct
+            lhs = f"{name}[...]" if name.lower() in arrays else name
+        return f"{lhs} = {_translate_expr(rhs, arrays)}"
     # Select case, where, forall, etc. are out of MVP
     raise NotImplementedError(f"Unsupported executable statement in MVP: {s}")
 
 
-def generate_module(mod: Module) -> str:
-    out = [HEADER]
-    out.append(f"# Module: {mod.name}")
-    for sub in mod.subroutines:
-        sig, prelude = _emit_args(sub.args)
-        out.append(f"def {sub.name}({sig}):")
-        if prelude:
-            out.extend(prelude)
-        # Locals init
-        for d in sub.declarations:
-            out.append(_emit_decl_init(d))
-        # Body
-        for line in sub.body:
-            out.append(_translate_exec_line(line))
-        out.append("")  # blank line
-
-    for fun in mod.functions:
-        sig, prelude = _emit_args(fun.args)
-        out.append(f"def {fun.name}({sig}):")
-        if prelude:
-            out.extend(prelude)
-        for d in fun.declarations:
-            out.append(_emit_decl_init(d))
-        for line in fun.body:
-            out.append(_translate_exec_line(line))
+def _loop_origins(loop: ParallelLoop, lines: Sequence[int]) -> List[int]:
+    # Source line of each entry of loop.loop_lines(): DO/IF/END lines map to the loop header
+    head = lines[0] if lines else 0
+    n = len(loop.body)
+    body = list(lines[loop.body_offset : loop.body_offset + n]) or [head] * n
+    frame = [head] * (len(loop.indices) + (1 if loop.mask else 0))
+    return frame + body + frame
+
+
+def _translate_body(
+    body: Iterable[str],
+    arrays: Dict[str, VarDecl],
+    vectorize: bool = True,
+    calls: Optional[Dict[str, List[Argument]]] = None,
+    convention: str = "ref",
+    par: Optional["_ParallelEmitter"] = None,
+    lines: Optional[Sequence[int]] = None,
+) -> List[str]:
+    # par: hoists DO CONCURRENT / OpenMP loops into chunk functions; without it they run
+    # sequentially
+    # lines: Fortran line of each body statement; emitted lines are tagged with it (see SourceLine)
+    body = list(body)
+    src = list(lines) if lines is not None and len(lines) == len(body) else [0] * len(body)
+    items: List = []
+    plain: List[str] = []
+
+    def flush():
+        items.extend(
+            vectorize_loops(plain, arrays, lambda e: _translate_expr(e, arrays))
+            if vectorize
+            else plain
+        )
+        plain.clear()
+
+    for item in find_parallel_loops(body):
+        if isinstance(item, ParallelLoop):
+            flush()
+            items.append(item)
+        else:
+            plain.append(item)
+    flush()
+    out: List[str] = []
+    depth = 1
+    empty_block = False
+
+    def pad() -> str:
+        return "    " * depth
+
+    pos = 0
+    for item in items:
+        # Items consume consecutive statements: one line, or a whole loop
+        n = 1 if isinstance(item, str) else len(item.source)
+        first = src[pos] if pos < len(src) else 0
+        own = src[pos : pos + n]
+        pos += n
+        if isinstance(item, ParallelLoop):
+            emitted = par.emit(item, own) if par is not None else None
+            if emitted is None:
+                seq = _translate_body(
+                    item.loop_lines(),
+                    arrays,
+                    vectorize,
+                    calls,
+                    convention,
+                    lines=_loop_origins(item, own),
+                )
+                emitted = [_at(line[4:], _origin(line)) for line in seq]
+            out.extend(_at(pad() + line, _origin(line) or first) for line in emitted)
+            empty_block = False
+            continue
+        if isinstance(item, VectorizedLoop):
+            out.append(_at(f"{pad()}# vectorized: {item.source[0].strip()}", first))
+            out.extend(_at(pad() + py, first) for py in item.python)
+            empty_block = False
+            continue
+        s = item.strip()
+        if _re_end_block.match(s) or _re_else.match(s) or _re_else_if.match(s):
+            if empty_block:
+                out.append(_at(f"{pad()}pass", first))
+            depth -= 1
+            if _re_end_block.match(s):
+                empty_block = False
+                continue
+        py = _translate_exec_line(item, arrays, calls, convention)
+        if not py:
+            continue
+        out.append(_at(pad() + py, first))
+        empty_block = py.endswith(":")
+        if empty_block:
+            depth += 1
+    return out
+
+
+# Initial value of each chunk's partial result for a reduction operator
+_REDUCTION_IDENTITY = {
+    "+": "0",
+    "-": "0",
+    "*": "1",
+    "max": "-math.inf",
+    "min": "math.inf",
+    ".and.": "True",
+    ".or.": "False",
+}
+
+
+class _ParallelEmitter:
+    # Turns each parallel loop of one routine into a module-level chunk function
+    # `_<routine>_par<k>(_lo, _hi, *shared)` plus a parallel_do(...) call in the routine.
+
+    def __init__(self, unit, arrays: Dict[str, VarDecl], vectorize: bool, calls, convention: str):
+        self.unit = unit
+        self.arrays = arrays
+        self.vectorize = vectorize
+        self.calls = calls
+        self.convention = convention
+        self.hoisted: List[str] = []
+        self.count = 0
+
+    def emit(self, loop: ParallelLoop, lines: Sequence[int] = ()) -> Optional[List[str]]:
+        # Unindented routine lines, or None to keep the loop sequential;
+        # `lines`: Fortran line of each loop statement
+        decls = {d.name.lower(): d for d in self.unit.declarations}
+        reduced = {v.lower() for _, v in loop.reductions}
+        if not loop.supported or any(v in self.arrays or v not in decls for v in reduced):
+            return None
+        indices = {v.lower() for v, _, _, _ in loop.indices}
+        first = {v.lower() for v in loop.firstprivate}
+        private = set()
+        for line in loop.body:
+            m = _re_do.match(line.strip())
+            asg = split_assignment(line)
+            if m:
+                private.add(m.group(1).lower())
+            elif (
+                asg is not None
+                and asg[1] is None
+                and asg[0].lower() in decls
+                and not decls[asg[0].lower()].dims
+            ):
+                private.add(asg[0].lower())
+        private -= reduced | first
+        bounds = [" ".join(ix[1:3]) for ix in loop.indices[:-1]]
+        used = identifiers(" ".join(list(loop.body) + [loop.mask or ""] + bounds))
+        params = [
+            d.name for d in self.unit.declarations
+            if d.name.lower() in used and d.name.lower() not in indices | private | reduced
+        ]
+        var, lo, hi, step = loop.indices[-1]
+        try:
+            body = _translate_body(
+                loop.loop_lines(chunked=("_lo", "_hi")),
+                self.arrays,
+                self.vectorize,
+                self.calls,
+                self.convention,
+                lines=_loop_origins(loop, lines),
+            )
+            bounds = [_translate_expr(b, self.arrays) for b in (lo, hi, step or "1")]
+        except NotImplementedError:
+            return None
+        self.count += 1
+        name = f"_{self.unit.name}_par{self.count}"
+        head = lines[0] if lines else 0
+        fn = [_at(f"def {name}(_lo, _hi{''.join(', ' + p for p in params)}):", head)]
+        fn.extend(f"    {v} = {_REDUCTION_IDENTITY[op]}" for op, v in loop.reductions)
+        fn.extend(_at(_emit_decl_init(decls[v]), head) for v in sorted(private) if v not in indices)
+        fn.extend(body)
+        if loop.reductions:
+            fn.append(f"    return ({', '.join(v for _, v in loop.reductions)},)")
+        fn.append("")
+        self.hoisted.extend(fn)
+        # NumPy-vectorized chunks release the GIL; scalar Python chunks need processes
+        mode = "thread" if any(b.lstrip().startswith("# vectorized:") for b in body) else "process"
+        shared = f"({', '.join(params)}{',' if len(params) == 1 else ''})"
+        call = f"parallel_do({name}, {', '.join(bounds)}, {shared}, {mode!r}"
+        out = [f"# parallel: {loop.source[0].strip()}"]
+        if loop.reductions:
+            ops = ", ".join(repr(op) for op, _ in loop.reductions)
+            targets = ", ".join(v for _, v in loop.reductions)
+            out.append(f"({targets},) = {call}, ops=({ops},), init=({targets},))")
+        else:
+            out.append(f"{call})")
+        return out
+
+
+def _array_decls(unit) -> Dict[str, VarDecl]:
+    return {d.name.lower(): d for d in unit.declarations if d.dims}
+
+
+def _local_arrays(unit) -> Tuple[List[VarDecl], List[VarDecl]]:
+    # (scratch, SAVE) local arrays; an array-valued function result is returned to the
+    # caller, so it is neither: it is allocated fresh on every call
+    not_local = {a.name.lower() for a in unit.args}
+    if isinstance(unit, Function):
+        not_local.add(unit.return_name.lower())
+    local = [d for d in unit.declarations if d.dims and d.name.lower() not in not_local]
+    return [d for d in local if not d.save], [d for d in local if d.save]
+
+
+def _overwritten_before_read(name: str, body: Iterable[str]) -> bool:
+    # True if the first statement touching `name` is an unconditional whole-array
+    # assignment that does not read it, so a reused buffer need not be zeroed.
+    depth = 0
+    low = name.lower()
+    for line in body:
+        s = line.strip()
+        if low in identifiers(s):
+            asg = split_assignment(s)
+            return (
+                depth == 0
+                and asg is not None
+                and asg[0].lower() == low
+                and asg[1] is None
+                and low not in identifiers(asg[2])
+            )
+        if _re_do.match(s) or _re_if_then.match(s):
+            depth += 1
+        elif _re_end_block.match(s):
+            depth -= 1
+    return True
+
+
+def _emit_workspace(unit) -> List[str]:
+    # Module-level storage for a routine's local arrays: a Workspace pool for scratch
+    # arrays, and one array per SAVE variable that keeps its values between calls.
+    scratch, saved = _local_arrays(unit)
+    out = []
+    if scratch:
+        specs = ", ".join(
+            f"(({', '.join(str(n) for n in d.dims)},), {_py_type_for(d)})" for d in scratch
+        )
+        out.append(f"_ws_{unit.name} = Workspace({specs})")
+    for d in saved:
+        init = _emit_decl_init(d).strip().split(" = ", 1)[1]
+        out.append(_at(f"_save_{unit.name}_{d.name} = {init}", d.line))
+    if out:
+        out.append("")
+    return out
+
+
+def _emit_locals(unit, numba: bool = False, pool: bool = False) -> List[str]:
+    # Dummy arguments arrive from the caller; only true locals are initialised here
+    arg_names = {a.name.lower() for a in unit.args}
+    out = []
+    pooled: Set[str] = set()
+    if pool:
+        scratch, saved = _local_arrays(unit)
+        pooled = {d.name.lower() for d in scratch + saved}
+        if scratch:
+            names = ", ".join(d.name for d in scratch)
+            out.append(_at(f"    ({names},) = _ws_{unit.name}.acquire()", unit.line))
+            body = list(unit.body)
+            for d in scratch:
+                if not _overwritten_before_read(d.name, body):
+                    out.append(_at(f"    {d.name}.fill(0)", d.line))
+        out.extend(_at(f"    {d.name} = _save_{unit.name}_{d.name}", d.line) for d in saved)
+    for d in unit.declarations:
+        if d.name.lower() in arg_names or d.name.lower() in pooled:
+            continue
+        if numba and d.dims:
+            # Numba's np.zeros takes no order=; asfortranarray restores column-major layout
+            dt = "np.bool_" if d.type_spec == "logical" else _py_type_for(d)
+            shape = ", ".join(str(n) for n in d.dims)
+            zeros = f"np.zeros(({shape},), dtype={dt})"
+            init = zeros if len(d.dims) == 1 else f"np.asfortranarray({zeros})"
+            out.append(_at(f"    {d.name} = {init}", d.line))
+        else:
+            out.append(_at(_emit_decl_init(d), d.line))
+    return out
+
+
+def _emit_routine(
+    unit: Subroutine | Function,
+    name: str,
+    vectorize: bool,
+    numba: bool = False,
+    convention: str = "ref",
+    checks: bool = True,
+    calls: Optional[Dict[str, List[Argument]]] = None,
+    pool: bool = False,
+    parallel: bool = True,
+) -> List[str]:
+    # pool=True: local arrays come from the storage emitted by _emit_workspace
+    # parallel=True: parallel loops become chunk functions emitted ahead of the routine
+    returned = _returned_args(unit, convention)
+    sig, prelude = _emit_args(unit.args, returned, checks=checks)
+    out = [_at(f"def {name}({sig}):", unit.line)]
+    if prelude:
+        out.extend(prelude)
+    # Locals init
+    out.extend(_emit_locals(unit, numba=numba, pool=pool))
+    # Body
+    arrays = _array_decls(unit)
+    par = (
+        _ParallelEmitter(unit, arrays, vectorize, calls, convention)
+        if parallel and not numba
+        else None
+    )
+    body = _translate_body(
+        unit.body, arrays, vectorize=vectorize, calls=calls, convention=convention, par=par,
+        lines=unit.body_lines,
+    )
+    scratch = _local_arrays(unit)[0] if pool else []
+    if scratch:
+        # The buffers go back to the pool even if the body raises
+        out.append("    try:")
+        for line in body or ["    pass"]:
+            out.append(_at("    " + line.replace("\n", "\n    "), _origin(line)))
+        out.append("    finally:")
+        out.append(f"        _ws_{unit.name}.release(({', '.join(d.name for d in scratch)},))")
+    else:
+        out.extend(body)
+    out.extend(_emit_epilogue(unit.args, returned))
+    if isinstance(unit, Function):
         # Return value handling (MVP expects return var assigned)
+        out.append(f"    return {unit.return_name}")
+    elif out[-1].startswith("def ") or out[-1].lstrip().startswith("#"):
+        out.append("    pass")
+    out.append("")  # blank line
+    return (par.hoisted if par is not None else []) + out
+
+
+# fort2py.intrinsics that already accept arrays, usable inside elemental kernels
+_KERNEL_INTRINSICS = {"merge", "modulo", "nint"}
+
+
+def _kernel_expr(expr: str, callables: Set[str]) -> str:
+    def fn(name: str, args: List[str]) -> str:
+        low = name.lower()
+        if low in NUMPY_ELEMENTAL:
+            return f"{NUMPY_ELEMENTAL[low]}({','.join(args)})"
+        if low in ("max", "min"):
+            acc = args[0].strip()
+            for a in args[1:]:
+                acc = f"np.{'maximum' if low == 'max' else 'minimum'}({acc}, {a.strip()})"
+            return acc
+        if low in _KERNEL_INTRINSICS or low in callables:
+            return f"{name}({','.join(args)})"
+        raise NotImplementedError(f"'{name}' is not array-safe")
+
+    return python_ops(rewrite_refs(expr, fn))
+
+
+def _numba_scalar_type(type_spec: Optional[str], kind: Optional[int]) -> str:
+    if type_spec == "integer":
+        return np.dtype(DTYPE_MAP.int_from_kind(kind)).name
+    return np.dtype(DTYPE_MAP.real_from_kind(kind)).name
+
+
+def _emit_elemental(fun: Function, callables: Set[str], jit: bool) -> List[str]:
+    # ELEMENTAL functions take and return arrays: as a whole-array kernel when the
+    # body allows it, otherwise as a per-element ufunc over the scalar translation.
+    ret = next((d for d in fun.declarations if d.name.lower() == fun.return_name.lower()), None)
+    if ret is None or ret.type_spec not in ("real", "integer", "logical"):
+        return _emit_routine(fun, fun.name, vectorize=True)
+    dt = _py_type_for(ret)
+    kernel = elemental_kernel_body(list(fun.body), lambda e: _kernel_expr(e, callables))
+    if kernel is not None:
+        stmts, masked = kernel
+        sig, prelude = _emit_args(fun.args)
+        out = [
+            f"@elemental({dt}{', masked=True' if masked else ''})",
+            _at(f"def {fun.name}({sig}):", fun.line),
+        ]
+        out.extend(prelude)
+        out.extend(_emit_locals(fun))
+        out.extend(f"    {st}" for st in stmts)
         out.append(f"    return {fun.return_name}")
         out.append("")
+    else:
+        out = [f"@elemental_ufunc({dt}, nin={len(fun.args)})"]
+        out += _emit_routine(fun, fun.name, vectorize=True, parallel=False)
+    if jit and ret.type_spec != "logical":
+        # A real NumPy ufunc compiled for the declared kinds
+        arg_types = ", ".join(_numba_scalar_type(a.type_spec, a.kind) for a in fun.args)
+        signature = f"{_numba_scalar_type(ret.type_spec, ret.kind)}({arg_types})"
+        jit_name = f"_{fun.name}_ufunc"
+        out.append(f'@vectorize(["{signature}"], cache=True)')
+        out.extend(_emit_routine(fun, jit_name, vectorize=False, numba=True))
+        out.append(f"{fun.name} = jit_dispatch({jit_name}, {fun.name})")
+        out.append("")
+    return out
 
-    return "\n".join(out)
 
+BACKENDS = ("numpy", "numba")
 
-def write_project_python(ir: ProjectIR, out_dir: Path) -> List[Path]:
+
+def byref_call_table(modules: Iterable[Module]) -> Dict[str, List[Argument]]:
+    # Subroutines with OUT/INOUT scalars: their CALL sites are rewritten for the calling convention
+    return {
+        s.name.lower(): s.args
+        for mod in modules
+        for s in mod.subroutines
+        if any(a.byref for a in s.args)
+    }
+
+
+def generate_module(
+    mod: Module,
+    vectorize: bool = True,
+    backend: str = "numpy",
+    convention: str = "ref",
+    checks: bool = True,
+    calls: Optional[Dict[str, List[Argument]]] = None,
+    workspace: bool = True,
+) -> str:
+    lines = module_lines(
+        mod,
+        vectorize=vectorize,
+        backend=backend,
+        convention=convention,
+        checks=checks,
+        calls=calls,
+        workspace=workspace,
+    )
+    return "\n".join(lines)
+
+
+def module_lines(
+    mod: Module,
+    vectorize: bool = True,
+    backend: str = "numpy",
+    convention: str = "ref",
+    checks: bool = True,
+    calls: Optional[Dict[str, List[Argument]]] = None,
+    workspace: bool = True,
+) -> List[str]:
+    # Generated source as a list of lines (joined with "\n"); translated lines are SourceLines
+    # (see line_map).
+    # workspace=False allocates local arrays with np.zeros on every call (the pre-pooling output).
+    # `calls` adds subroutines from other modules (see byref_call_table) whose CALL sites need
+    # rewriting
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    if convention not in CONVENTIONS:
+        raise ValueError(
+            f"Unknown calling convention: {convention} "
+            f"(expected one of {', '.join(CONVENTIONS)})"
+        )
+    calls = {**(calls or {}), **byref_call_table([mod])}
+    opts = dict(convention=convention, checks=checks, calls=calls)
+    out = [HEADER]
+    plan = plan_numba(mod, convention) if backend == "numba" else {}
+    elementals = {f.name.lower() for f in mod.functions if f.is_elemental}
+    if elementals:
+        out.append("from fort2py.ufuncs import elemental, elemental_ufunc\n")
+    if backend == "numba":
+        out.append("from fort2py.jit import njit, jit_dispatch, vectorize\n")
+    pooled = workspace and any(
+        any(_local_arrays(u)) for u in mod.subroutines + mod.functions if not u.is_elemental
+    )
+    if pooled:
+        out.append("from fort2py.workspace import Workspace\n")
+    if any(has_parallel_loops(u.body) for u in mod.subroutines + mod.functions):
+        out.append("from fort2py.parallel import parallel_do\n")
+    out.append(f"# Module: {mod.name}")
+    for unit in list(mod.subroutines) + list(mod.functions):
+        if isinstance(unit, Function) and unit.is_elemental:
+            jit = backend == "numba" and plan[unit.name] is None
+            out.extend(_emit_elemental(unit, elementals, jit=jit))
+            continue
+        # Plain NumPy version; with the numba backend it is also the fallback
+        if pooled:
+            out.extend(_emit_workspace(unit))
+        out.extend(_emit_routine(unit, unit.name, vectorize, pool=pooled, **opts))
+        if backend == "numba" and plan[unit.name] is None:
+            # Scalar loops compile best under Numba, so the JIT variant is not vectorized
+            jit_name = f"_{unit.name}_jit"
+            out.append("@njit(cache=True)")
+            out.extend(_emit_routine(unit, jit_name, vectorize=False, numba=True, **opts))
+            out.append(f"{unit.name} = jit_dispatch({jit_name}, {unit.name})")
+            out.append("")
+
+    return out
+
+
+def write_project_python(
+    ir: ProjectIR,
+    out_dir: Path,
+    only: Optional[Set[str]] = None,
+    vectorize: bool = True,
+    backend: str = "numpy",
+    convention: str = "ref",
+    checks: bool = True,
+    workspace: bool = True,
+) -> List[Path]:
+    # `only` restricts generation to these (lower-case) module names; other outputs are not touched.
+    # Each module gets a source map (<module>.py.map) back to its Fortran file.
     written: List[Path] = []
-    for mod in ir.modules.values():
-        code = generate_module(mod)
+    calls = byref_call_table(ir.modules.values())
+    for key, mod in ir.modules.items():
+        if only is not None and key not in only:
+            continue
+        lines = module_lines(
+            mod,
+            vectorize=vectorize,
+            backend=backend,
+            convention=convention,
+            checks=checks,
+            calls=calls,
+            workspace=workspace,
+        )
         p = out_dir / f"{mod.name.lower()}.py"
-        write_text(p, code)
+        write_text(p, "\n".join(lines))
+        source = str(Path(mod.path).resolve()) if mod.path else None
+        SourceMap(p, source, line_map(lines)).write()
         written.append(p)
     return written
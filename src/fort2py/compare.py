@@ -0,0 +1,374 @@
+from __future__ import annotations
+import io
+import math
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Streaming, number-aware comparison of program outputs.
+# Both outputs are read in chunks and split into whitespace-separated tokens. Byte-equal
+# tokens are accepted without parsing; the rest are parsed as numbers in bulk (Fortran D
+# exponents and exponent-less forms like 1.5-310 included) and checked against the
+# tolerances. Any other difference is a mismatch. Memory is bounded by the chunk size.
+# Unformatted (binary) outputs are memory-mapped and compared as arrays, slice by slice.
+
+CHUNK_SIZE = 1 << 20
+Source = Union[str, bytes, Path, BinaryIO]
+
+_re_token = re.compile(rb"\S+")
+# gfortran drops the E when a three-digit exponent does not fit the field: 1.234-310
+_re_bare_exp = re.compile(rb"^([+-]?(?:\d+\.?\d*|\.\d+))([+-]\d+)$")
+
+
+@dataclass(frozen=True)
+class Tolerance:
+    # Numbers a (expected) and b (actual) match if |a - b| <= atol + rtol*|a|
+    # or they are at most `ulps` representable float64 values apart
+    atol: float = 0.0
+    rtol: float = 0.0
+    ulps: int = 0
+
+    @staticmethod
+    def from_dict(d: Optional[dict]) -> "Tolerance":
+        d = d or {}
+        return Tolerance(
+            atol=float(d.get("atol", 0.0)),
+            rtol=float(d.get("rtol", 0.0)),
+            ulps=int(d.get("ulps", 0)),
+        )
+
+
+# Default tolerance: numbers must be equal (frozen, so one instance serves every call)
+_EXACT = Tolerance()
+
+
+@dataclass
+class Mismatch:
+    token: int  # 0-based index of the first differing token
+    line: int  # 1-based
+    column: int  # 1-based, in bytes
+    expected: Optional[str]  # None: the expected output ended first
+    actual: Optional[str]
+    reason: str
+
+    def __str__(self) -> str:
+        return (
+            f"line {self.line}, column {self.column} (token {self.token}): "
+            f"expected {self.expected!r}, got {self.actual!r} ({self.reason})"
+        )
+
+
+class _Batch:
+    # Tokens of one chunk, plus what is needed to locate a token inside it after the fact
+    __slots__ = ("tokens", "data", "line", "col")
+
+    def __init__(self, tokens: List[bytes], data: bytes, line: int, col: int):
+        self.tokens = tokens
+        self.data = data
+        self.line = line
+        self.col = col
+
+    def locate(self, j: int) -> Tuple[int, int]:
+        for k, m in enumerate(_re_token.finditer(self.data)):
+            if k == j:
+                off = m.start()
+                nl = self.data.rfind(b"\n", 0, off)
+                line = self.line + self.data.count(b"\n", 0, off)
+                return line, (off - nl if nl >= 0 else self.col + off + 1)
+        raise IndexError(j)
+
+
+def _open(src: Source) -> BinaryIO:
+    if isinstance(src, str):
+        return io.BytesIO(src.encode("utf-8"))
+    if isinstance(src, (bytes, bytearray)):
+        return io.BytesIO(bytes(src))
+    if isinstance(src, Path):
+        return open(src, "rb")
+    return src
+
+
+def _batches(f: BinaryIO, chunk_size: int) -> Iterator[_Batch]:
+    line, col = 1, 0
+    carry = b""
+    while True:
+        chunk = f.read(chunk_size)
+        data = carry + chunk
+        if not chunk:
+            if data:
+                yield _Batch(data.split(), data, line, col)
+            return
+        # A token may continue in the next chunk: hold back everything after the last whitespace
+        cut = max(data.rfind(c) for c in (b" ", b"\n", b"\t", b"\r", b"\f", b"\v")) + 1
+        data, carry = data[:cut], data[cut:]
+        if data:
+            yield _Batch(data.split(), data, line, col)
+            nl = data.rfind(b"\n")
+            line += data.count(b"\n")
+            col = len(data) - nl - 1 if nl >= 0 else col + len(data)
+
+
+def _number(t: bytes) -> Optional[float]:
+    t = t.replace(b"D", b"E").replace(b"d", b"e")
+    m = _re_bare_exp.match(t)
+    if m:
+        t = m.group(1) + b"E" + m.group(2)
+    try:
+        return float(t)
+    except ValueError:
+        return None
+
+
+def _parse(tokens: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    # float64 per token, and which tokens are numbers at all (NaN is a value: NaN vs nan)
+    try:
+        x = np.fromiter(map(float, tokens), np.float64, len(tokens))
+        return x, np.ones(len(tokens), bool)
+    except ValueError:
+        # Fortran-only spellings or text somewhere in the batch
+        vals = [_number(t) for t in tokens]
+        ok = np.array([v is not None for v in vals], bool)
+        return np.array([np.nan if v is None else v for v in vals], np.float64), ok
+
+
+def _ulp_distance(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # Map float bit patterns (float64 or float32, both the same) onto a monotonic unsigned
+    # line; the difference counts ULPs of that type
+    uint = np.uint32 if a.dtype == np.float32 else np.uint64
+
+    def key(x: np.ndarray) -> np.ndarray:
+        u = x.view(uint)
+        top = uint(1 << (8 * u.itemsize - 1))
+        # -0.0 and +0.0 both land on `top`
+        return np.where(u >= top, top - (u & ~top), top + u)
+
+    ka, kb = key(a), key(b)
+    return np.where(ka > kb, ka - kb, kb - ka)
+
+
+def _check(exp: List[bytes], act: List[bytes], tol: Tolerance) -> Optional[Tuple[int, str]]:
+    # Index and reason of the first mismatching token pair, or None
+    if exp == act:
+        return None
+    diff = np.array([i for i, (p, q) in enumerate(zip(exp, act, strict=True)) if p != q])
+    x, ok_x = _parse([exp[i] for i in diff])
+    y, ok_y = _parse([act[i] for i in diff])
+    numeric = ok_x & ok_y
+    with np.errstate(invalid="ignore", over="ignore"):
+        within = np.abs(x - y) <= tol.atol + tol.rtol * np.abs(x)
+        close = numeric & (within | (x == y) | (np.isnan(x) & np.isnan(y)))
+        if tol.ulps:
+            close |= numeric & (_ulp_distance(x, y) <= np.uint64(tol.ulps))
+    bad = np.flatnonzero(~close)
+    if not bad.size:
+        return None
+    k = bad[0]
+    if not numeric[k]:
+        return int(diff[k]), "text differs"
+    return int(diff[k]), f"|difference| {abs(x[k] - y[k]):.3g} exceeds tolerance"
+
+
+def compare_outputs(
+    expected: Source, actual: Source, tol: Tolerance = _EXACT, chunk_size: int = CHUNK_SIZE
+) -> Optional[Mismatch]:
+    """
+    Compare two outputs token by token and return the first mismatch (None if they match).
+    Sources are str, bytes, a Path or a binary file object; files are read chunk_size bytes
+    at a time.
+    """
+    fe, fa = _open(expected), _open(actual)
+    try:
+        it_e, it_a = _batches(fe, chunk_size), _batches(fa, chunk_size)
+        # Pending tokens of the current batch on each side; offsets index into batch.tokens
+        be: Optional[_Batch] = None
+        ba: Optional[_Batch] = None
+        oe = oa = 0
+        seen = 0
+        while True:
+            if be is None or oe == len(be.tokens):
+                be, oe = next(it_e, None), 0
+            if ba is None or oa == len(ba.tokens):
+                ba, oa = next(it_a, None), 0
+            if be is None or ba is None:
+                if be is None and ba is None:
+                    return None
+                # One output ended first
+                if be is None:
+                    line, col = ba.locate(oa)
+                    return Mismatch(
+                        seen,
+                        line,
+                        col,
+                        None,
+                        ba.tokens[oa].decode("utf-8", "replace"),
+                        "expected output ended",
+                    )
+                line, col = be.locate(oe)
+                return Mismatch(
+                    seen,
+                    line,
+                    col,
+                    be.tokens[oe].decode("utf-8", "replace"),
+                    None,
+                    "actual output ended",
+                )
+            n = min(len(be.tokens) - oe, len(ba.tokens) - oa)
+            if n == 0:
+                continue
+            hit = _check(be.tokens[oe : oe + n], ba.tokens[oa : oa + n], tol)
+            if hit is not None:
+                j, reason = hit
+                line, col = be.locate(oe + j)
+                return Mismatch(
+                    seen + j,
+                    line,
+                    col,
+                    be.tokens[oe + j].decode("utf-8", "replace"),
+                    ba.tokens[oa + j].decode("utf-8", "replace"),
+                    reason,
+                )
+            oe += n
+            oa += n
+            seen += n
+    finally:
+        for f, src in ((fe, expected), (fa, actual)):
+            if isinstance(src, Path):
+                f.close()
+
+
+@dataclass(frozen=True)
+class ArraySpec:
+    """
+    An unformatted output file: `shape` values of `dtype` in `order`, starting `offset` bytes
+    into the file (4 skips the leading marker of a single-record sequential file; bytes past
+    the array are ignored). No shape: the whole rest of the file, flat.
+    """
+
+    path: str  # written by the Fortran program, relative to the case cwd
+    dtype: str = "float64"
+    shape: Tuple[int, ...] = ()
+    order: str = "F"
+    offset: int = 0
+    name: str = ""
+    # same layout, written by the Python entry; else returned by it under `label`
+    python: Optional[str] = None
+
+    @staticmethod
+    def from_dict(d: dict) -> "ArraySpec":
+        spec = ArraySpec(
+            path=str(d["path"]),
+            dtype=str(d.get("dtype", "float64")),
+            shape=tuple(int(n) for n in d.get("shape") or ()),
+            order=str(d.get("order", "F")).upper(),
+            offset=int(d.get("offset", 0)),
+            name=str(d.get("name", "")),
+            python=d.get("python"),
+        )
+        if spec.order not in ("F", "C"):
+            raise ValueError(f"Output {spec.label}: order must be F or C, got {spec.order}")
+        np.dtype(spec.dtype)
+        return spec
+
+    @property
+    def label(self) -> str:
+        return self.name or self.path
+
+
+@dataclass
+class ArrayMismatch:
+    output: str
+    # 1-based subscripts in the declared shape (flat without one); None: sizes differ
+    index: Optional[Tuple[int, ...]]
+    expected: Optional[str]
+    actual: Optional[str]
+    reason: str
+
+    def __str__(self) -> str:
+        if self.index is None:
+            return f"{self.output}: {self.reason}"
+        sub = ", ".join(map(str, self.index))
+        return f"{self.output}({sub}): expected {self.expected}, got {self.actual} ({self.reason})"
+
+
+def open_array(p: Path, spec: ArraySpec) -> np.ndarray:
+    # Flat, read-only memory map of the values in file order; nothing is read until sliced
+    dt = np.dtype(spec.dtype)
+    avail = p.stat().st_size - spec.offset
+    n = math.prod(spec.shape) if spec.shape else max(avail, 0) // dt.itemsize
+    if n * dt.itemsize > avail:
+        raise ValueError(
+            f"{p}: {max(avail, 0)} bytes after offset {spec.offset}, expected {n * dt.itemsize}"
+        )
+    if n == 0:
+        return np.empty(0, dt)
+    return np.memmap(p, dtype=dt, mode="r", offset=spec.offset, shape=(n,))
+
+
+def _bad_elements(a: np.ndarray, b: np.ndarray, tol: Tolerance) -> np.ndarray:
+    # Flat indices into a/b of values outside the tolerance
+    if a.dtype.kind == "c" or b.dtype.kind == "c":
+        # Real and imaginary parts are checked separately; report the element
+        x = np.asarray(a, np.complex128).view(np.float64)
+        y = np.asarray(b, np.complex128).view(np.float64)
+        return np.unique(_bad_elements(x, y, tol) // 2)
+    if a.dtype != b.dtype:
+        dt = np.result_type(a, b)
+        a, b = a.astype(dt), b.astype(dt)
+    if a.dtype.kind != "f":
+        # Integers and logicals: exact unless an absolute or relative tolerance allows more
+        x, y = a.astype(np.float64), b.astype(np.float64)
+        return np.flatnonzero((a != b) & (np.abs(x - y) > tol.atol + tol.rtol * np.abs(x)))
+    with np.errstate(invalid="ignore", over="ignore"):
+        close = (
+            (a == b)
+            | (np.isnan(a) & np.isnan(b))
+            | (np.abs(a - b) <= tol.atol + tol.rtol * np.abs(a))
+        )
+        if tol.ulps and a.dtype in (np.float32, np.float64):
+            close |= _ulp_distance(a, b) <= tol.ulps
+    return np.flatnonzero(~close)
+
+
+def compare_arrays(
+    expected: np.ndarray,
+    actual: np.ndarray,
+    tol: Tolerance = _EXACT,
+    shape: Sequence[int] = (),
+    order: str = "F",
+    name: str = "array",
+    chunk_size: int = CHUNK_SIZE,
+) -> Optional[ArrayMismatch]:
+    """
+    Compare two flat arrays in file order, chunk_size bytes of `expected` at a time, and return
+    the first element outside the tolerance (None if they match). Memory maps stay mapped:
+    only the current slices are paged in, and equal slices cost one comparison.
+    """
+    if expected.size != actual.size:
+        return ArrayMismatch(
+            name, None, None, None, f"{actual.size} values, expected {expected.size}"
+        )
+    step = max(1, chunk_size // max(expected.itemsize, 1))
+    for start in range(0, expected.size, step):
+        a = np.asarray(expected[start : start + step])
+        b = np.asarray(actual[start : start + step])
+        if np.array_equal(a, b):
+            continue
+        bad = _bad_elements(a, b, tol)
+        if not bad.size:
+            continue
+        k = start + int(bad[0])
+        x, y = expected[k].item(), actual[k].item()
+        if shape:
+            index = tuple(int(i) + 1 for i in np.unravel_index(k, tuple(shape), order=order))
+        else:
+            index = (k + 1,)
+        reason = (
+            "values differ"
+            if isinstance(x, int) and isinstance(y, int)
+            else f"|difference| {abs(x - y):.3g} exceeds tolerance"
+        )
+        return ArrayMismatch(name, index, repr(x), repr(y), reason)
+    return None
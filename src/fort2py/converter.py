@@ -1,21 +1,84 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 
 from .fortran_parser import parse_sources
+from .ir_cache import IRCache
+from .depgraph import DEPGRAPH_NAME, DepGraphState, build_use_graph, options_digest
+from .utils import file_digest
 from .semantics import Semantics
 from .codegen_python import write_project_python
 from .migration_notes import write_migration_notes
+from .numba_backend import numba_notes
+from .sourcemap import map_path
 
 
-def convert_project(files: List[Path], out_dir: Path, fail_on_unsupported: bool = False):
-    # Parse
-    ir = parse_sources(files)
+def convert_project(
+    files: List[Path],
+    out_dir: Path,
+    fail_on_unsupported: bool = False,
+    jobs: Optional[int] = None,
+    cache: Optional[IRCache] = None,
+    digests: Optional[Dict[Path, str]] = None,
+    incremental: bool = False,
+    compact_ir: bool = False,
+    vectorize: bool = True,
+    backend: str = "numpy",
+    convention: str = "ref",
+    checks: bool = True,
+    workspace: bool = True,
+):
+    # Source digests key the incremental USE-graph state (parse_sources hashes what the IR
+    # cache needs itself); a plain convert reads each file once, to parse it
+    if incremental:
+        known = digests or {}
+        digests = {p: known.get(p) or file_digest(p) for p in files}
+    # Parse (jobs > 1 parses files in a process pool; output is identical to the serial path).
+    # With a cache, files whose content hash is already stored are not parsed at all.
+    ir = parse_sources(files, jobs=jobs, cache=cache, digests=digests, compact=compact_ir)
     # Analyze semantics
     sema = Semantics(ir)
     sema.analyze()
-    # Codegen
-    written = write_project_python(ir, out_dir)
+    # Codegen; incremental runs only regenerate changed modules and their USE dependents.
+    # Changing any codegen option regenerates everything (callers and callees must agree).
+    state_path = out_dir / DEPGRAPH_NAME
+    only = None
+    if incremental:
+        options = options_digest(
+            vectorize=vectorize,
+            backend=backend,
+            convention=convention,
+            checks=checks,
+            workspace=workspace,
+        )
+        state = DepGraphState.load(state_path, options)
+        graph = build_use_graph(ir)
+        mod_digests = {key: digests[mod.path] for key, mod in ir.modules.items()}
+        present = {p.stem for p in out_dir.glob("*.py")}
+        only = state.plan(graph, mod_digests, outputs_present=present)
+        for name in state.removed(graph):
+            stale = out_dir / f"{name}.py"
+            stale.unlink(missing_ok=True)
+            map_path(stale).unlink(missing_ok=True)
+    written = write_project_python(
+        ir,
+        out_dir,
+        only=only,
+        vectorize=vectorize,
+        backend=backend,
+        convention=convention,
+        checks=checks,
+        workspace=workspace,
+    )
+    if incremental:
+        state.record(graph, mod_digests)
+        state.save()
+    else:
+        # Every module was rewritten, maybe with other options: recorded digests no longer
+        # describe the outputs, and the next incremental run starts from scratch
+        state_path.unlink(missing_ok=True)
     # Migration notes
+    if backend == "numba":
+        sema.migration_notes.update(numba_notes(ir, convention))
     write_migration_notes(sema, out_dir)
     return written
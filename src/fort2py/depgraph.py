@@ -0,0 +1,120 @@
+from __future__ import annotations
+import hashlib
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from .ir import Module, ProjectIR
+from .utils import write_text
+from .version import __version__
+
+
+DEPGRAPH_NAME = ".fort2py_depgraph.json"
+
+
+def module_uses(mod: Module) -> List[str]:
+    # Modules referenced by USE anywhere in the module, including inside its procedures.
+    names = {u.module.lower() for u in mod.uses}
+    for unit in list(mod.subroutines) + list(mod.functions):
+        names.update(u.module.lower() for u in unit.uses)
+    names.discard(mod.name.lower())
+    return sorted(names)
+
+
+def build_use_graph(ir: ProjectIR) -> Dict[str, List[str]]:
+    # module -> modules it uses (edges may point at modules outside the project)
+    return {key: module_uses(mod) for key, mod in ir.modules.items()}
+
+
+def dependents_closure(graph: Dict[str, List[str]], roots: Iterable[str]) -> Set[str]:
+    # roots plus every module that transitively USEs one of them
+    rev: Dict[str, Set[str]] = {}
+    for mod, uses in graph.items():
+        for u in uses:
+            rev.setdefault(u, set()).add(mod)
+    seen = set(roots)
+    queue = deque(seen)
+    while queue:
+        cur = queue.popleft()
+        for user in rev.get(cur, ()):
+            if user not in seen:
+                seen.add(user)
+                queue.append(user)
+    return seen
+
+
+def options_digest(**options) -> str:
+    # Codegen options that change generated code; records made under other options are stale
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class ModuleRecord:
+    digest: str
+    uses: List[str]
+
+
+@dataclass
+class DepGraphState:
+    """
+    USE graph and per-module source digests recorded by the previous conversion.
+    A different fort2py version or codegen options digest (see options_digest)
+    invalidates every record.
+    """
+
+    path: Path
+    version: str = __version__
+    modules: Dict[str, ModuleRecord] = field(default_factory=dict)
+    options: str = ""
+
+    @staticmethod
+    def load(path: Path, options: str = "") -> "DepGraphState":
+        if not path.exists():
+            return DepGraphState(path, options=options)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return DepGraphState(path, options=options)
+        if data.get("version") != __version__ or data.get("options", "") != options:
+            return DepGraphState(path, options=options)
+        mods = {
+            k: ModuleRecord(v["digest"], list(v["uses"]))
+            for k, v in data.get("modules", {}).items()
+        }
+        return DepGraphState(path, data["version"], mods, options)
+
+    def save(self):
+        data = {
+            "version": self.version,
+            "options": self.options,
+            "modules": {
+                k: {"digest": r.digest, "uses": r.uses} for k, r in sorted(self.modules.items())
+            },
+        }
+        write_text(self.path, json.dumps(data, indent=1))
+
+    def plan(
+        self,
+        graph: Dict[str, List[str]],
+        digests: Dict[str, str],
+        outputs_present: Optional[Set[str]] = None,
+    ) -> Set[str]:
+        # Modules to regenerate: new or changed sources, modules whose output is missing,
+        # and everything that transitively uses one of those or a module that disappeared.
+        dirty = {
+            m for m in graph
+            if m not in self.modules
+            or self.modules[m].digest != digests[m]
+            or (outputs_present is not None and m not in outputs_present)
+        }
+        removed = set(self.modules) - set(graph)
+        return dependents_closure(graph, dirty | removed) & set(graph)
+
+    def removed(self, graph: Dict[str, List[str]]) -> Set[str]:
+        return set(self.modules) - set(graph)
+
+    def record(self, graph: Dict[str, List[str]], digests: Dict[str, str]):
+        self.version = __version__
+        self.modules = {m: ModuleRecord(digests[m], uses) for m, uses in graph.items()}
@@ -0,0 +1,122 @@
+from __future__ import annotations
+import re
+from typing import Callable, List, Optional, Set, Tuple
+
+
+# Small helpers for rewriting Fortran expressions into Python+NumPy text.
+# They work on source text with balanced parentheses; anything they cannot
+# split safely raises NotImplementedError rather than guessing.
+
+_re_name_paren = re.compile(r"\b([A-Za-z_]\w*)\s*\(")
+_re_ident = re.compile(r"\b[A-Za-z_]\w*\b")
+_re_dexp = re.compile(r"(?<![\w.])(\d+\.\d*|\.\d+|\d+)[dD]([+-]?\d+)")
+_re_dotop = re.compile(r"\.(and|or|not|eqv|neqv|eq|ne|lt|le|gt|ge|true|false)\.", re.I)
+_DOTOPS = {
+    "and": " and ", "or": " or ", "not": " not ", "eqv": " == ", "neqv": " != ",
+    "eq": " == ", "ne": " != ", "lt": " < ", "le": " <= ", "gt": " > ", "ge": " >= ",
+    "true": "True", "false": "False",
+}
+
+# Elemental intrinsics with a direct NumPy ufunc (valid on scalars and arrays)
+NUMPY_ELEMENTAL = {
+    "abs": "np.abs", "sqrt": "np.sqrt", "exp": "np.exp", "log": "np.log", "log10": "np.log10",
+    "sin": "np.sin", "cos": "np.cos", "tan": "np.tan", "asin": "np.arcsin", "acos": "np.arccos",
+    "atan": "np.arctan", "sinh": "np.sinh", "cosh": "np.cosh", "tanh": "np.tanh",
+}
+
+
+def matching_paren(s: str, open_idx: int) -> int:
+    depth = 0
+    for i in range(open_idx, len(s)):
+        ch = s[i]
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def split_top_level(s: str, sep: str = ",") -> List[str]:
+    parts: List[str] = []
+    depth = 0
+    start = 0
+    for i, ch in enumerate(s):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(s[start:i])
+            start = i + 1
+    parts.append(s[start:])
+    return parts
+
+
+def identifiers(s: str) -> Set[str]:
+    return {t.lower() for t in _re_ident.findall(s)}
+
+
+def rewrite_refs(s: str, fn: Callable[[str, List[str]], str]) -> str:
+    # Replace every `name(args)` (innermost arguments first) by fn(name, rewritten_args).
+    out: List[str] = []
+    i = 0
+    while True:
+        m = _re_name_paren.search(s, i)
+        if not m:
+            out.append(s[i:])
+            break
+        open_idx = m.end() - 1
+        close = matching_paren(s, open_idx)
+        if close < 0:
+            raise NotImplementedError(f"Unbalanced parentheses: {s}")
+        args = [rewrite_refs(a, fn) for a in split_top_level(s[open_idx + 1 : close])]
+        out.append(s[i : m.start()])
+        out.append(fn(m.group(1), args))
+        i = close + 1
+    return "".join(out)
+
+
+def python_ops(s: str) -> str:
+    # Operators and literals: .and./.lt./..., '/=' and 1.0d0-style exponents
+    s = _re_dotop.sub(lambda m: _DOTOPS[m.group(1).lower()], s)
+    s = s.replace("/=", "!=")
+    return _re_dexp.sub(r"\1e\2", s)
+
+
+def zero_based(sub: str) -> str:
+    # Fortran 1-based subscript or section -> Python 0-based index or slice
+    sub = sub.strip()
+    if ":" in sub:
+        parts = [p.strip() for p in sub.split(":")]
+        if len(parts) == 3 and parts[2] and not parts[2].isdigit():
+            raise NotImplementedError(f"Array section stride must be a positive literal: {sub}")
+        parts[0] = zero_based(parts[0]) if parts[0] else ""
+        return ":".join(parts)
+    if sub.isdigit():
+        return str(int(sub) - 1)
+    if _re_ident.fullmatch(sub):
+        return f"{sub} - 1"
+    return f"({sub}) - 1"
+
+
+def split_assignment(s: str) -> Optional[Tuple[str, Optional[List[str]], str]]:
+    # `name = rhs` or `name(subs) = rhs` -> (name, subs or None, rhs); None if not an assignment
+    m = re.match(r"\s*([A-Za-z_]\w*)\s*", s)
+    if not m:
+        return None
+    name = m.group(1)
+    i = m.end()
+    subs = None
+    if i < len(s) and s[i] == "(":
+        close = matching_paren(s, i)
+        if close < 0:
+            return None
+        subs = split_top_level(s[i + 1 : close])
+        i = close + 1
+        while i < len(s) and s[i].isspace():
+            i += 1
+    if i < len(s) and s[i] == "=" and not s.startswith("=", i + 1):
+        return name, subs, s[i + 1 :].strip()
+    return None
@@ -1,9 +1,30 @@
 from __future__ import annotations
+import mmap
 import re
+import sys
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from re import Match, Pattern
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
 
-from .ir import ProjectIR, Module, Subroutine, Function, Program, Argument, VarDecl, UseStmt
+from .ir import (
+    ProjectIR,
+    Module,
+    Subroutine,
+    Function,
+    Program,
+    Argument,
+    VarDecl,
+    UseStmt,
+    SourceBuffer,
+    CompactBody,
+)
+from .fortran_expr import split_top_level
+from .utils import file_digest
+
+if TYPE_CHECKING:
+    from .ir_cache import IRCache
 
 
 # A light, line-oriented parser for MVP.
@@ -13,13 +34,12 @@ from .ir import ProjectIR, Module, Subroutine, Function, Program, Argument, VarD
 _re_comment = re.compile(r"!\s.*$")
 _re_ws = re.compile(r"^\s+")
 _re_module = re.compile(r"^\s*module\s+(\w+)", re.I)
-_re_end_module = re.compile(r"^\s*end\s+module\b", re.I)
-_re_subroutine = re.compile(r"^\s*(recursive\s+)?subroutine\s+(\w+)\s*\(([^)]*)\)", re.I)
-_re_function = re.compile(r"^\s*(recursive\s+)?(pure\s+|elemental\s+|)\s*function\s+(\w+)\s*\(([^)]*)\)", re.I)
-_re_end_sub = re.compile(r"^\s*end\s+subroutine\b", re.I)
-_re_end_fun = re.compile(r"^\s*end\s+function\b", re.I)
+_re_end_unit = re.compile(r"^\s*end\s+(module|subroutine|function|program)\b", re.I)
+_re_procedure = re.compile(
+    r"^\s*((?:(?:recursive|pure|elemental)\s+)*)(subroutine|function)\s+(\w+)\s*\(([^)]*)\)",
+    re.I,
+)
 _re_program = re.compile(r"^\s*program\s+(\w+)", re.I)
-_re_end_program = re.compile(r"^\s*end\s+program\b", re.I)
 _re_use = re.compile(r"^\s*use\s+(\w+)(\s*,\s*only\s*:\s*(.*))?", re.I)
 _re_implicit_none = re.compile(r"^\s*implicit\s+none", re.I)
 _re_decl = re.compile(
@@ -33,12 +53,118 @@ _re_attr_ptr = re.compile(r"\bpointer\b", re.I)
 _re_attr_save = re.compile(r"\bsave\b", re.I)
 _re_dims = re.compile(r"\(([^)]*)\)")
 _re_contains = re.compile(r"^\s*contains\b", re.I)
+_re_keyword = re.compile(r"\s*([A-Za-z]\w*)")
+
+# First keyword of a statement -> (statement kind, the one regex that decides it).
+# Lines whose first word is not listed here are executable statements.
+_KEYWORD_DISPATCH: Dict[str, Tuple[str, Pattern[str]]] = {
+    "module": ("module", _re_module),
+    "end": ("end", _re_end_unit),
+    "program": ("program", _re_program),
+    "subroutine": ("procedure", _re_procedure),
+    "function": ("procedure", _re_procedure),
+    "recursive": ("procedure", _re_procedure),
+    "pure": ("procedure", _re_procedure),
+    "elemental": ("procedure", _re_procedure),
+    "contains": ("contains", _re_contains),
+    "use": ("use", _re_use),
+    "implicit": ("implicit_none", _re_implicit_none),
+    "real": ("decl", _re_decl),
+    "integer": ("decl", _re_decl),
+    "logical": ("decl", _re_decl),
+    "character": ("decl", _re_decl),
+}
+
+
+def classify_line(line: str) -> Tuple[str, Optional[Match[str]]]:
+    # Classifies a non-blank, comment-stripped line with at most one regex match.
+    k = _re_keyword.match(line)
+    if k:
+        rule = _KEYWORD_DISPATCH.get(k.group(1).lower())
+        if rule:
+            m = rule[1].match(line)
+            if m:
+                return rule[0], m
+    return "exec", None
 
 
 def strip_comment(line: str) -> str:
     return _re_comment.sub("", line).rstrip()
 
 
+def _iter_physical_lines(path: Path, use_mmap: bool = False) -> Iterator[str]:
+    if use_mmap:
+        with open(path, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                return
+            with mm:
+                for raw in iter(mm.readline, b""):
+                    yield raw.decode("utf-8", errors="ignore")
+    else:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            yield from f
+
+
+def _split_statements(line: str) -> List[str]:
+    # Split on ';' outside of quoted strings.
+    if ";" not in line:
+        return [line]
+    parts: List[str] = []
+    quote = None
+    start = 0
+    for i, ch in enumerate(line):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == ";":
+            parts.append(line[start:i])
+            start = i + 1
+    parts.append(line[start:])
+    return parts
+
+
+def iter_statements(path: Path, use_mmap: bool = False) -> Iterator[Tuple[int, str]]:
+    # Lazily yields (first physical line number, statement) with comments stripped,
+    # '&' continuations joined and ';'-separated statements split. Only the statement
+    # being assembled is held in memory.
+    pending: List[str] = []
+    start = 0
+    for lineno, raw in enumerate(_iter_physical_lines(path, use_mmap), 1):
+        line = strip_comment(raw.rstrip("\r\n"))
+        if pending:
+            if not line.strip():
+                # Blank or comment-only lines may sit between continuation lines
+                continue
+            lead = line.lstrip()
+            if lead[:5].lower() == "!$omp":
+                # Directive continuation: `!$omp& clause` or `!$omp clause`
+                line = lead = lead[5:].lstrip()
+            if lead.startswith("&"):
+                line = lead[1:]
+        else:
+            start = lineno
+        if line.endswith("&"):
+            pending.append(line[:-1])
+            continue
+        if pending:
+            pending.append(line)
+            line = "".join(pending)
+            pending = []
+        for stmt in _split_statements(line):
+            if stmt.strip():
+                yield start, stmt
+    if pending:
+        line = "".join(pending)
+        for stmt in _split_statements(line):
+            if stmt.strip():
+                yield start, stmt
+
+
 def parse_args(arglist: str) -> List[Argument]:
     args: List[Argument] = []
     tokens = [a.strip() for a in arglist.split(",")] if arglist.strip() else []
@@ -46,7 +172,7 @@ def parse_args(arglist: str) -> List[Argument]:
         if not t:
             continue
         # Intents/etc. are in separate declarations; MVP stores names here.
-        args.append(Argument(name=t))
+        args.append(Argument(name=sys.intern(t)))
     return args
 
 
@@ -54,17 +180,25 @@ def parse_use(line: str) -> Optional[UseStmt]:
     m = _re_use.match(line)
     if not m:
         return None
+    return _use_from_match(m)
+
+
+def _use_from_match(m: Match[str]) -> UseStmt:
     mod = m.group(1)
     only = m.group(3)
-    only_list = [x.strip() for x in only.split(",")] if only else None
-    return UseStmt(module=mod, only_list=only_list)
+    only_list = [sys.intern(x.strip()) for x in only.split(",")] if only else None
+    return UseStmt(module=sys.intern(mod), only_list=only_list)
 
 
 def parse_decl(line: str) -> Optional[List[VarDecl]]:
     m = _re_decl.match(line)
     if not m:
         return None
-    type_spec = m.group(1).lower()
+    return _decls_from_match(m)
+
+
+def _decls_from_match(m: Match[str]) -> List[VarDecl]:
+    type_spec = sys.intern(m.group(1).lower())
     kindtok = m.group(3)
     kind = None
     if kindtok:
@@ -76,16 +210,15 @@ def parse_decl(line: str) -> Optional[List[VarDecl]]:
 
     attrs = m.group(5) or ""
     names = m.group(6)
-    intent = None
-    if _re_attr_intent.search(attrs):
-        intent = _re_attr_intent.search(attrs).group(1).lower()
+    mi = _re_attr_intent.search(attrs)
+    intent = sys.intern(mi.group(1).lower()) if mi else None
     optional = _re_attr_optional.search(attrs) is not None
     alloc = _re_attr_alloc.search(attrs) is not None
     ptr = _re_attr_ptr.search(attrs) is not None
     save = _re_attr_save.search(attrs) is not None
 
     decls: List[VarDecl] = []
-    for raw in names.split(","):
+    for raw in split_top_level(names):
         tok = raw.strip()
         if not tok:
             continue
@@ -111,7 +244,7 @@ def parse_decl(line: str) -> Optional[List[VarDecl]]:
             VarDecl(
                 type_spec=type_spec,
                 kind=kind,
-                name=nm,
+                name=sys.intern(nm),
                 dims=dims,
                 intent=intent,  # applies per-line; For per-symbol overrides not in MVP
                 optional=optional,
@@ -124,92 +257,93 @@ def parse_decl(line: str) -> Optional[List[VarDecl]]:
     return decls
 
 
-def parse_file(path: Path, ir: ProjectIR):
-    lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
-    lines = [strip_comment(l) for l in lines]
-    i = 0
+def parse_file(path: Path, ir: ProjectIR, use_mmap: bool = False, compact: bool = False):
+    # compact=True stores bodies as offsets into one per-file SourceBuffer instead of str lists
+    buf = SourceBuffer() if compact else None
+
+    def new_body():
+        return CompactBody(buf) if buf is not None else []
+
     cur_mod: Optional[Module] = None
     cur_sub: Optional[Subroutine] = None
     cur_fun: Optional[Function] = None
     cur_prog: Optional[Program] = None
     in_spec = False
 
-    while i < len(lines):
-        line = lines[i]
-        i += 1
-        if not line.strip():
-            continue
-        if _re_module.match(line):
-            m = _re_module.match(line)
-            cur_mod = Module(name=m.group(1), path=path)
+    for lineno, line in iter_statements(path, use_mmap=use_mmap):
+        kind, m = classify_line(line)
+        if kind == "module":
+            cur_mod = Module(name=sys.intern(m.group(1)), path=path)
             ir.modules[cur_mod.name.lower()] = cur_mod
             in_spec = True
             continue
-        if _re_end_module.match(line):
-            cur_mod = None
+        if kind == "end":
+            unit = m.group(1).lower()
+            if unit == "module":
+                cur_mod = None
+            elif unit == "program":
+                cur_prog = None
+            elif unit == "subroutine":
+                cur_sub = None
+            else:
+                cur_fun = None
             in_spec = False
             continue
-        if _re_program.match(line):
-            m = _re_program.match(line)
-            cur_prog = Program(name=m.group(1), path=path)
+        if kind == "program":
+            cur_prog = Program(name=sys.intern(m.group(1)), path=path, body=new_body(), line=lineno)
             ir.programs[cur_prog.name.lower()] = cur_prog
             in_spec = True
             continue
-        if _re_end_program.match(line):
-            cur_prog = None
-            in_spec = False
-            continue
-        if _re_subroutine.match(line):
-            m = _re_subroutine.match(line)
-            sub = Subroutine(
-                name=m.group(2),
-                args=parse_args(m.group(3)),
-                body=[],
-                path=path,
-                parent_module=cur_mod.name if cur_mod else None,
-                is_recursive=bool(m.group(1)),
-            )
-            cur_sub = sub
-            if cur_mod:
-                cur_mod.subroutines.append(sub)
-            else:
-                # Free subroutine at file scope; unsupported in MVP for module scoping clarity
-                raise NotImplementedError("File-scope subroutines (not in a module) not supported in MVP")
-            in_spec = True
-            continue
-        if _re_end_sub.match(line):
-            cur_sub = None
-            in_spec = False
-            continue
-        if _re_function.match(line):
-            m = _re_function.match(line)
-            fun = Function(
-                name=m.group(3),
-                args=parse_args(m.group(4)),
-                return_name=m.group(3),
-                body=[],
-                path=path,
-                parent_module=cur_mod.name if cur_mod else None,
-                is_recursive=bool(m.group(1)),
-                is_elemental="elemental" in line.lower(),
-                is_pure="pure" in line.lower(),
-            )
-            cur_fun = fun
-            if cur_mod:
-                cur_mod.functions.append(fun)
+        if kind == "procedure":
+            prefix = m.group(1).lower().split()
+            name = sys.intern(m.group(3))
+            if m.group(2).lower() == "subroutine":
+                sub = Subroutine(
+                    name=name,
+                    args=parse_args(m.group(4)),
+                    body=new_body(),
+                    path=path,
+                    parent_module=cur_mod.name if cur_mod else None,
+                    is_recursive="recursive" in prefix,
+                    is_elemental="elemental" in prefix,
+                    is_pure="pure" in prefix,
+                    line=lineno,
+                )
+                cur_sub = sub
+                if cur_mod:
+                    cur_mod.subroutines.append(sub)
+                else:
+                    # Free subroutine at file scope; unsupported in MVP for module scoping clarity
+                    raise NotImplementedError(
+                        "File-scope subroutines (not in a module) not supported in MVP"
+                    )
             else:
-                raise NotImplementedError("File-scope functions (not in a module) not supported in MVP")
+                fun = Function(
+                    name=name,
+                    args=parse_args(m.group(4)),
+                    return_name=name,
+                    body=new_body(),
+                    path=path,
+                    parent_module=cur_mod.name if cur_mod else None,
+                    is_recursive="recursive" in prefix,
+                    is_elemental="elemental" in prefix,
+                    is_pure="pure" in prefix,
+                    line=lineno,
+                )
+                cur_fun = fun
+                if cur_mod:
+                    cur_mod.functions.append(fun)
+                else:
+                    raise NotImplementedError(
+                        "File-scope functions (not in a module) not supported in MVP"
+                    )
             in_spec = True
             continue
-        if _re_end_fun.match(line):
-            cur_fun = None
-            in_spec = False
-            continue
-        if _re_contains.match(line):
+        if kind == "contains":
             in_spec = False
             continue
-        if _re_use.match(line):
-            use = parse_use(line)
+        if kind == "use":
+            use = _use_from_match(m)
             if cur_sub:
                 cur_sub.uses.append(use)
             elif cur_fun:
@@ -219,11 +353,13 @@ def parse_file(path: Path, ir: ProjectIR):
             elif cur_prog:
                 cur_prog.uses.append(use)
             continue
-        if _re_implicit_none.match(line):
+        if kind == "implicit_none":
             # tracked implicitly; semantics phase can verify enforcement
             continue
-        decl = parse_decl(line)
+        decl = _decls_from_match(m) if kind == "decl" else None
         if decl:
+            for d in decl:
+                d.line = lineno
             if cur_sub:
                 cur_sub.declarations.extend(decl)
             elif cur_fun:
@@ -240,12 +376,10 @@ def parse_file(path: Path, ir: ProjectIR):
             continue
 
         # Otherwise, treat as executable line if inside body
-        if cur_sub is not None:
-            cur_sub.body.append(line)
-        elif cur_fun is not None:
-            cur_fun.body.append(line)
-        elif cur_prog is not None:
-            cur_prog.body.append(line)
+        unit = cur_sub or cur_fun or cur_prog
+        if unit is not None:
+            unit.body.append(line)
+            unit.body_lines.append(lineno)
         else:
             # Non-empty outside any context
             # Accept preprocessor lines silently? Safer to fail for MVP.
@@ -253,11 +387,59 @@ def parse_file(path: Path, ir: ProjectIR):
                 raise NotImplementedError("Preprocessor directives not supported in MVP.")
             raise NotImplementedError(f"Unrecognized or unsupported line outside any scope: {line}")
 
+    if buf is not None:
+        buf.freeze()
     return ir
 
 
-def parse_sources(sources: List[Path]) -> ProjectIR:
+def _parse_one(path: Path, compact: bool = False) -> ProjectIR:
+    # Worker entry point: a partial IR holding only this file's units.
+    return parse_file(path, ProjectIR(sources=[path]), compact=compact)
+
+
+def merge_partial(ir: ProjectIR, part: ProjectIR):
+    # Same effect as parsing into `ir` directly: later files win on name clashes.
+    ir.modules.update(part.modules)
+    ir.programs.update(part.programs)
+
+
+def parse_sources(
+    sources: List[Path],
+    jobs: Optional[int] = None,
+    cache: Optional[IRCache] = None,
+    digests: Optional[Dict[Path, str]] = None,
+    compact: bool = False,
+) -> ProjectIR:
     ir = ProjectIR(sources=sources)
-    for p in sources:
-        parse_file(p, ir)
+    parallel = bool(jobs and jobs > 1)
+    if cache is None and (not parallel or len(sources) <= 1):
+        for p in sources:
+            parse_file(p, ir, compact=compact)
+        return ir
+
+    parts: List[Optional[ProjectIR]] = [None] * len(sources)
+    keys: List[str] = []
+    if cache is not None:
+        # Known digests (e.g. from the scan manifest) avoid re-reading unchanged files
+        keys = [(digests or {}).get(p) or file_digest(p) for p in sources]
+        parts = [cache.get(k, p, compact) for k, p in zip(keys, sources, strict=True)]
+    misses = [i for i, part in enumerate(parts) if part is None]
+    if parallel and len(misses) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            # map() yields in submission order, so the merge is deterministic and the
+            # first failing file (in source order) raises, as in the serial path.
+            chunksize = max(1, len(misses) // (jobs * 4))
+            worker = partial(_parse_one, compact=compact)
+            parsed = pool.map(worker, [sources[i] for i in misses], chunksize=chunksize)
+            for i, part in zip(misses, parsed, strict=True):
+                parts[i] = part
+    else:
+        for i in misses:
+            parts[i] = _parse_one(sources[i], compact=compact)
+    if cache is not None and misses:
+        for i in misses:
+            cache.put(keys[i], parts[i], compact)
+        cache.prune()
+    for part in parts:
+        merge_partial(ir, part)
     return ir
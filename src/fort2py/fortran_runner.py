@@ -1,18 +1,336 @@
 from __future__ import annotations
-from pathlib import Path
-from typing import List, Optional
+import hashlib
+import json
+import os
+import re
 import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .utils import file_digest, run_cmd
+
+
+# Incremental gfortran builds for the verification harness.
+# Sources are scanned for MODULE/USE statements (a regex scan: reference code may use
+# constructs the converter's parser rejects), compiled one object per file in dependency
+# order on a thread pool, and each object plus the .mod files it writes is cached under a
+# key of (compiler, flags, source digest, digests of the files it INCLUDEs or #includes,
+# digests of the .mod files it reads).
+# The executable is relinked only when the set of objects or the link flags change.
+
+BASE_FLAGS = ["-O2", "-fimplicit-none"]
+BUILD_CACHE_DIR_NAME = ".fort2py_build"
+# Bump when the key derivation or cache layout changes
+BUILD_FORMAT = 2
+FORTRAN_SUFFIXES = (".f90", ".f95", ".f03", ".f08", ".F90")
+
+_re_module = re.compile(
+    r"^\s*module\s+(?!procedure\b|function\b|subroutine\b)(\w+)\s*(?:!.*)?$", re.I | re.M
+)
+_re_use = re.compile(
+    r"^\s*use\b\s*(?:,\s*(intrinsic|non_intrinsic)\s*)?(?:::)?\s*(\w+)", re.I | re.M
+)
+# Fortran INCLUDE 'file' and cpp #include "file" / <file>
+_re_include = re.compile(
+    r"""^\s*(?:#\s*include\s*[<"]([^>"]+)[>"]|include\s*(['"])(.+?)\2)""", re.I | re.M
+)
+
+
+@dataclass
+class SourceUnit:
+    path: Path
+    provides: List[str]  # module names (lower case) this file defines
+    uses: List[str]  # module names it uses, including ones outside the project
+    digest: str
+    deps: List[Path] = field(default_factory=list)  # project files providing those modules
+    includes: List[Path] = field(default_factory=list)  # files it includes, transitively
+
+
+@dataclass
+class BuildResult:
+    exe: Path
+    compiled: List[Path] = field(default_factory=list)
+    cached: List[Path] = field(default_factory=list)
+    linked: bool = False
+    seconds: float = 0.0
+
+
+def _read(p: Path) -> str:
+    return p.read_text(encoding="utf-8", errors="ignore")
+
+
+def _scan_includes(path: Path, text: str, include_dirs: Sequence[Path]) -> List[Path]:
+    # Included files, searched like the compiler does: the including file's directory, then
+    # the -I directories. Names found nowhere are system headers, left out like external modules
+    found: Dict[Path, str] = {}
+    todo = [(path, text)]
+    while todo:
+        p, t = todo.pop()
+        for m in _re_include.finditer(t):
+            name = m.group(1) or m.group(3)
+            for d in (p.parent, *include_dirs):
+                f = (d / name).resolve()
+                if f.is_file():
+                    if f not in found:
+                        found[f] = _read(f)
+                        todo.append((f, found[f]))
+                    break
+    return sorted(found)
+
+
+def scan_units(sources: Sequence[Path], include_dirs: Sequence[Path] = ()) -> List[SourceUnit]:
+    units = []
+    for p in sources:
+        own = _read(p)
+        includes = _scan_includes(p, own, include_dirs)
+        # MODULE and USE lines may sit in an included file
+        text = "\n".join([own, *map(_read, includes)])
+        provides = sorted({m.lower() for m in _re_module.findall(text)})
+        used = {m.lower() for kind, m in _re_use.findall(text) if kind.lower() != "intrinsic"}
+        uses = sorted(used - set(provides))
+        units.append(SourceUnit(p, provides, uses, file_digest(p), includes=includes))
+    owner: Dict[str, Path] = {}
+    for u in units:
+        for m in u.provides:
+            if m in owner:
+                raise RuntimeError(f"Module {m} is defined in both {owner[m]} and {u.path}")
+            owner[m] = u.path
+    for u in units:
+        # Modules nobody in the project provides are intrinsic or come from -I paths
+        u.deps = sorted({owner[m] for m in u.uses if m in owner})
+    return units
+
+
+def build_order(units: Sequence[SourceUnit]) -> List[SourceUnit]:
+    # Topological order (Kahn); ties keep the input order, so builds are reproducible
+    by_path = {u.path: u for u in units}
+    pending = {u.path: len(u.deps) for u in units}
+    users: Dict[Path, List[Path]] = {}
+    for u in units:
+        for d in u.deps:
+            users.setdefault(d, []).append(u.path)
+    ready = [u.path for u in units if not u.deps]
+    order: List[SourceUnit] = []
+    while ready:
+        p = ready.pop(0)
+        order.append(by_path[p])
+        for q in users.get(p, ()):
+            pending[q] -= 1
+            if pending[q] == 0:
+                ready.append(q)
+    if len(order) != len(units):
+        cyc = sorted(str(p) for p, n in pending.items() if n)
+        raise RuntimeError(f"Circular USE dependencies between: {', '.join(cyc)}")
+    return order
+
+
+def _compiler_id(compiler: str) -> str:
+    out = subprocess.run([compiler, "--version"], capture_output=True, text=True, check=True).stdout
+    return out.splitlines()[0] if out else compiler
+
+
+def _split_flags(flags: Sequence[str]) -> Tuple[List[str], List[str]]:
+    # Libraries and linker options only matter at link time
+    link = [f for f in flags if f.startswith(("-l", "-L", "-Wl,"))]
+    return [f for f in flags if f not in link], link
+
+
+_PATH_FLAGS = ("-I", "-L", "-J")
+
+
+def _absolute_flags(flags: Sequence[str], base: Path) -> List[str]:
+    # -I/-L/-J <dir> and -I/-L/-J<dir> with relative directories made absolute against `base`
+    out = []
+    for i, f in enumerate(flags):
+        if i and flags[i - 1] in _PATH_FLAGS:
+            out.append(str(base / f))
+        elif f[:2] in _PATH_FLAGS and len(f) > 2:
+            out.append(f[:2] + str(base / f[2:]))
+        else:
+            out.append(f)
+    return out
+
+
+def _include_dirs(flags: Sequence[str]) -> List[Path]:
+    # -I<dir> and -I <dir> of flags already made absolute
+    dirs = []
+    for i, f in enumerate(flags):
+        if f == "-I" and i + 1 < len(flags):
+            dirs.append(Path(flags[i + 1]))
+        elif f.startswith("-I") and len(f) > 2:
+            dirs.append(Path(f[2:]))
+    return dirs
+
+
+class FortranBuild:
+    """
+    One executable built from a set of Fortran sources.
+    Objects and .mod files go to build_dir; cached artifacts live in cache_dir and are
+    shared by every build that uses the same compiler. Relative -I/-L/-J directories in
+    `flags` are relative to `flags_dir` (default: the current directory).
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[Path],
+        exe: Path,
+        build_dir: Path,
+        flags: Optional[Sequence[str]] = None,
+        cache_dir: Optional[Path] = None,
+        compiler: str = "gfortran",
+        flags_dir: Optional[Path] = None,
+    ):
+        if shutil.which(compiler) is None:
+            raise RuntimeError(f"{compiler} not found in PATH; required for verification harness.")
+        self.sources = [Path(s).resolve() for s in sources]
+        # Absolute: the compiler runs with build_dir as its working directory
+        self.exe = Path(exe).resolve()
+        self.build_dir = Path(build_dir).resolve()
+        # The compiler runs in build_dir, so relative directories are fixed here; the key
+        # then sees the directory actually searched
+        base = Path(flags_dir).resolve() if flags_dir is not None else Path.cwd()
+        flags = _absolute_flags(list(BASE_FLAGS) + list(flags or []), base)
+        self.compile_flags, self.link_flags = _split_flags(flags)
+        self.cache_dir = Path(cache_dir).resolve() if cache_dir is not None else None
+        self.compiler = compiler
+        self.compiler_id = _compiler_id(compiler)
+
+    @property
+    def mod_dir(self) -> Path:
+        return self.build_dir / "mod"
+
+    def _object(self, src: Path) -> Path:
+        # Same-named files in different directories must not share an object
+        tag = hashlib.sha256(str(src).encode("utf-8")).hexdigest()[:8]
+        return self.build_dir / "obj" / f"{src.stem}-{tag}.o"
+
+    def _key(self, unit: SourceUnit, units: Dict[Path, SourceUnit]) -> str:
+        mods = []
+        for d in unit.deps:
+            for m in units[d].provides:
+                mods.append((m, file_digest(self.mod_dir / f"{m}.mod")))
+        incs = [(str(p), file_digest(p)) for p in unit.includes]
+        blob = json.dumps([BUILD_FORMAT, self.compiler_id, self.compile_flags, unit.digest, incs,
+                           sorted(mods)])
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _restore(self, key: str, unit: SourceUnit) -> bool:
+        if self.cache_dir is None:
+            return False
+        entry = self.cache_dir / "objects" / key[:2] / key
+        files = [entry / "unit.o"] + [entry / f"{m}.mod" for m in unit.provides]
+        if not all(f.exists() for f in files):
+            return False
+        shutil.copyfile(files[0], self._object(unit.path))
+        for m, f in zip(unit.provides, files[1:], strict=True):
+            shutil.copyfile(f, self.mod_dir / f"{m}.mod")
+        return True
+
+    def _store(self, key: str, unit: SourceUnit):
+        if self.cache_dir is None:
+            return
+        entry = self.cache_dir / "objects" / key[:2] / key
+        if entry.exists():
+            return
+        # Assemble in a temporary directory and rename, so a half-written entry is never used
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=entry.parent, prefix=".tmp"))
+        try:
+            shutil.copyfile(self._object(unit.path), tmp / "unit.o")
+            for m in unit.provides:
+                shutil.copyfile(self.mod_dir / f"{m}.mod", tmp / f"{m}.mod")
+            os.replace(tmp, entry)
+        except OSError:
+            # Lost a race with another build storing the same key
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def _compile(self, unit: SourceUnit, units: Dict[Path, SourceUnit]) -> Tuple[str, bool]:
+        key = self._key(unit, units)
+        if self._restore(key, unit):
+            return key, True
+        mods = str(self.mod_dir)
+        cmd = [self.compiler, "-c", *self.compile_flags, "-J", mods, "-I", mods]
+        cmd += ["-o", str(self._object(unit.path)), str(unit.path)]
+        try:
+            run_cmd(cmd, cwd=self.build_dir)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"gfortran failed on {unit.path}:\n{e.stderr}") from e
+        self._store(key, unit)
+        return key, False
+
+    def build(self, jobs: Optional[int] = None) -> BuildResult:
+        t0 = time.perf_counter()
+        (self.build_dir / "obj").mkdir(parents=True, exist_ok=True)
+        self.mod_dir.mkdir(parents=True, exist_ok=True)
+        scanned = scan_units(self.sources, _include_dirs(self.compile_flags))
+        units = {u.path: u for u in build_order(scanned)}
+        res = BuildResult(self.exe)
+        keys: Dict[Path, str] = {}
+        done: Set[Path] = set()
+        # A file is submitted once every file it depends on has finished (its .mod files exist)
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+            running: Dict[Future, Path] = {}
+            waiting = list(units)
+            while waiting or running:
+                for p in [p for p in waiting if all(d in done for d in units[p].deps)]:
+                    waiting.remove(p)
+                    running[pool.submit(self._compile, units[p], units)] = p
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for f in finished:
+                    p = running.pop(f)
+                    keys[p], hit = f.result()
+                    (res.cached if hit else res.compiled).append(p)
+                    done.add(p)
+        res.compiled.sort()
+        res.cached.sort()
+        res.linked = self._link(units, keys)
+        res.seconds = time.perf_counter() - t0
+        return res
+
+    def _link(self, units: Dict[Path, SourceUnit], keys: Dict[Path, str]) -> bool:
+        objects = [self._object(p) for p in self.sources]
+        parts = [BUILD_FORMAT, self.compiler_id, self.compile_flags, self.link_flags]
+        blob = json.dumps(parts + [[keys[p] for p in self.sources]])
+        key = hashlib.sha256(blob.encode("utf-8")).hexdigest()
+        stamp = self.build_dir / f"{self.exe.name}.link"
+        if self.exe.exists() and stamp.exists() and stamp.read_text(encoding="utf-8") == key:
+            return False
+        self.exe.parent.mkdir(parents=True, exist_ok=True)
+        cmd = [self.compiler, *self.compile_flags, "-o", str(self.exe), *map(str, objects)]
+        cmd += self.link_flags
+        try:
+            run_cmd(cmd, cwd=self.build_dir)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Linking {self.exe} failed:\n{e.stderr}") from e
+        stamp.write_text(key, encoding="utf-8")
+        return True
+
 
-from .utils import run_cmd
+def find_sources(src_dir: Path) -> List[Path]:
+    return sorted(p for p in src_dir.rglob("*") if p.suffix in FORTRAN_SUFFIXES and p.is_file())
 
 
-def compile_and_run_project(src_dir: Path, output_exe: Path, sources: Optional[List[Path]] = None, extra_flags: Optional[List[str]] = None):
-    if shutil.which("gfortran") is None:
-        raise RuntimeError("gfortran not found in PATH; required for verification harness.")
+def compile_and_run_project(
+    src_dir: Path,
+    output_exe: Path,
+    sources: Optional[List[Path]] = None,
+    extra_flags: Optional[List[str]] = None,
+    jobs: Optional[int] = None,
+    build_dir: Optional[Path] = None,
+    cache_dir: Optional[Path] = None,
+):
+    # build_dir defaults to <exe dir>/.fort2py_build, which also holds the artifact cache.
+    # Relative directories in extra_flags are relative to src_dir, where gfortran used to run
     if sources is None:
-        sources = list(src_dir.rglob("*.f90"))
-    cmd = ["gfortran", "-O2", "-fimplicit-none", "-o", str(output_exe)] + [str(s) for s in sources]
-    if extra_flags:
-        cmd.extend(extra_flags)
-    run_cmd(cmd, cwd=src_dir)
-    return output_exe
+        sources = find_sources(src_dir)
+    build_dir = build_dir or output_exe.parent / BUILD_CACHE_DIR_NAME
+    cache_dir = cache_dir or build_dir / "cache"
+    build = FortranBuild(
+        sources, output_exe, build_dir, flags=extra_flags, cache_dir=cache_dir, flags_dir=src_dir
+    )
+    return build.build(jobs=jobs).exe
@@ -0,0 +1,197 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set
+
+from .utils import file_digest
+
+
+GOLDEN_DIR_NAME = ".fort2py_golden"
+# Bump when the key derivation or entry layout changes
+GOLDEN_FORMAT = 1
+
+
+@dataclass
+class GoldenEntry:
+    stdout: Path
+    returncode: int
+    seconds: float  # wall time of the Fortran run that produced the entry
+    exe_digest: str
+    files: Dict[str, Path] = field(default_factory=dict)  # output files of the run, by label
+
+
+@dataclass
+class GoldenStats:
+    entries: int
+    total_bytes: int
+    hits: int = 0
+    misses: int = 0
+    saved_s: float = 0.0
+
+
+def _tree_files(base: Path, skip: Set[Path]) -> List[Path]:
+    # Every file under base, minus skipped files and directories, fort2py's own
+    # .fort2py_* directories and bytecode caches
+    files = []
+    for root, dirs, names in os.walk(base):
+        dirs[:] = [
+            d for d in dirs
+            if not d.startswith(".fort2py_") and d != "__pycache__"
+            and (Path(root) / d).resolve() not in skip
+        ]
+        files.extend(Path(root) / n for n in names)
+    return files
+
+
+def input_digest(
+    cwd: Optional[str], patterns: Optional[Sequence[str]], outputs: Sequence[Path] = ()
+) -> str:
+    # Digest of the files a run reads: `patterns` globbed under cwd, or the whole tree under
+    # cwd (a program may read data/mesh.dat). No cwd means the run inherits ours, which is
+    # then hashed the same way. `outputs` (files or directories, relative to cwd) are written
+    # by the run, never read, and are left out
+    h = hashlib.sha256()
+    base = Path(cwd or ".")
+    skip = {(base / p).resolve() for p in outputs}
+    if patterns is None:
+        files = _tree_files(base, skip)
+    else:
+        files = [p for pat in patterns for p in base.glob(pat)]
+    for p in sorted(f for f in set(files) if f.is_file() and f.resolve() not in skip):
+        name = p.relative_to(base).as_posix().encode("utf-8")
+        h.update(name + b"\0" + file_digest(p).encode("ascii") + b"\0")
+    return h.hexdigest()
+
+
+class GoldenStore:
+    """
+    Persistent reference (Fortran) outputs for verification runs.
+    Entries are keyed by (executable SHA-256, arguments, stdin, digest of the input files),
+    so a rebuilt executable or a changed input file simply misses. Only successful runs
+    (exit status 0) are stored, together with copies of the binary output files they wrote.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        self.saved_s = 0.0
+
+    @property
+    def entry_dir(self) -> Path:
+        return self.root / "golden"
+
+    def key(
+        self,
+        exe_digest: str,
+        args: Sequence[str],
+        stdin: Optional[str],
+        inputs: str,
+        outputs: Sequence[str] = (),
+    ) -> str:
+        parts = [GOLDEN_FORMAT, exe_digest, list(args), stdin, inputs]
+        if outputs:
+            # Only cases declaring output files key on them; other keys stay as they were
+            parts.append(sorted(outputs))
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        d = self.entry_dir / key[:2]
+        return d / f"{key}.out", d / f"{key}.json"
+
+    @staticmethod
+    def _files_dir(meta: Path) -> Path:
+        return meta.with_suffix(".files")
+
+    def get(self, key: str) -> Optional[GoldenEntry]:
+        out, meta = self._paths(key)
+        try:
+            m = json.loads(meta.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        labels = m.get("files", [])
+        files = {label: self._files_dir(meta) / f"{i}.bin" for i, label in enumerate(labels)}
+        if not out.exists() or not all(f.exists() for f in files.values()):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.saved_s += m["seconds"]
+        return GoldenEntry(out, m["returncode"], m["seconds"], m["exe"], files)
+
+    def put(
+        self,
+        key: str,
+        stdout: Path,
+        returncode: int,
+        seconds: float,
+        exe_digest: str,
+        files: Optional[Dict[str, Path]] = None,
+    ) -> GoldenEntry:
+        # Moves `stdout` into the store and copies `files` (label -> path); metadata is written
+        # last, so a reader never sees half an entry
+        out, meta = self._paths(key)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(stdout), str(out))
+        labels = sorted(files or {})
+        stored = {}
+        if labels:
+            d = self._files_dir(meta)
+            d.mkdir(exist_ok=True)
+            for i, label in enumerate(labels):
+                stored[label] = d / f"{i}.bin"
+                shutil.copyfile(files[label], stored[label])
+        fd, tmp = tempfile.mkstemp(dir=out.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                meta_doc = {
+                    "returncode": returncode,
+                    "seconds": round(seconds, 6),
+                    "exe": exe_digest,
+                    "files": labels,
+                }
+                json.dump(meta_doc, f)
+            os.replace(tmp, meta)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return GoldenEntry(out, returncode, seconds, exe_digest, stored)
+
+    def _metas(self) -> Iterator[Path]:
+        if self.entry_dir.exists():
+            yield from self.entry_dir.glob("*/*.json")
+
+    def invalidate(self, exe: Optional[Path] = None) -> int:
+        # Drop every entry, or only those recorded for this executable's current contents
+        digest = file_digest(exe) if exe is not None else None
+        removed = 0
+        for meta in list(self._metas()):
+            if digest is not None:
+                try:
+                    if json.loads(meta.read_text(encoding="utf-8")).get("exe") != digest:
+                        continue
+                except (OSError, ValueError):
+                    pass
+            meta.unlink(missing_ok=True)
+            meta.with_suffix(".out").unlink(missing_ok=True)
+            shutil.rmtree(self._files_dir(meta), ignore_errors=True)
+            removed += 1
+        return removed
+
+    def stats(self) -> GoldenStats:
+        metas: List[Path] = list(self._metas())
+        total = 0
+        for m in metas:
+            files = self._files_dir(m)
+            for p in [m, m.with_suffix(".out")] + (list(files.iterdir()) if files.is_dir() else []):
+                try:
+                    total += p.stat().st_size
+                except OSError:
+                    pass
+        return GoldenStats(len(metas), total, self.hits, self.misses, self.saved_s)
@@ -6,7 +6,7 @@ from pathlib import Path
 
 from .scanner import scan_fortran_files
 from .converter import convert_project
-from .utils import diff_text, read_text, write_text, set_determinism_env
+from .utils import diff_text, read_text, write_text
 
 
 class App(tk.Tk):
@@ -77,7 +77,6 @@ class App(tk.Tk):
 
         def worker():
             try:
-                set_determinism_env()
                 convert_project(self.files, self.out_dir)
                 self._append_log("Conversion completed")
             except Exception as e:
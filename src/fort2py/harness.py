@@ -1,15 +1,37 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
+import contextlib
+import copy
+import multiprocessing
+import os
+import signal
 import subprocess
 import sys
+import tempfile
+import threading
+import time
 import yaml
 import json
 import importlib.util
 import numpy as np
 
-from .utils import run_cmd, set_determinism_env
+from . import rng, threads
+from .compare import (
+    ArrayMismatch,
+    ArraySpec,
+    Tolerance,
+    compare_arrays,
+    compare_outputs,
+    open_array,
+)
+from .golden import GoldenStore, input_digest
+from .profiling import DEFAULT_TOP, CaseProfile, format_profile, profile_call
+from .sourcemap import SourceMap, load_maps
+from .types import Ref
+from .utils import file_digest, run_cmd
 
 
 @dataclass
@@ -23,6 +45,14 @@ class SampleCase:
     module: Optional[str] = None
     function: Optional[str] = None
     inputs: Optional[Dict] = None
+    # Overrides the config tolerance for this case ({atol, rtol, ulps})
+    tolerance: Optional[Dict] = None
+    # Globs (relative to cwd) of the files the program reads; they key its golden output.
+    # Default: every top-level file in cwd.
+    input_files: Optional[List[str]] = None
+    # Unformatted output files, compared as arrays after stdout: [{path, dtype, shape, order,
+    # offset, name, python}] (see compare.ArraySpec; paths relative to cwd)
+    output_files: Optional[List[Dict]] = None
 
 
 @dataclass
@@ -33,6 +63,8 @@ class VerificationConfig:
     python_entry_module: Optional[str] = None
     python_entry_function: Optional[str] = None
     cases: List[SampleCase] = None
+    # Numeric tolerance for output comparison ({atol, rtol, ulps}); exact values by default
+    tolerance: Optional[Dict] = None
 
     @staticmethod
     def from_yaml(p: Path) -> "VerificationConfig":
@@ -44,33 +76,285 @@ class VerificationConfig:
             python_entry_module=data.get("python_entry_module"),
             python_entry_function=data.get("python_entry_function"),
             cases=cases,
+            tolerance=data.get("tolerance"),
         )
 
 
-def _run_fortran(exe: Path, case: SampleCase) -> subprocess.CompletedProcess:
+FORTRAN_TIMEOUT = 120
+PYTHON_TIMEOUT = FORTRAN_TIMEOUT
+
+
+@dataclass
+class CaseResult:
+    name: str
+    # "pass", "mismatch", "error" (Python raised or the executable failed to start) or "timeout"
+    status: str
+    fortran_s: float = 0.0
+    python_s: float = 0.0
+    fortran_returncode: Optional[int] = None
+    # The Fortran output came from the golden store instead of a run
+    fortran_cached: bool = False
+    error: Optional[str] = None
+    # Location and values of the first differing token
+    mismatch: Optional[str] = None
+    python_out: str = field(default="", repr=False)
+    # Python-side hotspots (verify --profile)
+    profile: Optional[CaseProfile] = field(default=None, repr=False)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "pass"
+
+
+@dataclass
+class VerificationReport:
+    cases: List[CaseResult]
+    jobs: int = 1
+    wall_s: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return all(c.ok for c in self.cases)
+
+    def to_dict(self) -> Dict:
+        cases = []
+        for c in self.cases:
+            d = asdict(c)
+            del d["python_out"]
+            if d["profile"] is None:
+                del d["profile"]
+            cases.append(d)
+        return {
+            "ok": self.ok,
+            "jobs": self.jobs,
+            "wall_s": round(self.wall_s, 6),
+            "passed": sum(c.ok for c in self.cases),
+            "failed": sum(not c.ok for c in self.cases),
+            "golden_hits": sum(c.fortran_cached for c in self.cases),
+            "cases": cases,
+        }
+
+    def write(self, p: Path):
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(json.dumps(self.to_dict(), indent=2) + "\n", encoding="utf-8")
+
+
+def _run_fortran(exe: Path, case: SampleCase, stdout) -> subprocess.CompletedProcess:
+    # stdout goes to a file so large outputs are compared as streams, never held in memory
     return subprocess.run(
         [str(exe)] + (case.exe_args or []),
         input=(case.stdin or "").encode("utf-8") if case.stdin else None,
         cwd=case.cwd or None,
-        capture_output=True,
-        timeout=120,
+        env=threads.deterministic_env(),
+        stdout=stdout,
+        stderr=subprocess.PIPE,
+        timeout=FORTRAN_TIMEOUT,
     )
 
 
-def _run_python(module_path: Path, func_name: str, case: SampleCase) -> str:
-    # Dynamically import module and call function; case.inputs is dict of arguments
-    spec = importlib.util.spec_from_file_location("entry_mod", str(module_path))
-    mod = importlib.util.module_from_spec(spec)
-    assert spec and spec.loader
-    spec.loader.exec_module(mod)  # type: ignore[attr-defined]
-    fn = getattr(mod, func_name, None)
-    if fn is None:
-        raise RuntimeError(f"Python entry function not found: {func_name}")
-    args = case.inputs or {}
-    # Determinism
-    np.random.seed(123456789)
-    set_determinism_env()
-    res = fn(**args)
+@dataclass
+class _FortranRun:
+    seconds: float
+    returncode: Optional[int]
+    error: Optional[str]
+    stdout: Path
+    cached: bool = False  # served from the golden store
+    temporary: bool = True  # stdout is deleted once compared
+    files: Dict[str, Path] = field(default_factory=dict)  # output files by label
+
+
+class _Reference:
+    # The Fortran side of every case: the executable, optionally behind a golden store
+    def __init__(self, exe: Path, store: Optional[GoldenStore], refresh: bool = False):
+        self.exe = exe
+        self.store = store
+        self.refresh = refresh
+        self.digest = file_digest(exe) if store is not None else ""
+
+    def run(self, case: SampleCase) -> _FortranRun:
+        key = None
+        specs = _output_specs(case)
+        if self.store is not None:
+            # The store may sit inside the case's tree; its entries are not inputs either
+            outputs = _output_paths(case) + [self.store.root.resolve()]
+            inputs = input_digest(case.cwd, case.input_files, outputs)
+            key = self.store.key(
+                self.digest, case.exe_args or [], case.stdin, inputs, [s.path for s in specs]
+            )
+            hit = None if self.refresh else self.store.get(key)
+            if hit is not None:
+                return _FortranRun(
+                    0.0, hit.returncode, None, hit.stdout,
+                    cached=True, temporary=False, files=hit.files,
+                )
+        files = {s.label: _case_path(case, s.path) for s in specs}
+        for f in files.values():
+            # A file left over from an earlier run must not pass for this run's output
+            f.unlink(missing_ok=True)
+        fd, name = tempfile.mkstemp(prefix="fort2py_", suffix=".out")
+        t0 = time.perf_counter()
+        with os.fdopen(fd, "wb") as out:
+            try:
+                rc, err = _run_fortran(self.exe, case, out).returncode, None
+            except subprocess.TimeoutExpired:
+                rc, err = None, f"timeout after {FORTRAN_TIMEOUT}s"
+            except OSError as e:
+                rc, err = None, f"{type(e).__name__}: {e}"
+        res = _FortranRun(time.perf_counter() - t0, rc, err, Path(name), files=files)
+        if key is not None and rc == 0 and all(f.exists() for f in files.values()):
+            entry = self.store.put(key, res.stdout, rc, res.seconds, self.digest, files=files)
+            res.stdout, res.files = entry.stdout, entry.files
+            res.temporary = False
+        return res
+
+
+def _output_specs(case: SampleCase) -> List[ArraySpec]:
+    return [ArraySpec.from_dict(d) for d in case.output_files or []]
+
+
+def _case_path(case: SampleCase, p: str) -> Path:
+    return Path(case.cwd or ".") / p
+
+
+def _output_paths(case: SampleCase) -> List[Path]:
+    # Files a run of the case deletes and rewrites, on either side
+    paths = [p for s in _output_specs(case) for p in (s.path, s.python) if p]
+    return [_case_path(case, p).resolve() for p in paths]
+
+
+def _lanes(cases: List[SampleCase]) -> List[List[int]]:
+    """
+    Group case indices so that cases writing the same output file share a lane.
+    Each would delete and rewrite the other's files, so a lane runs its cases one after
+    another; different lanes run concurrently. Lanes and their cases are in config order.
+    """
+    root = list(range(len(cases)))
+
+    def find(i: int) -> int:
+        while root[i] != i:
+            root[i] = root[root[i]]
+            i = root[i]
+        return i
+
+    owner: Dict[Path, int] = {}
+    for i, case in enumerate(cases):
+        for p in _output_paths(case):
+            j = owner.setdefault(p, i)
+            root[find(i)] = find(j)
+    lanes: Dict[int, List[int]] = {}
+    for i in range(len(cases)):
+        lanes.setdefault(find(i), []).append(i)
+    return list(lanes.values())
+
+
+class _PythonTimeout(BaseException):
+    # BaseException, so `except Exception` in the code under test does not swallow it
+    pass
+
+
+@contextlib.contextmanager
+def _deadline(seconds: float) -> Iterator[None]:
+    # SIGALRM interrupts the case once `seconds` have passed. Only the main thread receives
+    # signals (true in verification workers and the CLI); elsewhere the case runs unbounded.
+    main = threading.current_thread() is threading.main_thread()
+    if not main or not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise _PythonTimeout()
+
+    old = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old)
+
+
+# Module-level values that a case can change and the next case must not see
+_STATE_TYPES = (
+    np.ndarray, np.generic, int, float, complex, bool, str, bytes, list, dict, tuple, set, Ref
+)
+
+
+class PythonEntry:
+    """
+    The generated entry module, imported once and called for many cases.
+    Module state of the generated tree (SAVE arrays and other globals) is snapshotted after
+    import and restored before every case, and the RNGs are reseeded, so cases stay isolated.
+    """
+
+    def __init__(self, module_path: Path, func_name: str):
+        root = self.root = module_path.parent.resolve()
+        self._maps: Optional[Dict[str, SourceMap]] = None
+        if str(root) not in sys.path:
+            # Entry modules may import sibling generated modules
+            sys.path.insert(0, str(root))
+        before = set(sys.modules)
+        spec = importlib.util.spec_from_file_location("entry_mod", str(module_path))
+        assert spec and spec.loader
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)  # type: ignore[attr-defined]
+        self.fn = getattr(mod, func_name, None)
+        if self.fn is None:
+            raise RuntimeError(f"Python entry function not found: {func_name}")
+        modules = [mod]
+        for name in sorted(set(sys.modules) - before):
+            f = getattr(sys.modules[name], "__file__", None)
+            if f and Path(f).resolve().is_relative_to(root):
+                modules.append(sys.modules[name])
+        self._snapshot = [
+            (m, {k: copy.deepcopy(v) for k, v in vars(m).items() if _is_state(k, v)})
+            for m in modules
+        ]
+
+    def reset(self):
+        for m, snap in self._snapshot:
+            g = vars(m)
+            for k, v in snap.items():
+                cur = g.get(k)
+                if (
+                    isinstance(v, np.ndarray)
+                    and isinstance(cur, np.ndarray)
+                    and cur.shape == v.shape
+                    and cur.dtype == v.dtype
+                ):
+                    # In place: generated routines and callers may hold the SAVE array itself
+                    cur[...] = v
+                else:
+                    g[k] = copy.deepcopy(v)
+        np.random.seed(123456789)
+        rng.seed_streams()
+
+    def run(self, case: SampleCase) -> Tuple[str, Dict[str, np.ndarray]]:
+        # Printed output, plus the arrays returned for the case's output files
+        for s in _output_specs(case):
+            if s.python:
+                _case_path(case, s.python).unlink(missing_ok=True)
+        self.reset()
+        res = self.fn(**(case.inputs or {}))
+        arrays = {}
+        if case.output_files and isinstance(res, dict):
+            # {"stdout": text, <output label>: array, ...}: arrays skip the text round trip
+            arrays = {k: v for k, v in res.items() if k != "stdout"}
+            res = res.get("stdout", "")
+        return _format_output(res), arrays
+
+    def __call__(self, case: SampleCase) -> str:
+        return self.run(case)[0]
+
+    def profile(
+        self, case: SampleCase, top: int = DEFAULT_TOP
+    ) -> Tuple[Tuple[str, Dict[str, np.ndarray]], CaseProfile]:
+        # run() under the profilers, hotspots annotated through the tree's source maps
+        if self._maps is None:
+            self._maps = load_maps(self.root)
+        return profile_call(lambda: self.run(case), self.root, self._maps, top=top)
+
+
+def _format_output(res) -> str:
     if isinstance(res, (bytes, bytearray)):
         return res.decode("utf-8", errors="ignore")
     if isinstance(res, (str,)):
@@ -82,8 +366,131 @@ def _run_python(module_path: Path, func_name: str, case: SampleCase) -> str:
         return str(res)
 
 
-def verify_equivalence(fort_src: Path, py_src: Path, cfg: VerificationConfig) -> bool:
-    set_determinism_env()
+def _is_state(name: str, value) -> bool:
+    return not name.startswith("__") and isinstance(value, _STATE_TYPES)
+
+
+def _load_entry(module_path: Path, func_name: str) -> Tuple[Optional[PythonEntry], Optional[str]]:
+    try:
+        return PythonEntry(module_path, func_name), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _timed_python(
+    entry: Tuple[Optional[PythonEntry], Optional[str]], case: SampleCase, profile: int = 0
+) -> Tuple[float, Optional[Tuple], Optional[str], Optional[CaseProfile]]:
+    # profile: number of hotspots to keep per view (0: no profiling)
+    t0 = time.perf_counter()
+    fn, err = entry
+    out = prof = None
+    if fn is not None:
+        try:
+            with threads.deterministic(), _deadline(PYTHON_TIMEOUT):
+                if profile:
+                    out, prof = fn.profile(case, top=profile)
+                else:
+                    out = fn.run(case)
+        except _PythonTimeout:
+            err = f"timeout after {PYTHON_TIMEOUT}s"
+        except Exception as e:
+            err = f"{type(e).__name__}: {e}"
+    return time.perf_counter() - t0, out, err, prof
+
+
+# Per-process entry of a warm verification worker, loaded once by the pool initializer
+_worker_entry: Tuple[Optional[PythonEntry], Optional[str]] = (None, "worker not initialised")
+
+
+def _init_worker(module_path: Path, func_name: str):
+    global _worker_entry
+    with threads.deterministic():
+        _worker_entry = _load_entry(module_path, func_name)
+
+
+def _worker_case(
+    case: SampleCase, profile: int = 0
+) -> Tuple[float, Optional[Tuple], Optional[str], Optional[CaseProfile]]:
+    return _timed_python(_worker_entry, case, profile)
+
+
+def _case_result(case: SampleCase, fort: _FortranRun, py: Tuple, tol: Tolerance) -> CaseResult:
+    f_err = fort.error
+    p_s, py_out, p_err, prof = py
+    text, arrays = py_out or ("", {})
+    res = CaseResult(
+        case.name, "pass", fortran_s=round(fort.seconds, 6), python_s=round(p_s, 6), profile=prof
+    )
+    res.fortran_returncode = fort.returncode
+    res.fortran_cached = fort.cached
+    res.python_out = text
+    try:
+        if f_err or p_err:
+            timed_out = any(e and e.startswith("timeout") for e in (f_err, p_err))
+            res.status = "timeout" if timed_out else "error"
+            res.error = "; ".join(
+                e for e in (f_err and f"fortran: {f_err}", p_err and f"python: {p_err}") if e
+            )
+        else:
+            if case.tolerance is not None:
+                tol = Tolerance.from_dict(case.tolerance)
+            diff = compare_outputs(fort.stdout, res.python_out, tol)
+            if diff is None:
+                diff = _compare_files(case, fort.files, arrays, tol)
+            if diff is not None:
+                res.status = "mismatch"
+                res.mismatch = str(diff)
+    finally:
+        if fort.temporary:
+            fort.stdout.unlink(missing_ok=True)
+    return res
+
+
+def _compare_files(
+    case: SampleCase, fort_files: Dict[str, Path], arrays: Dict, tol: Tolerance
+) -> Optional[ArrayMismatch]:
+    # Both sides memory-mapped (or the returned array flattened in place); first difference wins
+    for spec in _output_specs(case):
+        try:
+            expected = open_array(fort_files[spec.label], spec)
+            if spec.python:
+                actual = open_array(_case_path(case, spec.python), spec)
+            elif spec.label in arrays:
+                actual = np.ravel(np.asarray(arrays[spec.label]), order=spec.order)
+            else:
+                return ArrayMismatch(
+                    spec.label, None, None, None, "neither written nor returned by the Python entry"
+                )
+        except (OSError, ValueError) as e:
+            return ArrayMismatch(spec.label, None, None, None, str(e))
+        diff = compare_arrays(expected, actual, tol, spec.shape, spec.order, spec.label)
+        if diff is not None:
+            return diff
+    return None
+
+
+def run_verification(
+    py_src: Path,
+    cfg: VerificationConfig,
+    jobs: Optional[int] = None,
+    tolerance: Optional[Tolerance] = None,
+    golden: Optional[GoldenStore] = None,
+    refresh_golden: bool = False,
+    profile: int = 0,
+) -> VerificationReport:
+    """
+    Run every sample case and collect per-case timings and status, in config order.
+    With jobs > 1, Fortran executables run from a thread pool and Python entries in a
+    process pool of the same size, so the two sides of each case and different cases overlap;
+    cases that write the same output files still run one at a time (see _lanes).
+    Either side fails its case with "timeout" after FORTRAN_TIMEOUT / PYTHON_TIMEOUT seconds.
+    Outputs (stdout, then any binary `output_files`) are compared with fort2py.compare;
+    `tolerance` replaces the config's, and a case's own tolerance wins over both. With a
+    `golden` store, Fortran outputs recorded for the same executable and inputs are reused
+    instead of re-running the program (`refresh_golden` re-runs every case and overwrites its
+    entry).
+    profile > 0 runs each Python case under fort2py.profiling and keeps that many hotspots per view.
+    """
     # Assumes fortran_exe prebuilt or built externally; building is separate step if desired
     for_exe = Path(cfg.fortran_exe) if cfg.fortran_exe else None
     if not for_exe or not for_exe.exists():
@@ -91,12 +498,71 @@ def verify_equivalence(fort_src: Path, py_src: Path, cfg: VerificationConfig) ->
     py_entry = py_src / (cfg.python_entry_module + ".py")
     if not py_entry.exists():
         raise RuntimeError(f"Python entry module not found: {py_entry}")
-    ok_all = True
-    for case in cfg.cases or []:
-        fort_run = _run_fortran(for_exe, case)
-        fort_out = fort_run.stdout.decode("utf-8", errors="ignore")
-        py_out = _run_python(py_entry, cfg.python_entry_function, case)
-        if fort_out != py_out:
-            sys.stderr.write(f"[Mismatch] case={case.name}\n--- Fortran ---\n{fort_out}\n--- Python ---\n{py_out}\n")
-            ok_all = False
-    return ok_all
+    cases = cfg.cases or []
+    jobs = max(1, min(jobs or 1, len(cases) or 1))
+    tol = tolerance if tolerance is not None else Tolerance.from_dict(cfg.tolerance)
+    ref = _Reference(for_exe, golden, refresh=refresh_golden)
+    t0 = time.perf_counter()
+    if jobs == 1:
+        entry = _load_entry(py_entry, cfg.python_entry_function)
+        results = [
+            _case_result(c, ref.run(c), _timed_python(entry, c, profile), tol) for c in cases
+        ]
+    else:
+        # spawn: the parent already runs threads, which fork would copy mid-flight
+        # Warm workers: each imports the entry module once, then runs many cases
+        ctx = multiprocessing.get_context("spawn")
+        ppool = ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(py_entry, cfg.python_entry_function),
+        )
+        results: List[Optional[CaseResult]] = [None] * len(cases)
+
+        def run_lane(lane: List[int]):
+            for i in lane:
+                c = cases[i]
+                f, p = fpool.submit(ref.run, c), ppool.submit(_worker_case, c, profile)
+                results[i] = _case_result(c, f.result(), p.result(), tol)
+
+        fpool, lpool = ThreadPoolExecutor(max_workers=jobs), ThreadPoolExecutor(max_workers=jobs)
+        with fpool, ppool, lpool:
+            for fut in [lpool.submit(run_lane, lane) for lane in _lanes(cases)]:
+                fut.result()
+    return VerificationReport(results, jobs=jobs, wall_s=time.perf_counter() - t0)
+
+
+def verify_equivalence(
+    fort_src: Path,
+    py_src: Path,
+    cfg: VerificationConfig,
+    jobs: Optional[int] = None,
+    report: Optional[Path] = None,
+    tolerance: Optional[Tolerance] = None,
+    golden: Optional[GoldenStore] = None,
+    refresh_golden: bool = False,
+    profile: int = 0,
+) -> bool:
+    # BLAS and parallel loops run single-threaded only while verifying
+    with threads.deterministic():
+        rep = run_verification(
+            py_src,
+            cfg,
+            jobs=jobs,
+            tolerance=tolerance,
+            golden=golden,
+            refresh_golden=refresh_golden,
+            profile=profile,
+        )
+    for c in rep.cases:
+        if c.status == "mismatch":
+            sys.stderr.write(f"[Mismatch] case={c.name}: {c.mismatch}\n")
+        elif not c.ok:
+            sys.stderr.write(f"[{c.status.capitalize()}] case={c.name}: {c.error}\n")
+    for c in rep.cases:
+        if c.profile is not None:
+            print(format_profile(c.name, c.profile))
+    if report is not None:
+        rep.write(report)
+    return rep.ok
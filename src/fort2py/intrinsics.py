@@ -1,9 +1,32 @@
 from __future__ import annotations
+import functools
 import math
 from typing import Any, Optional, Tuple
 import numpy as np
 
-from .utils import require, deterministic_rng
+from . import rng
+from .types import Ref
+from .utils import require
+
+
+# Generated code calls intrinsics inside scalar loops, so each one checks for plain
+# Python scalars first and only then takes the NumPy (array) path.
+_PY_SCALARS = (int, float)
+
+
+@functools.lru_cache(maxsize=None)
+def _ones_bounds(ndim: int) -> np.ndarray:
+    b = np.ones(ndim, dtype=np.int64)
+    b.flags.writeable = False
+    return b
+
+
+def _dest(shape: Tuple[int, ...], dtype, out: Optional[np.ndarray]) -> np.ndarray:
+    # Destination of an array intrinsic: the caller's out= or a new Fortran-ordered array
+    if out is None:
+        return np.empty(shape, dtype=dtype, order="F")
+    require(out.shape == tuple(shape), f"out= has shape {out.shape}, expected {tuple(shape)}")
+    return out
 
 
 def present(x: Optional[Any]) -> bool:
@@ -12,14 +35,15 @@ def present(x: Optional[Any]) -> bool:
 
 def lbound(a: np.ndarray, dim: Optional[int] = None) -> Any:
     if dim is None:
-        return np.array([1 for _ in a.shape], dtype=np.int64)
+        # Shared read-only array: lower bounds are always 1
+        return _ones_bounds(a.ndim)
     require(1 <= dim <= a.ndim, f"lbound: dim out of range: {dim}")
     return 1
 
 
 def ubound(a: np.ndarray, dim: Optional[int] = None) -> Any:
     if dim is None:
-        return np.array([n for n in a.shape], dtype=np.int64)
+        return np.array(a.shape, dtype=np.int64)
     require(1 <= dim <= a.ndim, f"ubound: dim out of range: {dim}")
     return a.shape[dim - 1]
 
@@ -35,44 +59,101 @@ def shape(a: np.ndarray) -> Tuple[int, ...]:
     return a.shape
 
 
-def matmul(a: np.ndarray, b: np.ndarray) -> np.ndarray:
-    # Fortran matmul is column-major; data is F-ordered; np.matmul suffices.
-    return a @ b
+def matmul(a: np.ndarray, b: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    a = np.asarray(a)
+    b = np.asarray(b)
+    if a.ndim < 2 or b.ndim < 2:
+        # Matrix-vector products are 1-D, so there is no layout to preserve
+        return np.matmul(a, b, out=out)
+    res = _dest((a.shape[0], b.shape[1]), np.result_type(a, b), out)
+    # (A B)^T = B^T A^T: with F-ordered operands every transpose is a C-contiguous view,
+    # so BLAS writes the Fortran-ordered result in place without a layout copy.
+    np.matmul(b.T, a.T, out=res.T)
+    return res
 
 
 def dot_product(a: np.ndarray, b: np.ndarray) -> Any:
     return np.vdot(a, b)
 
 
-def transpose(a: np.ndarray) -> np.ndarray:
-    return np.swapaxes(a, -2, -1)
-
-
-def merge(tsrc, fsrc, mask):
-    return np.where(mask, tsrc, fsrc)
-
-
-def sign(a, b):
-    return math.copysign(abs(a), b)
+def transpose(a: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    # A swapped view of an F-ordered array is C-ordered; materialise it column-major
+    a = np.asarray(a)
+    res = _dest(a.shape[::-1], a.dtype, out)
+    np.copyto(res, a.T)
+    return res
+
+
+def merge(tsrc, fsrc, mask, out: Optional[np.ndarray] = None):
+    if (
+        out is None
+        and isinstance(mask, (bool, np.bool_))
+        and isinstance(tsrc, _PY_SCALARS)
+        and isinstance(fsrc, _PY_SCALARS)
+    ):
+        return tsrc if mask else fsrc
+    shape = np.broadcast_shapes(np.shape(tsrc), np.shape(fsrc), np.shape(mask))
+    res = _dest(shape, np.result_type(tsrc, fsrc), out)
+    # Two masked copies instead of np.where's fresh result
+    np.copyto(res, fsrc, casting="unsafe")
+    np.copyto(res, tsrc, casting="unsafe", where=mask)
+    return res
+
+
+def sign(a, b, out: Optional[np.ndarray] = None):
+    # |a| with the sign of b; integers stay integers (b == 0 counts as positive)
+    if out is None and isinstance(a, _PY_SCALARS) and isinstance(b, _PY_SCALARS):
+        if isinstance(a, float) or isinstance(b, float):
+            return math.copysign(abs(a), b)
+        return abs(a) if b >= 0 else -abs(a)
+    dt = np.result_type(a, b)
+    res = _dest(np.broadcast_shapes(np.shape(a), np.shape(b)), dt, out)
+    if dt.kind == "f":
+        np.copysign(np.abs(a), b, out=res, casting="unsafe")
+    else:
+        np.abs(a, out=res, casting="unsafe")
+        np.negative(res, out=res, where=np.less(b, 0))
+    return res[()] if res.ndim == 0 else res
 
 
 def random_seed(seed: Optional[int] = None):
-    # Set deterministic RNG via numpy RNG
-    rng = deterministic_rng(seed)
-    np.random.seed(rng.integers(0, 2**31 - 1))
-
-
-def random_number(a: np.ndarray):
-    # Fill array in place using deterministic seed set earlier
-    a[...] = np.random.random_sample(size=a.shape)
-
-
-def nint(x):
-    return np.rint(x).astype(int)
-
-
-def modulo(a, p):
-    return a - p * np.floor(a / p)
+    # Reseed the fort2py.rng stream family (the legacy np.random state is not touched)
+    rng.seed_streams(seed)
+
+
+def random_number(a=None):
+    # Arrays are filled in place in Fortran element order; Ref gets .v set;
+    # scalars get a return value
+    if isinstance(a, Ref):
+        a.v = rng.random_number()
+        return a
+    return rng.random_number(a)
+
+
+def nint(x, out: Optional[np.ndarray] = None):
+    # Fortran NINT rounds halves away from zero (np.rint and round() go to even)
+    if out is None and isinstance(x, _PY_SCALARS):
+        t = math.trunc(x)
+        f = x - t  # exact for floats
+        return t + 1 if f >= 0.5 else t - 1 if f <= -0.5 else t
+    res = _dest(np.shape(x), int, out)
+    np.rint(x, out=res, casting="unsafe")
+    # Only exact .5 ties differ from np.rint; they are rare, so fix them after the fact
+    d = np.asarray(np.subtract(x, res))
+    np.abs(d, out=d)
+    ties = d == 0.5
+    if ties.any():
+        xt = np.broadcast_to(x, res.shape)[ties]
+        res[ties] = np.trunc(xt) + np.sign(xt)
+    return res[()] if res.ndim == 0 else res
+
+
+def modulo(a, p, out: Optional[np.ndarray] = None):
+    # Python % and np.mod take the sign of p, as Fortran MODULO does
+    if out is None and isinstance(a, _PY_SCALARS) and isinstance(p, _PY_SCALARS):
+        return a % p
+    res = _dest(np.broadcast_shapes(np.shape(a), np.shape(p)), np.result_type(a, p), out)
+    return np.mod(a, p, out=res, casting="unsafe")
 
 
 def allocated(x) -> bool:
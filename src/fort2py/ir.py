@@ -1,19 +1,118 @@
 from __future__ import annotations
+from array import array
+from bisect import bisect_right
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Dict, Tuple, Literal, Any
+from typing import Iterator, List, Optional, Dict, Tuple, Literal, Any, Union
 
 
 Intent = Literal["in", "out", "inout"]
 
 
-@dataclass
+class SourceBuffer:
+    """
+    Append-only text shared by every compact body of one source file.
+    Text is frozen into ~1 MiB chunks so a line is never split across chunks.
+    """
+    __slots__ = ("_chunks", "_starts", "_pending", "_pending_size", "_size")
+    CHUNK = 1 << 20
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._starts: List[int] = []
+        self._pending: List[str] = []
+        self._pending_size = 0
+        self._size = 0
+
+    def add(self, s: str) -> int:
+        start = self._size
+        self._pending.append(s)
+        self._pending_size += len(s)
+        self._size += len(s)
+        if self._pending_size >= self.CHUNK:
+            self.freeze()
+        return start
+
+    def freeze(self):
+        if self._pending:
+            self._starts.append(self._size - self._pending_size)
+            self._chunks.append("".join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    def get(self, start: int, end: int) -> str:
+        if start >= self._size - self._pending_size:
+            self.freeze()
+        i = bisect_right(self._starts, start) - 1
+        base = self._starts[i]
+        return self._chunks[i][start - base : end - base]
+
+    def __getstate__(self):
+        self.freeze()
+        return self._chunks, self._starts, self._size
+
+    def __setstate__(self, state):
+        self._chunks, self._starts, self._size = state
+        self._pending = []
+        self._pending_size = 0
+
+
+class CompactBody:
+    """
+    List-like body of executable lines stored as (start, end) offsets into a SourceBuffer.
+    Usage: body = CompactBody(buf); body.append(line); for line in body: ...
+    """
+    __slots__ = ("buffer", "offsets")
+
+    def __init__(self, buffer: SourceBuffer):
+        self.buffer = buffer
+        self.offsets = array("Q")
+
+    def append(self, line: str):
+        start = self.buffer.add(line)
+        self.offsets.append(start)
+        self.offsets.append(start + len(line))
+
+    def __len__(self) -> int:
+        return len(self.offsets) // 2
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("body index out of range")
+        return self.buffer.get(self.offsets[2 * i], self.offsets[2 * i + 1])
+
+    def __iter__(self) -> Iterator[str]:
+        o = self.offsets
+        get = self.buffer.get
+        for k in range(0, len(o), 2):
+            yield get(o[k], o[k + 1])
+
+    def __eq__(self, other) -> bool:
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return f"CompactBody({list(self)!r})"
+
+
+# Executable lines: a plain list, or a CompactBody in compact-IR mode
+Body = Union[List[str], CompactBody]
+
+
+@dataclass(slots=True)
 class UseStmt:
     module: str
     only_list: Optional[List[str]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class VarDecl:
     type_spec: str  # "real", "integer", "logical", "character"
     kind: Optional[int]
@@ -25,9 +124,10 @@ class VarDecl:
     pointer: bool = False
     save: bool = False
     initial: Optional[Any] = None
+    line: int = field(default=0, compare=False)  # source line of the declaration (0: unknown)
 
 
-@dataclass
+@dataclass(slots=True)
 class Argument:
     name: str
     intent: Optional[Intent] = None
@@ -38,11 +138,11 @@ class Argument:
     dims: Optional[Tuple[int, ...]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Subroutine:
     name: str
     args: List[Argument]
-    body: List[str]  # raw lines for MVP; codegen transforms with context
+    body: Body  # raw lines for MVP; codegen transforms with context
     declarations: List[VarDecl] = field(default_factory=list)
     uses: List[UseStmt] = field(default_factory=list)
     contains: List[Any] = field(default_factory=list)
@@ -51,14 +151,17 @@ class Subroutine:
     is_pure: bool = False
     parent_module: Optional[str] = None
     path: Optional[Path] = None
+    line: int = field(default=0, compare=False)  # source line of the header
+    # source line of each body statement
+    body_lines: array = field(default_factory=lambda: array("I"), compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class Function:
     name: str
     args: List[Argument]
     return_name: str
-    body: List[str]
+    body: Body
     declarations: List[VarDecl] = field(default_factory=list)
     uses: List[UseStmt] = field(default_factory=list)
     contains: List[Any] = field(default_factory=list)
@@ -70,15 +173,18 @@ class Function:
     return_dims: Optional[Tuple[int, ...]] = None
     parent_module: Optional[str] = None
     path: Optional[Path] = None
+    line: int = field(default=0, compare=False)  # source line of the header
+    # source line of each body statement
+    body_lines: array = field(default_factory=lambda: array("I"), compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class DerivedType:
     name: str
     components: List[VarDecl]
 
 
-@dataclass
+@dataclass(slots=True)
 class Module:
     name: str
     uses: List[UseStmt] = field(default_factory=list)
@@ -88,16 +194,18 @@ class Module:
     path: Optional[Path] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Program:
     name: str
     uses: List[UseStmt] = field(default_factory=list)
-    body: List[str] = field(default_factory=list)
+    body: Body = field(default_factory=list)
     declarations: List[VarDecl] = field(default_factory=list)
     path: Optional[Path] = None
+    line: int = field(default=0, compare=False)
+    body_lines: array = field(default_factory=lambda: array("I"), compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class ProjectIR:
     modules: Dict[str, Module] = field(default_factory=dict)
     programs: Dict[str, Program] = field(default_factory=dict)
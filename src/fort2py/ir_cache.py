@@ -0,0 +1,126 @@
+from __future__ import annotations
+import hashlib
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from .ir import ProjectIR
+from .version import __version__
+
+
+CACHE_DIR_NAME = ".fort2py_cache"
+# Bump when the pickled IR layout changes without a version bump.
+CACHE_FORMAT = 3
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+@dataclass
+class CacheStats:
+    entries: int
+    total_bytes: int
+    max_bytes: int
+    hits: int = 0
+    misses: int = 0
+
+
+def _rebind_path(part: ProjectIR, path: Path) -> ProjectIR:
+    # Entries are keyed by content, so the same text may have been cached under another path.
+    part.sources = [path]
+    for mod in part.modules.values():
+        mod.path = path
+        for unit in list(mod.subroutines) + list(mod.functions):
+            unit.path = path
+    for prog in part.programs.values():
+        prog.path = path
+    return part
+
+
+class IRCache:
+    """
+    Content-addressed store of per-file parsed IR.
+    Entries are keyed by (source SHA-256, fort2py version, compact or list bodies) and
+    evicted least-recently-used once the directory exceeds max_bytes.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def entry_dir(self) -> Path:
+        return self.root / "ir"
+
+    def _entry_path(self, digest: str, compact: bool = False) -> Path:
+        mode = "compact" if compact else "list"
+        key = f"{CACHE_FORMAT}:{__version__}:{mode}:{digest}"
+        key = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.entry_dir / key[:2] / f"{key}.pkl"
+
+    def get(self, digest: str, path: Path, compact: bool = False) -> Optional[ProjectIR]:
+        p = self._entry_path(digest, compact)
+        try:
+            with open(p, "rb") as f:
+                part = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            self.misses += 1
+            return None
+        # Refresh mtime: it is the LRU clock used by prune()
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+        self.hits += 1
+        return _rebind_path(part, path)
+
+    def put(self, digest: str, part: ProjectIR, compact: bool = False):
+        p = self._entry_path(digest, compact)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=p.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(part, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, p)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _entries(self) -> List[os.DirEntry]:
+        out: List[os.DirEntry] = []
+        if not self.entry_dir.exists():
+            return out
+        with os.scandir(self.entry_dir) as shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                with os.scandir(shard.path) as it:
+                    out.extend(e for e in it if e.name.endswith(".pkl") and e.is_file())
+        return out
+
+    def stats(self) -> CacheStats:
+        entries = self._entries()
+        total = sum(e.stat().st_size for e in entries)
+        return CacheStats(len(entries), total, self.max_bytes, self.hits, self.misses)
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        # Delete least-recently-used entries until the cache fits; returns entries removed.
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = [(e.stat().st_mtime_ns, e.stat().st_size, e.path) for e in self._entries()]
+        total = sum(sz for _, sz, _ in entries)
+        removed = 0
+        for _, sz, path in sorted(entries):
+            if total <= limit:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= sz
+            removed += 1
+        return removed
@@ -0,0 +1,59 @@
+from __future__ import annotations
+import functools
+from typing import Callable, Optional
+
+# Runtime support for code generated with `--backend numba`.
+# Numba is optional: without it the plain-NumPy version of every routine is used.
+
+try:
+    import numba
+    from numba import njit as _njit
+
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - depends on environment
+    numba = None
+    HAVE_NUMBA = False
+
+
+def njit(*args, **kwargs):
+    if HAVE_NUMBA:
+        return _njit(*args, **kwargs)
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return args[0]
+    return lambda fn: fn
+
+
+def vectorize(signatures, **kwargs):
+    # numba.vectorize with eager signatures; yields None (use the fallback) if Numba
+    # is missing or cannot compile the kernel.
+    def deco(fn):
+        if not HAVE_NUMBA:
+            return None
+        try:
+            return numba.vectorize(signatures, **kwargs)(fn)
+        except numba.core.errors.NumbaError:
+            return None
+
+    return deco
+
+
+def jit_dispatch(jitted: Optional[Callable], fallback: Callable) -> Callable:
+    # Call the JIT-compiled routine; if Numba cannot compile it for the given
+    # argument types, switch permanently to the plain-NumPy fallback.
+    if not HAVE_NUMBA or jitted is None:
+        return fallback
+    impl = [jitted]
+
+    @functools.wraps(fallback)
+    def call(*args, **kwargs):
+        try:
+            return impl[0](*args, **kwargs)
+        except numba.core.errors.NumbaError:
+            if impl[0] is fallback:
+                raise
+            impl[0] = fallback
+            return fallback(*args, **kwargs)
+
+    call.jitted = jitted
+    call.fallback = fallback
+    return call
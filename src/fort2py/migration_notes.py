@@ -6,7 +6,10 @@ from .utils import write_text
 TEMPLATE = """Migration Notes (auto-generated)
 
 Scope:
-- 1-based Fortran indices require care; MVP uses Fortran-order arrays but does not rewrite every index.
+- Array element references are rewritten to 0-based NumPy indexing (a(i) -> a[i - 1]);
+  DO variables keep their Fortran values.
+- Dependence-free DO loops are emitted as NumPy slice statements; the DO variable still
+  ends with its Fortran exit value.
 - Scalars with INTENT(OUT/INOUT) must be passed as fort2py.types.Ref instances.
 - CHARACTER arrays unsupported in MVP.
 - Module variables (global SAVE) unsupported in MVP.
@@ -19,6 +22,8 @@ Scope:
 Determinism:
 - BLAS threads pinned to 1 via env.
 - numpy.random seeded via intrinsics.random_seed or deterministic default.
+- Vectorized reductions (np.sum/np.dot) may differ from sequential Fortran summation in the
+  last bits; convert with --no-vectorize to keep loops.
 
 Known semantic differences:
 - Potential fallback from REAL(kind=10/16) to float64 if float128 unavailable.
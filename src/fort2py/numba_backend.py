@@ -0,0 +1,86 @@
+from __future__ import annotations
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .fortran_expr import NUMPY_ELEMENTAL
+from .ir import Function, Module, ProjectIR, Subroutine
+from .types import DTYPE_MAP
+
+
+# Nopython-compatibility check for `--backend numba`.
+# Routines are only JIT-compiled when every argument, local and statement has a
+# direct Numba equivalent; the reason for each refusal goes to the migration notes.
+
+NUMBA_DTYPES = {
+    np.dtype(t) for t in (np.int8, np.int16, np.int32, np.int64, np.float32, np.float64)
+}
+_re_name_paren = re.compile(r"\b([A-Za-z_]\w*)\s*\(")
+_STATEMENT_KEYWORDS = {"if", "then"}
+
+
+def numba_incompatibility(unit: Subroutine | Function, convention: str = "ref") -> Optional[str]:
+    # None if the routine can run under @njit, else a short reason.
+    # Under the tuple convention subroutines return OUT/INOUT scalars instead of taking Ref.
+    returns_scalars = convention == "tuple" and isinstance(unit, Subroutine)
+    if unit.is_recursive:
+        return "RECURSIVE routine"
+    for a in unit.args:
+        if a.optional:
+            return f"OPTIONAL argument '{a.name}'"
+        if a.byref and not returns_scalars:
+            return f"OUT/INOUT scalar '{a.name}' is passed as Ref"
+    arrays = set()
+    for d in unit.declarations:
+        if d.type_spec == "character":
+            return f"CHARACTER variable '{d.name}'"
+        if d.type_spec in ("real", "integer"):
+            dt = (
+                DTYPE_MAP.real_from_kind(d.kind)
+                if d.type_spec == "real"
+                else DTYPE_MAP.int_from_kind(d.kind)
+            )
+            if np.dtype(dt) not in NUMBA_DTYPES:
+                return (
+                    f"{d.type_spec.upper()}(kind={d.kind}) maps to {np.dtype(dt).name}, "
+                    "unsupported in nopython mode"
+                )
+        if d.dims:
+            if d.save:
+                # Numba freezes module-level arrays, so SAVE storage cannot persist across calls
+                return f"SAVE array '{d.name}'"
+            arrays.add(d.name.lower())
+    for line in unit.body:
+        call = re.match(r"\s*call\s+(\w+)", line, re.I)
+        if call:
+            return f"calls '{call.group(1)}'"
+        for m in _re_name_paren.finditer(line):
+            name = m.group(1).lower()
+            if name in arrays or name in NUMPY_ELEMENTAL or name in _STATEMENT_KEYWORDS:
+                continue
+            return f"calls '{m.group(1)}'"
+    return None
+
+
+def plan_numba(mod: Module, convention: str = "ref") -> Dict[str, Optional[str]]:
+    # routine name -> None (JIT-compiled) or the reason it stays plain NumPy
+    plan: Dict[str, Optional[str]] = {}
+    units: List[Subroutine | Function] = list(mod.subroutines) + list(mod.functions)
+    for unit in units:
+        plan[unit.name] = numba_incompatibility(unit, convention)
+    return plan
+
+
+def numba_notes(ir: ProjectIR, convention: str = "ref") -> Dict[str, str]:
+    # Migration-note entries recording which routines were JIT-compiled and why others were not
+    notes: Dict[str, str] = {}
+    for mod in ir.modules.values():
+        for routine, reason in plan_numba(mod, convention).items():
+            key = f"numba {mod.name}.{routine}"
+            notes[key] = (
+                "JIT-compiled with @njit(cache=True)"
+                if reason is None
+                else f"plain NumPy only: {reason}"
+            )
+    return notes
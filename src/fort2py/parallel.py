@@ -0,0 +1,192 @@
+from __future__ import annotations
+import importlib
+import multiprocessing
+import operator
+import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import rng, threads
+
+
+# Chunked execution of DO CONCURRENT and `!$omp parallel do` loops in generated code.
+# The iteration space is always cut into the same chunks (never one per worker), every chunk
+# draws random numbers from its own stream, and reduction partials are combined in chunk
+# order, so results do not depend on how many workers run them.
+
+CHUNKS = 16
+_COMBINE: Dict[str, Callable[[Any, Any], Any]] = {
+    "+": operator.add,
+    "-": operator.add,  # partials of `s = s - x` already carry the sign
+    "*": operator.mul,
+    "max": max,
+    "min": min,
+    ".and.": lambda a, b: a and b,
+    ".or.": lambda a, b: a or b,
+}
+_pools: Dict[int, Executor] = {}
+_pools_lock = threading.Lock()
+
+
+def num_workers() -> int:
+    # FORT2PY_NUM_THREADS or the CPU count, unless a fort2py.threads.thread_limit scope is active
+    return threads.num_threads()
+
+
+def chunk_bounds(lo: int, hi: int, step: int = 1, chunks: int = CHUNKS) -> List[Tuple[int, int]]:
+    # Inclusive (first, last) index values of each chunk, aligned to the loop step
+    n = len(range(lo, hi + (1 if step > 0 else -1), step))
+    k = min(chunks, n)
+    return [(lo + (c * n // k) * step, lo + ((c + 1) * n // k - 1) * step) for c in range(k)]
+
+
+def _pool(workers: int) -> Executor:
+    # Thread pools are kept; process pools are not (see _run_processes)
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fort2py")
+            _pools[workers] = pool
+    return pool
+
+
+def _can_fork() -> bool:
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def shutdown():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=True)
+        _pools.clear()
+
+
+def _run_chunk(
+    fn: Callable, family: rng.RandomStreams, key: Tuple[int, int], lo: int, hi: int, args: Sequence
+):
+    with rng.use_stream(key, family):
+        return fn(lo, hi, *args)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers attached segments with the resource tracker. Forked workers
+        # share the parent's tracker, where the name is already registered, so this is a no-op
+        # and the parent's unlink() removes the single entry.
+        return shared_memory.SharedMemory(name=name)
+
+
+def _view(spec: Sequence, shm: shared_memory.SharedMemory) -> np.ndarray:
+    return np.ndarray(spec[2], dtype=np.dtype(spec[3]), buffer=shm.buf, order=spec[4])
+
+
+def _share(a: Any, segments: List[shared_memory.SharedMemory]) -> Tuple:
+    # Argument -> picklable spec; arrays are copied into a new shared-memory segment
+    if not (isinstance(a, np.ndarray) and a.nbytes):
+        return ("value", a)
+    shm = shared_memory.SharedMemory(create=True, size=a.nbytes)
+    segments.append(shm)
+    order = "F" if a.flags.f_contiguous and not a.flags.c_contiguous else "C"
+    spec = ("shm", shm.name, a.shape, a.dtype.str, order)
+    _view(spec, shm)[...] = a
+    return spec
+
+
+def _run_shared(module: str, name: str, family, key, lo: int, hi: int, specs: Sequence):
+    fn = getattr(importlib.import_module(module), name)
+    segments = [_attach(spec[1]) if spec[0] == "shm" else None for spec in specs]
+    args = [
+        _view(spec, shm) if shm is not None else spec[1]
+        for spec, shm in zip(specs, segments, strict=True)
+    ]
+    try:
+        return _run_chunk(fn, family, key, lo, hi, args)
+    finally:
+        del args
+        for shm in segments:
+            if shm is not None:
+                try:
+                    shm.close()
+                except BufferError:
+                    # A traceback still references a view; the mapping goes with the worker
+                    pass
+
+
+def _importable(fn: Callable) -> bool:
+    return getattr(sys.modules.get(fn.__module__), fn.__name__, None) is fn
+
+
+def _run_processes(fn, family, region, bounds, args, workers) -> List[Any]:
+    # Arrays are copied into shared memory, updated by the workers and copied back
+    segments: List[shared_memory.SharedMemory] = []
+    try:
+        specs = [_share(a, segments) for a in args]
+        # Forked per call: workers see the modules and their globals as they are now, not as
+        # they were when an earlier loop ran
+        ctx = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            name = (fn.__module__, fn.__name__)
+            futures = [
+                pool.submit(_run_shared, *name, family, (region, c), lo, hi, specs)
+                for c, (lo, hi) in enumerate(bounds)
+            ]
+            partials = [f.result() for f in futures]
+        by_name = {shm.name: shm for shm in segments}
+        for a, spec in zip(args, specs, strict=True):
+            if spec[0] == "shm" and a.flags.writeable:
+                a[...] = _view(spec, by_name[spec[1]])
+        return partials
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+
+
+def parallel_do(
+    fn: Callable,
+    lo: int,
+    hi: int,
+    step: int,
+    args: Sequence,
+    mode: str = "thread",
+    ops: Sequence[str] = (),
+    init: Sequence[Any] = (),
+) -> Optional[Tuple[Any, ...]]:
+    """
+    Run fn(first, last, *args) over fixed chunks of the inclusive range lo..hi.
+    mode "thread" suits chunks that spend their time in NumPy (the GIL is released);
+    "process" runs scalar Python chunks in workers forked for this call, with arrays in
+    shared memory; it falls back to threads where the platform cannot fork or when fn
+    cannot be looked up by name in a worker.
+    Returns the reductions `ops` applied to `init` and each chunk's partials, in chunk order.
+    """
+    bounds = chunk_bounds(lo, hi, step)
+    family = rng.streams()
+    region = family.next_region()
+    workers = min(num_workers(), len(bounds))
+    if workers <= 1:
+        partials = [
+            _run_chunk(fn, family, (region, c), a, b, args) for c, (a, b) in enumerate(bounds)
+        ]
+    elif mode == "process" and _can_fork() and _importable(fn):
+        partials = _run_processes(fn, family, region, bounds, args, workers)
+    else:
+        pool = _pool(workers)
+        futures = [
+            pool.submit(_run_chunk, fn, family, (region, c), a, b, args)
+            for c, (a, b) in enumerate(bounds)
+        ]
+        partials = [f.result() for f in futures]
+    if not ops:
+        return None
+    acc = list(init)
+    for part in partials:
+        for j, op in enumerate(ops):
+            acc[j] = _COMBINE[op](acc[j], part[j])
+    return tuple(acc)
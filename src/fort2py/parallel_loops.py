@@ -0,0 +1,156 @@
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, Union
+
+from .fortran_expr import matching_paren, split_top_level
+from .vectorize import find_end_do
+
+
+# DO CONCURRENT and `!$omp parallel do` loops, located in a routine body so codegen can
+# run them in chunks. Loops whose clauses are not understood keep their sequential form.
+
+REDUCTION_OPS = ("+", "-", "*", "max", "min", ".and.", ".or.")
+
+_re_concurrent = re.compile(r"^\s*do\s+concurrent\s*\(", re.I)
+_re_omp = re.compile(r"^\s*!\$omp\b", re.I)
+_re_omp_parallel_do = re.compile(r"^\s*!\$omp\s+parallel\s+do\b(.*)$", re.I)
+_re_omp_end_parallel_do = re.compile(r"^\s*!\$omp\s+end\s+parallel\s+do\b", re.I)
+_re_reduction = re.compile(r"\breduc(?:e|tion)\s*\(\s*([^:()]+?)\s*:([^)]*)\)", re.I)
+_re_firstprivate = re.compile(r"\b(?:firstprivate|local_init)\s*\(([^)]*)\)", re.I)
+_re_lastprivate = re.compile(r"\blastprivate\b", re.I)
+_re_index = re.compile(r"^\s*(\w+)\s*=(?!=)\s*(.+)$", re.S)
+_re_typed = re.compile(r"^\s*\w+(?:\s*\([^)]*\))?\s*::")
+_re_do_header = re.compile(r"^\s*do\s+(\w+)\s*=\s*(.+)$", re.I)
+
+
+@dataclass
+class ParallelLoop:
+    source: List[str]
+    # (variable, lower, upper, step or None) as written; the last index is the one chunked
+    indices: List[Tuple[str, str, str, Optional[str]]]
+    body: List[str]
+    mask: Optional[str] = None
+    reductions: List[Tuple[str, str]] = field(default_factory=list)  # (operator, variable)
+    firstprivate: List[str] = field(default_factory=list)
+    supported: bool = True
+    body_offset: int = 1  # index of body[0] in source (2 after an OpenMP directive line)
+
+    def loop_lines(self, chunked: Optional[Tuple[str, str]] = None) -> List[str]:
+        # Equivalent sequential DO nest, last index outermost (column-major friendly);
+        # `chunked` replaces the bounds of that outermost index.
+        lines = []
+        for k, (var, lo, hi, step) in enumerate(reversed(self.indices)):
+            if k == 0 and chunked:
+                lo, hi = chunked
+            lines.append(f"do {var} = {lo}, {hi}" + (f", {step}" if step else ""))
+        if self.mask:
+            lines.append(f"if ({self.mask}) then")
+        lines.extend(self.body)
+        if self.mask:
+            lines.append("end if")
+        lines.extend("end do" for _ in self.indices)
+        return lines
+
+
+def is_omp_directive(line: str) -> bool:
+    return _re_omp.match(line) is not None
+
+
+def has_parallel_loops(lines) -> bool:
+    return any(_re_concurrent.match(s) or _re_omp_parallel_do.match(s) for s in lines)
+
+
+def _clauses(text: str) -> Tuple[List[Tuple[str, str]], List[str], bool]:
+    # reduction/reduce, firstprivate/local_init and whether every clause is supported
+    reductions = []
+    ok = _re_lastprivate.search(text) is None
+    for m in _re_reduction.finditer(text):
+        op = m.group(1).strip().lower()
+        ok = ok and op in REDUCTION_OPS
+        reductions.extend((op, v.strip()) for v in m.group(2).split(",") if v.strip())
+    first = [
+        v.strip()
+        for m in _re_firstprivate.finditer(text)
+        for v in m.group(1).split(",")
+        if v.strip()
+    ]
+    return reductions, first, ok
+
+
+def _parse_concurrent(lines: List[str], start: int, end: int) -> Optional[ParallelLoop]:
+    header = lines[start]
+    open_idx = _re_concurrent.match(header).end() - 1
+    close = matching_paren(header, open_idx)
+    if close < 0:
+        return None
+    spec = _re_typed.sub("", header[open_idx + 1 : close], count=1)
+    indices = []
+    masks = []
+    for part in split_top_level(spec):
+        im = _re_index.match(part)
+        if im:
+            bounds = [b.strip() for b in split_top_level(im.group(2), ":")]
+            if len(bounds) not in (2, 3):
+                return None
+            indices.append(
+                (im.group(1), bounds[0], bounds[1], bounds[2] if len(bounds) == 3 else None)
+            )
+        elif part.strip():
+            masks.append(part.strip())
+    if not indices or len(masks) > 1:
+        return None
+    reductions, first, ok = _clauses(header[close + 1 :])
+    return ParallelLoop(
+        lines[start : end + 1],
+        indices,
+        lines[start + 1 : end],
+        masks[0] if masks else None,
+        reductions,
+        first,
+        ok,
+    )
+
+
+def _parse_omp(lines: List[str], start: int) -> Optional[Tuple[ParallelLoop, int]]:
+    m = _re_omp_parallel_do.match(lines[start])
+    hm = _re_do_header.match(lines[start + 1]) if start + 1 < len(lines) else None
+    if not hm:
+        return None
+    end = find_end_do(lines, start + 1)
+    bounds = [b.strip() for b in split_top_level(hm.group(2))]
+    if end is None or len(bounds) not in (2, 3):
+        return None
+    stop = end + 1
+    if stop < len(lines) and _re_omp_end_parallel_do.match(lines[stop]):
+        stop += 1
+    reductions, first, ok = _clauses(m.group(1))
+    index = (hm.group(1), bounds[0], bounds[1], bounds[2] if len(bounds) == 3 else None)
+    loop = ParallelLoop(
+        lines[start:stop], [index], lines[start + 2 : end], None, reductions, first, ok,
+        body_offset=2,
+    )
+    return loop, stop
+
+
+def find_parallel_loops(lines: List[str]) -> List[Union[str, ParallelLoop]]:
+    out: List[Union[str, ParallelLoop]] = []
+    i = 0
+    while i < len(lines):
+        if _re_omp_parallel_do.match(lines[i]):
+            found = _parse_omp(lines, i)
+            if found is not None:
+                out.append(found[0])
+                i = found[1]
+                continue
+        elif _re_concurrent.match(lines[i]):
+            end = find_end_do(lines, i)
+            loop = _parse_concurrent(lines, i, end) if end is not None else None
+            if loop is not None:
+                out.append(loop)
+                i = end + 1
+                continue
+            raise NotImplementedError(f"Unsupported DO CONCURRENT header: {lines[i].strip()}")
+        out.append(lines[i])
+        i += 1
+    return out
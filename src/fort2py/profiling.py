@@ -0,0 +1,266 @@
+from __future__ import annotations
+import contextlib
+import cProfile
+import os
+import pstats
+import signal
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .sourcemap import SourceMap
+
+
+# Per-case profiles of the Python side of verification, annotated with Fortran lines.
+# The case runs twice: once under cProfile (time per generated routine) and a SIGPROF line
+# sampler (time per generated line; NumPy work counts against the line that called it), then
+# under tracemalloc (allocation sites, snapshotted as the traced total reaches new highs),
+# which would otherwise slow allocation-heavy lines several times over and skew the timings.
+# Only frames in the generated tree count; everything else is attributed to the innermost
+# generated frame that called it.
+
+SAMPLE_INTERVAL = 0.001
+DEFAULT_TOP = 10
+# Traceback depth kept by tracemalloc, enough to get from inside NumPy back to generated code
+TRACE_FRAMES = 8
+SNAPSHOT_STEP = 1 << 20
+
+
+@dataclass
+class Hotspot:
+    python: str  # "module.py:12" or "module.py:step"
+    fortran: Optional[str]  # "file.f90:34"
+    seconds: float
+    share: float  # of the case's profiled time
+    calls: int = 0  # routines only
+    bytes: int = 0  # allocation sites only
+
+
+@dataclass
+class CaseProfile:
+    seconds: float
+    peak_bytes: int
+    samples: int
+    routines: List[Hotspot] = field(default_factory=list)
+    lines: List[Hotspot] = field(default_factory=list)
+    allocations: List[Hotspot] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class _Tree:
+    # Generated modules under one directory, with their source maps
+    def __init__(self, root: Path, maps: Dict[str, SourceMap]):
+        self.root = str(root.resolve()) + os.sep
+        self.maps = maps
+        self._paths: Dict[str, str] = {}
+
+    def path(self, filename: str) -> str:
+        # Code objects keep the path the module was imported by, which may be relative
+        p = self._paths.get(filename)
+        if p is None:
+            p = self._paths[filename] = os.path.realpath(filename)
+        return p
+
+    def owns(self, filename: str) -> bool:
+        return self.path(filename).startswith(self.root)
+
+    def label(self, filename: str, where) -> str:
+        return f"{Path(filename).name}:{where}"
+
+    def fortran(self, filename: str, lineno: int) -> Optional[str]:
+        m = self.maps.get(self.path(filename))
+        return m.location(lineno) if m is not None else None
+
+
+class _Sampler:
+    """
+    Every `interval` seconds of CPU time (main thread only: SIGPROF handlers run there),
+    counts the generated line being executed, or with snapshots=True takes a tracemalloc
+    snapshot if the traced total has grown by a tenth (and at least SNAPSHOT_STEP bytes)
+    since the last one, so the allocation sites reported are those alive near the peak.
+    """
+
+    def __init__(self, tree: _Tree, interval: float, snapshots: bool = False):
+        self.tree = tree
+        self.interval = interval
+        self.snapshots = snapshots
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self._snap_at = 0
+        self._busy = False
+
+    def _handler(self, signum, frame):
+        if self._busy:
+            # The timer fired again while a snapshot was being taken
+            return
+        self.samples += 1
+        if self.snapshots:
+            self._snapshot()
+            return
+        f = frame
+        while f is not None and not self.tree.owns(f.f_code.co_filename):
+            f = f.f_back
+        if f is not None and f.f_lineno is not None:
+            self.counts[(f.f_code.co_filename, f.f_lineno)] += 1
+
+    def _snapshot(self):
+        current = tracemalloc.get_traced_memory()[0]
+        if current > max(self._snap_at * 1.1, self._snap_at + SNAPSHOT_STEP):
+            self._busy = True
+            try:
+                self.snapshot = tracemalloc.take_snapshot()
+            finally:
+                self._busy = False
+            self._snap_at = current
+
+    def __enter__(self):
+        self._old = signal.signal(signal.SIGPROF, self._handler)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        return self
+
+    def __exit__(self, *exc):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self._old)
+
+
+def profile_call(
+    fn: Callable[[], object],
+    root: Path,
+    maps: Dict[str, SourceMap],
+    top: int = DEFAULT_TOP,
+    interval: float = SAMPLE_INTERVAL,
+) -> Tuple[object, CaseProfile]:
+    """
+    Run fn() under cProfile and the line sampler, then again under tracemalloc; return the
+    first result and the `top` routines, lines and allocation sites of the generated
+    modules under root. fn must be repeatable (PythonEntry.run resets module state).
+    """
+    tree = _Tree(root, maps)
+    # Signal handlers can only be installed from the main thread
+    sampling = (
+        hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    )
+    prof = cProfile.Profile()
+    sampler = _Sampler(tree, interval)
+    t0 = time.perf_counter()
+    with sampler if sampling else contextlib.nullcontext():
+        res = prof.runcall(fn)
+    seconds = time.perf_counter() - t0
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start(TRACE_FRAMES)
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    mem = _Sampler(tree, interval, snapshots=True)
+    try:
+        with mem if sampling else contextlib.nullcontext():
+            fn()
+        peak = tracemalloc.get_traced_memory()[1] - base
+        snap = mem.snapshot or tracemalloc.take_snapshot()
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    cp = CaseProfile(seconds, peak, sampler.samples)
+    cp.routines = _routines(prof, tree, seconds, top)
+    cp.lines = _lines(sampler, tree, seconds, top)
+    cp.allocations = _allocations(snap, tree, top)
+    return res, cp
+
+
+def _routines(prof: cProfile.Profile, tree: _Tree, seconds: float, top: int) -> List[Hotspot]:
+    # {(file, line, name): (cc, nc, tottime, cumtime, {caller: same})}
+    stats = pstats.Stats(prof).stats
+    rows = [(k, v) for k, v in stats.items() if tree.owns(k[0])]
+    # A routine's time is its own plus that of the library calls it makes (NumPy, intrinsics):
+    # each outside callee's cumulative time goes to its generated callers, less the time spent
+    # in generated code it called back (parallel_do running chunk functions inline)
+    own: Dict[Tuple, float] = {k: v[2] for k, v in rows}
+    for k, v in stats.items():
+        if tree.owns(k[0]) or k[0] == __file__:
+            continue
+        callers = {c: t[3] for c, t in v[4].items() if tree.owns(c[0])}
+        cum = sum(t[3] for t in v[4].values())
+        if not callers or not cum:
+            continue
+        back = sum(w[4][k][3] for kk, w in rows if k in w[4])
+        for c, t in callers.items():
+            own[c] += t - back * t / cum
+    rows.sort(key=lambda kv: own[kv[0]], reverse=True)
+    return [
+        Hotspot(
+            tree.label(k[0], k[2]),
+            tree.fortran(k[0], k[1]),
+            round(own[k], 6),
+            round(own[k] / seconds, 4) if seconds else 0.0,
+            calls=v[1],
+        )
+        for k, v in rows[:top]
+    ]
+
+
+def _lines(sampler: _Sampler, tree: _Tree, seconds: float, top: int) -> List[Hotspot]:
+    # Timer expirations that land while the interpreter is busy coalesce into one signal,
+    # so samples give shares of the run rather than counts of intervals
+    n = sampler.samples
+    return [
+        Hotspot(
+            tree.label(f, line), tree.fortran(f, line), round(seconds * c / n, 6), round(c / n, 4)
+        )
+        for (f, line), c in sampler.counts.most_common(top)
+    ]
+
+
+def _allocations(snap: tracemalloc.Snapshot, tree: _Tree, top: int) -> List[Hotspot]:
+    # Sites in generated code; an allocation made inside NumPy or fort2py counts at its
+    # generated caller
+    sizes: Counter = Counter()
+    for trace in snap.traces:
+        # Frames run from the oldest to the most recent
+        frame = next((fr for fr in reversed(trace.traceback) if tree.owns(fr.filename)), None)
+        if frame is not None:
+            sizes[(frame.filename, frame.lineno)] += trace.size
+    total = sum(sizes.values())
+    return [
+        Hotspot(
+            tree.label(f, line),
+            tree.fortran(f, line),
+            0.0,
+            round(b / total, 4) if total else 0.0,
+            bytes=b,
+        )
+        for (f, line), b in sizes.most_common(top)
+    ]
+
+
+def format_profile(name: str, cp: CaseProfile) -> str:
+    mib = 1024 * 1024
+    out = [
+        f"== {name}: {cp.seconds * 1e3:.1f} ms, peak traced {cp.peak_bytes / mib:.1f} MiB, "
+        f"{cp.samples} samples"
+    ]
+    sections = (
+        (
+            "routines (self time incl. NumPy calls)",
+            cp.routines,
+            lambda h: f"{h.seconds * 1e3:9.2f} ms {h.share:6.1%} {h.calls:7d}x",
+        ),
+        ("lines (sampled)", cp.lines, lambda h: f"{h.seconds * 1e3:9.2f} ms {h.share:6.1%}"),
+        (
+            "allocations near peak",
+            cp.allocations,
+            lambda h: f"{h.bytes / mib:9.2f} MiB {h.share:6.1%}",
+        ),
+    )
+    for title, rows, fmt in sections:
+        if rows:
+            out.append(f"  {title}:")
+            out.extend(f"    {fmt(h)}  {h.python:28s} {h.fortran or '-'}" for h in rows)
+    return "\n".join(out)
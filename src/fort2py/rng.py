@@ -0,0 +1,122 @@
+from __future__ import annotations
+import contextlib
+import threading
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+
+# RNG runtime behind RANDOM_NUMBER / RANDOM_SEED.
+# Streams come from one SeedSequence per (seed, stream index), so stream k is the same
+# no matter how many threads or processes exist; parallel code binds one stream per
+# chunk with use_stream(chunk_index) and gets results independent of the worker count.
+
+DEFAULT_SEED = 123456789  # same default as utils.deterministic_rng
+
+
+class RandomStreams:
+    """
+    Family of independent np.random.Generator streams derived from one seed.
+    Usage: fam = RandomStreams(42); g = fam.stream(3)
+    Integer streams are kept and continue where they left off; tuple-keyed (region, chunk)
+    streams are used once, so they are created on request and not kept.
+    Pickling keeps only the seed: a process that unpickles a family starts every stream afresh.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = DEFAULT_SEED if seed is None else int(seed)
+        self._gens: Dict[Union[int, Tuple[int, ...]], np.random.Generator] = {}
+        self.regions = 0
+        self.lock = threading.Lock()
+
+    def stream(self, k: Union[int, Tuple[int, ...]] = 0) -> np.random.Generator:
+        # Integer keys are for user code; tuple keys (region, chunk) are used by fort2py.parallel
+        if isinstance(k, tuple):
+            return self._new(k)
+        g = self._gens.get(k)
+        if g is None:
+            with self.lock:
+                g = self._gens.get(k)
+                if g is None:
+                    g = self._gens[k] = self._new((k,))
+        return g
+
+    def _new(self, key: Tuple[int, ...]) -> np.random.Generator:
+        ss = np.random.SeedSequence(self.seed, spawn_key=key)
+        return np.random.Generator(np.random.PCG64(ss))
+
+    def next_region(self) -> int:
+        # Parallel regions are numbered in program order, so their chunk streams never repeat
+        with self.lock:
+            self.regions += 1
+            return self.regions
+
+    def __getstate__(self):
+        return {"seed": self.seed}
+
+    def __setstate__(self, state):
+        self.__init__(state["seed"])
+
+
+_family = RandomStreams()
+_local = threading.local()
+
+
+def seed_streams(seed: Optional[int] = None) -> RandomStreams:
+    # RANDOM_SEED: replace the process-wide family; streams bound by use_stream are unaffected
+    global _family
+    _family = RandomStreams(seed)
+    return _family
+
+
+def streams() -> RandomStreams:
+    return _family
+
+
+class _Pending:
+    # A stream bound by use_stream that nothing has drawn from yet
+    __slots__ = ("family", "key")
+
+    def __init__(self, family: RandomStreams, key: Union[int, Tuple[int, ...]]):
+        self.family = family
+        self.key = key
+
+
+@contextlib.contextmanager
+def use_stream(
+    k: Union[int, Tuple[int, ...]], family: Optional[RandomStreams] = None
+) -> Iterator[None]:
+    # Bind stream k to the calling thread; RANDOM_NUMBER creates it on the first draw and
+    # then draws from it lock-free, so chunks that never draw cost no generator
+    prev = getattr(_local, "gen", None)
+    _local.gen = _Pending(family or _family, k)
+    try:
+        yield
+    finally:
+        _local.gen = prev
+
+
+def _fill(g: np.random.Generator, a: np.ndarray) -> np.ndarray:
+    # Values go to the elements in Fortran order whatever the memory layout, so a stream
+    # gives the same array for C- and F-ordered arguments
+    dtype = a.dtype if a.dtype.char in "fd" else np.float64
+    if dtype == a.dtype and a.flags.f_contiguous and a.flags.writeable:
+        # Memory order is Fortran element order: generated straight into the buffer
+        g.random(out=a, dtype=dtype)
+    else:
+        a[...] = g.random(size=a.shape[::-1], dtype=dtype).T
+    return a
+
+
+def random_number(a=None):
+    # Fill an array in place; for a scalar (or None) return a new value in [0, 1)
+    g = getattr(_local, "gen", None)
+    if g is not None:
+        if type(g) is _Pending:
+            g = _local.gen = g.family.stream(g.key)
+        return _fill(g, a) if isinstance(a, np.ndarray) else float(g.random())
+    # Unbound threads share stream 0 of the process-wide family, under its lock
+    fam = _family
+    g = fam.stream(0)
+    with fam.lock:
+        return _fill(g, a) if isinstance(a, np.ndarray) else float(g.random())
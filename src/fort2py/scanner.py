@@ -1,20 +1,183 @@
+from __future__ import annotations
+import fnmatch
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .utils import file_digest, write_text
 
 
 FORTRAN_EXTS = {".f90", ".f95"}
 FORTRAN_LEGACY_EXTS = {".f", ".for"}
+# Directory names never descended into, at any depth.
+SKIP_DIRS = {
+    ".git", ".hg", ".svn", ".tox", ".nox", ".venv", "venv", "__pycache__",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache", ".fort2py_cache", "node_modules", "build",
+}
+MANIFEST_NAME = ".fort2py_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def _excluded(rel: str, name: str, exclude: Sequence[str]) -> bool:
+    return any(fnmatch.fnmatch(rel, pat) or fnmatch.fnmatch(name, pat) for pat in exclude)
 
 
-def scan_fortran_files(root: Path, include_legacy: bool = False) -> List[Path]:
+def _excluded_entry(e: os.DirEntry, root: str, exclude: Sequence[str]) -> bool:
+    # The relative path is only built when there are patterns to match it against
+    rel = os.path.relpath(e.path, root).replace(os.sep, "/")
+    return _excluded(rel, e.name, exclude)
+
+
+def _walk_tree(top: str, root: str, exts: set, exclude: Sequence[str]) -> List[str]:
+    # Iterative os.scandir walk; DirEntry caches the d_type so no extra stat per entry.
+    found: List[str] = []
+    stack = [top]
+    while stack:
+        d = stack.pop()
+        try:
+            it = os.scandir(d)
+        except (PermissionError, FileNotFoundError):
+            continue
+        with it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    if e.name in SKIP_DIRS or (exclude and _excluded_entry(e, root, exclude)):
+                        continue
+                    stack.append(e.path)
+                elif os.path.splitext(e.name)[1].lower() in exts and e.is_file():
+                    if not (exclude and _excluded_entry(e, root, exclude)):
+                        found.append(e.path)
+    return found
+
+
+def scan_fortran_files(
+    root: Path,
+    include_legacy: bool = False,
+    exclude: Optional[Sequence[str]] = None,
+    jobs: Optional[int] = None,
+) -> List[Path]:
     if not root.exists():
         raise FileNotFoundError(f"Path not found: {root}")
     exts = set(FORTRAN_EXTS)
     if include_legacy:
         exts |= FORTRAN_LEGACY_EXTS
-    found: List[Path] = []
-    for p in root.rglob("*"):
-        if p.is_file() and p.suffix.lower() in exts:
-            found.append(p)
-    found.sort()
-    return found
+    exclude = list(exclude or [])
+    top = str(root)
+    # Split at the first level: files are collected here, subtrees are walked in parallel.
+    found: List[str] = []
+    subdirs: List[str] = []
+    with os.scandir(top) as it:
+        for e in it:
+            if e.is_dir(follow_symlinks=False):
+                if e.name not in SKIP_DIRS and not _excluded(e.name, e.name, exclude):
+                    subdirs.append(e.path)
+            elif os.path.splitext(e.name)[1].lower() in exts and e.is_file():
+                if not _excluded(e.name, e.name, exclude):
+                    found.append(e.path)
+    workers = jobs if jobs is not None else min(32, (os.cpu_count() or 1) + 4)
+    if workers > 1 and len(subdirs) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(lambda d: _walk_tree(d, top, exts, exclude), subdirs):
+                found.extend(part)
+    else:
+        for d in subdirs:
+            found.extend(_walk_tree(d, top, exts, exclude))
+    return sorted(Path(p) for p in found)
+
+
+@dataclass
+class ManifestEntry:
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+@dataclass
+class ScanDelta:
+    added: List[Path] = field(default_factory=list)
+    changed: List[Path] = field(default_factory=list)
+    removed: List[Path] = field(default_factory=list)
+    unchanged: List[Path] = field(default_factory=list)
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+class FileManifest:
+    """
+    On-disk record of (path, size, mtime, content hash) for scanned sources.
+    Usage: m = FileManifest.load(path, root); delta = m.update(files); m.save()
+    Files whose size and mtime are unchanged are not re-hashed.
+    """
+
+    def __init__(self, path: Path, root: Path, entries: Optional[Dict[str, ManifestEntry]] = None):
+        self.path = path
+        self.root = root
+        self.entries: Dict[str, ManifestEntry] = entries or {}
+
+    @staticmethod
+    def load(path: Path, root: Path) -> "FileManifest":
+        if not path.exists():
+            return FileManifest(path, root)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return FileManifest(path, root)
+        if data.get("version") != MANIFEST_VERSION:
+            return FileManifest(path, root)
+        entries = {k: ManifestEntry(*v) for k, v in data.get("files", {}).items()}
+        return FileManifest(path, root, entries)
+
+    def save(self):
+        data = {
+            "version": MANIFEST_VERSION,
+            "files": {k: [e.size, e.mtime_ns, e.digest] for k, e in sorted(self.entries.items())},
+        }
+        write_text(self.path, json.dumps(data, indent=0))
+
+    def key(self, p: Path) -> str:
+        return Path(os.path.relpath(p, self.root)).as_posix()
+
+    def digest_of(self, p: Path) -> Optional[str]:
+        e = self.entries.get(self.key(p))
+        return e.digest if e else None
+
+    def update(self, files: Iterable[Path], jobs: Optional[int] = None) -> ScanDelta:
+        delta = ScanDelta()
+        seen: Dict[str, ManifestEntry] = {}
+        to_hash: List[Tuple[Path, str, os.stat_result]] = []
+        for p in files:
+            k = self.key(p)
+            st = p.stat()
+            old = self.entries.get(k)
+            if old is not None and old.size == st.st_size and old.mtime_ns == st.st_mtime_ns:
+                seen[k] = old
+                delta.unchanged.append(p)
+            else:
+                to_hash.append((p, k, st))
+        workers = jobs if jobs is not None else min(32, (os.cpu_count() or 1) + 4)
+        if workers > 1 and len(to_hash) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                digests = list(pool.map(lambda t: file_digest(t[0]), to_hash))
+        else:
+            digests = [file_digest(p) for p, _, _ in to_hash]
+        for (p, k, st), dg in zip(to_hash, digests, strict=True):
+            old = self.entries.get(k)
+            seen[k] = ManifestEntry(st.st_size, st.st_mtime_ns, dg)
+            if old is None:
+                delta.added.append(p)
+            elif old.digest != dg:
+                delta.changed.append(p)
+            else:
+                # Touched but identical content
+                delta.unchanged.append(p)
+        delta.removed = sorted(self.root / k for k in self.entries if k not in seen)
+        delta.added.sort()
+        delta.changed.sort()
+        delta.unchanged.sort()
+        self.entries = seen
+        return delta
@@ -0,0 +1,70 @@
+from __future__ import annotations
+import json
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .utils import write_text
+
+
+# Python line -> Fortran line maps of generated modules, stored as <module>.py.map (JSON)
+# next to each module. Lines codegen adds itself (argument checks, returns) have no entry
+# and resolve to the nearest mapped line above them.
+
+MAP_SUFFIX = ".map"
+MAP_FORMAT = 1
+
+
+@dataclass
+class SourceMap:
+    python: Path
+    source: Optional[str]  # the Fortran file the module was generated from
+    lines: Dict[int, int] = field(default_factory=dict)  # 1-based Python line -> Fortran line
+
+    def __post_init__(self):
+        self._keys: List[int] = sorted(self.lines)
+
+    def lookup(self, lineno: int) -> Optional[int]:
+        i = bisect_right(self._keys, lineno) - 1
+        return self.lines[self._keys[i]] if i >= 0 else None
+
+    def location(self, lineno: int) -> Optional[str]:
+        # "file.f90:42", or None when the line precedes everything mapped
+        line = self.lookup(lineno)
+        return f"{self.source}:{line}" if line is not None and self.source else None
+
+    def write(self):
+        data = {
+            "format": MAP_FORMAT,
+            "source": self.source,
+            "lines": {str(k): v for k, v in sorted(self.lines.items())},
+        }
+        write_text(map_path(self.python), json.dumps(data, separators=(",", ":")) + "\n")
+
+    @staticmethod
+    def load(python: Path) -> Optional["SourceMap"]:
+        try:
+            data = json.loads(map_path(python).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("format") != MAP_FORMAT:
+            return None
+        return SourceMap(
+            python, data.get("source"), {int(k): int(v) for k, v in data.get("lines", {}).items()}
+        )
+
+
+def map_path(python: Path) -> Path:
+    return python.with_name(python.name + MAP_SUFFIX)
+
+
+def load_maps(root: Path) -> Dict[str, SourceMap]:
+    # Maps of every generated module under root, keyed by the module's resolved path
+    maps = {}
+    for p in root.glob(f"*.py{MAP_SUFFIX}"):
+        py = p.with_name(p.name[: -len(MAP_SUFFIX)]).resolve()
+        m = SourceMap.load(py)
+        if m is not None:
+            maps[str(py)] = m
+    return maps
@@ -0,0 +1,166 @@
+from __future__ import annotations
+import contextlib
+import contextvars
+import ctypes
+import os
+import sys
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Runtime thread-count control for translated code.
+# Generated packages run with FORT2PY_NUM_THREADS threads (default: CPU count); the
+# verification harness enters deterministic(), which runs BLAS and fort2py.parallel loops
+# single-threaded only for its duration. Limits are applied to the already-loaded BLAS
+# library, so they work after NumPy has been imported (environment variables do not).
+# threadpoolctl is used when installed; otherwise OpenBLAS/MKL are called through ctypes.
+
+try:
+    import threadpoolctl
+
+    HAVE_THREADPOOLCTL = True
+except ImportError:  # pragma: no cover - depends on environment
+    threadpoolctl = None
+    HAVE_THREADPOOLCTL = False
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+# (get, set) symbol pairs, tried in order against every loaded BLAS library
+_BLAS_SYMBOLS = (
+    ("scipy_openblas_get_num_threads64_", "scipy_openblas_set_num_threads64_"),
+    ("scipy_openblas_get_num_threads", "scipy_openblas_set_num_threads"),
+    ("openblas_get_num_threads64_", "openblas_set_num_threads64_"),
+    ("openblas_get_num_threads", "openblas_set_num_threads"),
+    ("MKL_Get_Max_Threads", "MKL_Set_Num_Threads"),
+)
+
+_limit: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "fort2py_threads", default=None
+)
+_blas_lock = threading.RLock()
+_blas_libs: Optional[List[Tuple[Callable, Callable]]] = None
+# Limits of the thread_limit scopes open in any thread, and how to undo the first one
+_blas_scopes: List[int] = []
+_blas_restore: Optional[Callable[[], None]] = None
+
+
+def default_threads() -> int:
+    env = os.environ.get("FORT2PY_NUM_THREADS")
+    return max(1, int(env)) if env else (os.cpu_count() or 1)
+
+
+def num_threads() -> int:
+    # Thread count in effect for the calling context (innermost thread_limit, else the default)
+    n = _limit.get()
+    return default_threads() if n is None else n
+
+
+def _loaded_blas() -> List[Tuple[Callable, Callable]]:
+    # Linux only: shared objects mapped into this process whose name mentions a BLAS
+    global _blas_libs
+    if _blas_libs is None:
+        import numpy  # noqa: F401 - loads NumPy's BLAS
+
+        found = []
+        paths = set()
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/maps", encoding="utf-8") as f:
+                for line in f:
+                    p = line.split()[-1]
+                    if p.endswith(".so") or ".so." in p:
+                        name = os.path.basename(p).lower()
+                        if "blas" in name or "mkl_rt" in name:
+                            paths.add(p)
+        for p in sorted(paths):
+            lib = ctypes.CDLL(p)  # already mapped: only takes a reference
+            for get, set_ in _BLAS_SYMBOLS:
+                if hasattr(lib, get) and hasattr(lib, set_):
+                    found.append((getattr(lib, get), getattr(lib, set_)))
+                    break
+        _blas_libs = found
+    return _blas_libs
+
+
+def blas_threads() -> Optional[int]:
+    # Current BLAS thread count, or None when no controllable BLAS is loaded
+    if HAVE_THREADPOOLCTL:
+        info = [
+            m["num_threads"] for m in threadpoolctl.threadpool_info() if m.get("user_api") == "blas"
+        ]
+        return min(info) if info else None
+    libs = _loaded_blas()
+    return min(get() for get, _ in libs) if libs else None
+
+
+def _set_blas(n: int) -> Callable[[], None]:
+    # Sets every BLAS to n threads; returns a function restoring the counts from before
+    if HAVE_THREADPOOLCTL:
+        return threadpoolctl.threadpool_limits(limits=n, user_api="blas").restore_original_limits
+    libs = _loaded_blas()
+    prev = [get() for get, _ in libs]
+    for _, set_ in libs:
+        set_(n)
+
+    def restore():
+        for (_, set_), p in zip(libs, prev, strict=True):
+            set_(p)
+
+    return restore
+
+
+@contextlib.contextmanager
+def _blas_limit(n: int) -> Iterator[None]:
+    # The BLAS thread count is process-wide while scopes are per thread: the open scopes
+    # of all threads share it at the smallest limit any of them asked for, and the count
+    # from before the first one is restored when the last one closes
+    global _blas_restore
+    with _blas_lock:
+        _blas_scopes.append(n)
+        if _blas_restore is None:
+            _blas_restore = _set_blas(n)
+        else:
+            _set_blas(min(_blas_scopes))
+    try:
+        yield
+    finally:
+        with _blas_lock:
+            _blas_scopes.remove(n)
+            if _blas_scopes:
+                _set_blas(min(_blas_scopes))
+            else:
+                restore, _blas_restore = _blas_restore, None
+                restore()
+
+
+@contextlib.contextmanager
+def thread_limit(n: Optional[int] = None) -> Iterator[int]:
+    """
+    Run the block with n threads for BLAS and for fort2py.parallel loops
+    (None: FORT2PY_NUM_THREADS or the CPU count). Yields the count in effect.
+    The loop count is scoped to the calling thread. BLAS has one process-wide count: while
+    scopes are open in several threads it is the smallest of their limits.
+    """
+    n = default_threads() if n is None else max(1, int(n))
+    token = _limit.set(n)
+    try:
+        with _blas_limit(n):
+            yield n
+    finally:
+        _limit.reset(token)
+
+
+def deterministic() -> contextlib.AbstractContextManager:
+    # Single-threaded scope used by the verification harness
+    return thread_limit(1)
+
+
+def deterministic_env(base: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    # Environment for child processes (e.g. OpenMP-enabled Fortran executables) pinned to one thread
+    env = dict(os.environ if base is None else base)
+    env.update({k: "1" for k in THREAD_ENV_VARS})
+    env["PYTHONHASHSEED"] = "0"
+    return env
@@ -0,0 +1,61 @@
+from __future__ import annotations
+import functools
+from typing import Callable, Optional
+
+import numpy as np
+
+# Runtime wrappers for translated ELEMENTAL functions.
+# `elemental` wraps a kernel whose statements already operate on whole arrays;
+# `elemental_ufunc` wraps a scalar-only body with np.frompyfunc. Both broadcast
+# their arguments, cast the result to the declared kind and accept out=.
+
+
+def _finish(res, dtype, out: Optional[np.ndarray], shape):
+    if out is not None:
+        np.copyto(out, np.broadcast_to(res, out.shape), casting="unsafe")
+        return out
+    res = np.asarray(res)
+    if res.shape != shape:
+        res = np.broadcast_to(res, shape)
+    res = res.astype(dtype, copy=False)
+    return res[()] if res.ndim == 0 else res
+
+
+def elemental(dtype, masked: bool = False) -> Callable:
+    # masked=True: IF branches are evaluated on every element and merged with
+    # np.where, so floating-point warnings from discarded lanes are silenced.
+    def deco(kernel: Callable) -> Callable:
+        @functools.wraps(kernel)
+        def call(*args, out: Optional[np.ndarray] = None):
+            arrs = [np.asarray(a) for a in args]
+            shape = np.broadcast_shapes(*(a.shape for a in arrs))
+            if masked:
+                with np.errstate(all="ignore"):
+                    res = kernel(*arrs)
+            else:
+                res = kernel(*arrs)
+            return _finish(res, dtype, out, shape)
+
+        call.kernel = kernel
+        return call
+
+    return deco
+
+
+def elemental_ufunc(dtype, nin: int) -> Callable:
+    # Fallback for bodies that cannot be expressed as array operations (runs per element).
+    def deco(scalar_fn: Callable) -> Callable:
+        uf = np.frompyfunc(scalar_fn, nin, 1)
+
+        @functools.wraps(scalar_fn)
+        def call(*args, out: Optional[np.ndarray] = None):
+            arrs = [np.asarray(a) for a in args]
+            shape = np.broadcast_shapes(*(a.shape for a in arrs))
+            if not shape:
+                return _finish(scalar_fn(*args), dtype, out, shape)
+            return _finish(uf(*arrs), dtype, out, shape)
+
+        call.kernel = scalar_fn
+        return call
+
+    return deco
@@ -1,23 +1,12 @@
 from __future__ import annotations
 import difflib
+import hashlib
 import json
-import os
 import subprocess
 from pathlib import Path
 from typing import Iterable, List, Optional
 
 
-def set_determinism_env():
-    # Pin BLAS/threads for determinism
-    os.environ.setdefault("OMP_NUM_THREADS", "1")
-    os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
-    os.environ.setdefault("MKL_NUM_THREADS", "1")
-    os.environ.setdefault("VECLIB_MAXIMUM_THREADS", "1")
-    os.environ.setdefault("NUMEXPR_NUM_THREADS", "1")
-    # Ensure Python hash seeds fixed for deterministic dict ordering between runs
-    os.environ.setdefault("PYTHONHASHSEED", "0")
-
-
 def run_cmd(cmd: List[str], cwd: Optional[Path] = None, timeout: Optional[int] = None) -> subprocess.CompletedProcess:
     return subprocess.run(cmd, cwd=str(cwd) if cwd else None, check=True, capture_output=True, text=True, timeout=timeout)
 
@@ -40,6 +29,14 @@ def write_text(p: Path, s: str):
     p.write_text(s, encoding="utf-8")
 
 
+def file_digest(p: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(p, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
 def deterministic_rng(seed: Optional[int] = None):
     import numpy as np
     s = 123456789 if seed is None else int(seed)
@@ -0,0 +1,365 @@
+from __future__ import annotations
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from .fortran_expr import (
+    NUMPY_ELEMENTAL,
+    identifiers,
+    python_ops,
+    rewrite_refs,
+    split_assignment,
+    split_top_level,
+    zero_based,
+)
+from .ir import VarDecl
+
+
+# Vectorization of DO loops into whole-array NumPy statements.
+# A loop nest is rewritten only when it can be shown to be free of loop-carried
+# dependences; everything else is left to the scalar loop translation.
+
+_re_do_header = re.compile(r"^\s*do\s+(\w+)\s*=\s*(.+)$", re.I)
+_re_do_open = re.compile(r"^\s*do\b", re.I)
+_re_end_do = re.compile(r"^\s*end\s*do\b", re.I)
+
+
+@dataclass
+class VectorizedLoop:
+    source: List[str]  # original DO ... END DO lines
+    python: List[str]  # replacement statements (unindented)
+
+
+class _NotVectorizable(Exception):
+    pass
+
+
+def find_end_do(lines: List[str], start: int) -> Optional[int]:
+    depth = 0
+    for k in range(start, len(lines)):
+        if _re_end_do.match(lines[k]):
+            depth -= 1
+            if depth == 0:
+                return k
+        elif _re_do_open.match(lines[k]):
+            depth += 1
+    return None
+
+
+_re_offset = re.compile(r"^(\w+)\s*([+-])\s*(\d+)$")
+
+
+class _Nest:
+    def __init__(
+        self,
+        loops: List[Tuple[str, str, str]],
+        arrays: Dict[str, VarDecl],
+        translate,
+        blocked: Set[str],
+        written: Set[str],
+    ):
+        self.vars = [v for v, _, _ in loops]
+        self.bounds = {v: (translate(lo), translate(hi)) for v, lo, hi in loops}
+        self.arrays = arrays
+        self.written = written
+        # Names whose value changes inside the loop and so cannot appear in bounds or subscripts
+        self.blocked = blocked | set(self.vars)
+        self.refs: List[Tuple[str, Tuple[str, ...]]] = []
+
+    def _slice(self, var: str, shift: int) -> str:
+        lo, hi = self.bounds[var]
+        if shift == 0:
+            return f"{zero_based(lo)}:{hi}"
+        sh = f" + {shift}" if shift > 0 else f" - {-shift}"
+        start = f"{lo}{sh} - 1" if not lo.isdigit() else str(int(lo) + shift - 1)
+        # Only out-of-bounds Fortran could make the start negative (and wrap in Python)
+        return f"{start}:{hi}{sh}"
+
+    def vec(self, expr: str, order: Optional[List[str]]) -> Tuple[str, List[str]]:
+        # Returns (numpy expression, loop-variable order of its array refs)
+        seen_order: List[Optional[List[str]]] = [order]
+
+        def fn(name: str, args: List[str]) -> str:
+            low = name.lower()
+            if low in self.arrays:
+                subs = tuple(a.strip().lower() for a in args)
+                used = []
+                py_subs = []
+                for s in subs:
+                    off = _re_offset.match(s)
+                    if s in self.vars:
+                        used.append(s)
+                        py_subs.append(self._slice(s, 0))
+                    elif off and off.group(1) in self.vars and low not in self.written:
+                        # Shifted read (stencil) of an array the loop does not write
+                        used.append(off.group(1))
+                        shift = int(off.group(3)) * (1 if off.group(2) == "+" else -1)
+                        py_subs.append(self._slice(off.group(1), shift))
+                    elif identifiers(s) & self.blocked or ":" in s:
+                        raise _NotVectorizable(f"subscript {s}")
+                    else:
+                        py_subs.append(zero_based(s))
+                if len(set(used)) != len(used):
+                    raise _NotVectorizable("loop variable repeated in subscripts")
+                if used:
+                    if seen_order[0] is None:
+                        seen_order[0] = used
+                    elif used != seen_order[0]:
+                        # Broadcasting or transposed access; shapes would not line up
+                        raise _NotVectorizable("inconsistent subscript order")
+                self.refs.append((low, subs))
+                return f"{name}[{', '.join(py_subs)}]"
+            if low in NUMPY_ELEMENTAL:
+                return f"{NUMPY_ELEMENTAL[low]}({', '.join(a.strip() for a in args)})"
+            raise _NotVectorizable(f"call to {name}")
+
+        out = rewrite_refs(expr, fn)
+        if identifiers(out) & set(self.vars):
+            raise _NotVectorizable("loop variable used as a value")
+        return python_ops(out), seen_order[0] or []
+
+
+def _reduction(name: str, rhs: str) -> Optional[Tuple[str, str]]:
+    # `s = s + e` / `s = s - e` / `s = e + s` -> (op, e)
+    m = re.match(rf"^\s*{re.escape(name)}\s*([+-])(.*)$", rhs, re.I)
+    if m:
+        term = m.group(2)
+        # `s - a - b` is (s - a) - b: after `-` the term must be a single additive operand
+        if m.group(1) == "-" and any(len(split_top_level(term, op)) > 1 for op in "+-"):
+            return None
+        return m.group(1), term
+    m = re.match(rf"^(.*)\+\s*{re.escape(name)}\s*$", rhs, re.I)
+    if m and split_top_level(m.group(1), "+")[-1].strip():
+        return "+", m.group(1)
+    return None
+
+
+def _nonempty(lo: str, hi: str) -> bool:
+    # Literal bounds with at least one iteration
+    return lo.isdigit() and hi.isdigit() and int(hi) >= int(lo)
+
+
+def _try_vectorize(
+    block: List[str], arrays: Dict[str, VarDecl], translate
+) -> Optional[VectorizedLoop]:
+    loops: List[Tuple[str, str, str]] = []
+    body = block
+    while True:
+        m = _re_do_header.match(body[0])
+        if not m:
+            return None
+        bounds = [b.strip() for b in split_top_level(m.group(2))]
+        if len(bounds) == 3 and bounds[2] == "1":
+            bounds = bounds[:2]
+        if len(bounds) != 2:
+            return None
+        loops.append((m.group(1).lower(), bounds[0], bounds[1]))
+        inner = body[1:-1]
+        # Perfect nest: the body is exactly one inner DO loop
+        if inner and _re_do_header.match(inner[0]) and find_end_do(inner, 0) == len(inner) - 1:
+            body = inner
+            continue
+        break
+    if not inner:
+        return None
+
+    stmts = []
+    for line in inner:
+        a = split_assignment(line)
+        if a is None:
+            return None
+        stmts.append(a)
+    written_arrays = {n.lower() for n, subs, _ in stmts if subs is not None}
+    written_scalars = {n.lower() for n, subs, _ in stmts if subs is None}
+    loop_vars = {v for v, _, _ in loops}
+    if (written_arrays | written_scalars) & loop_vars or written_arrays - set(arrays):
+        return None
+    for _, lo, hi in loops:
+        if (identifiers(lo) | identifiers(hi)) & (written_arrays | written_scalars | loop_vars):
+            return None
+
+    try:
+        nest = _Nest(loops, arrays, translate, written_scalars, written_arrays)
+        out: List[str] = []
+        reduced: Set[str] = set()
+        for name, subs, rhs in stmts:
+            low = name.lower()
+            if subs is not None:
+                lhs, order = nest.vec(f"{name}({','.join(subs)})", None)
+                if sorted(order) != sorted(nest.vars):
+                    raise _NotVectorizable("assignment does not cover the whole iteration space")
+                rhs_py, _ = nest.vec(rhs, order)
+                out.append(f"{lhs} = {rhs_py}")
+                continue
+            red = _reduction(name, rhs)
+            if red is None or low in reduced:
+                raise _NotVectorizable(f"scalar assignment to {name}")
+            op, term = red[0], red[1].strip()
+            # The accumulator may only appear as its own accumulator
+            others = (r for n, _, r in stmts if n.lower() != low)
+            if low in identifiers(term) or any(low in identifiers(r) for r in others):
+                raise _NotVectorizable(f"accumulator {name} is read elsewhere")
+            before = len(nest.refs)
+            term_py, order = nest.vec(term, None)
+            if sorted(order) != sorted(nest.vars):
+                raise _NotVectorizable("reduction term does not cover the iteration space")
+            factors = split_top_level(term.strip(), "*")
+            new_refs = nest.refs[before:]
+            if len(nest.vars) == 1 and len(factors) == 2 and len(new_refs) == 2:
+                a_py, _ = nest.vec(factors[0], order)
+                b_py, _ = nest.vec(factors[1], order)
+                if a_py.endswith("]") and b_py.endswith("]") and "(" not in a_py + b_py:
+                    out.append(f"{name} = {name} {op} np.dot({a_py}, {b_py})")
+                    reduced.add(low)
+                    continue
+            out.append(f"{name} = {name} {op} np.sum({term_py})")
+            reduced.add(low)
+    except _NotVectorizable:
+        return None
+
+    # Every reference to a written array must touch the same element in a given
+    # iteration; otherwise iterations could communicate through it.
+    for arr in written_arrays:
+        if len({subs for name, subs in nest.refs if name == arr}) != 1:
+            return None
+    # A runtime bound can make the nest zero-trip, where a slice end below its start would
+    # wrap around in Python: the statements only run when every range is non-empty
+    trips = [f"{hi} >= {lo}" for lo, hi in nest.bounds.values() if not _nonempty(lo, hi)]
+    if trips:
+        out = [f"if {' and '.join(trips)}:"] + [f"    {s}" for s in out]
+    # DO variables end with their Fortran exit value, the first value past the range;
+    # an inner one is only assigned when every loop around it ran
+    ran: List[str] = []
+    for v in nest.vars:
+        lo, hi = nest.bounds[v]
+        if ran:
+            out.append(f"if {' and '.join(ran)}:")
+            out.append(f"    {v} = max({lo}, {hi} + 1)")
+        else:
+            out.append(f"{v} = max({lo}, {hi} + 1)")
+        ran.append(f"{hi} >= {lo}")
+    return VectorizedLoop(source=list(block), python=out)
+
+
+def vectorize_loops(
+    lines: List[str], arrays: Dict[str, VarDecl], translate=lambda e: e
+) -> List[Union[str, VectorizedLoop]]:
+    # `arrays` maps lower-case names of declared arrays to their declarations;
+    # `translate` turns loop-bound expressions into Python text.
+    out: List[Union[str, VectorizedLoop]] = []
+    i = 0
+    while i < len(lines):
+        if _re_do_header.match(lines[i]):
+            end = find_end_do(lines, i)
+            if end is not None:
+                vec = _try_vectorize(lines[i : end + 1], arrays, translate)
+                if vec is not None:
+                    out.append(vec)
+                    i = end + 1
+                    continue
+        out.append(lines[i])
+        i += 1
+    return out
+
+
+# ELEMENTAL function bodies as whole-array kernels.
+# Straight-line assignments already work on arrays; IF chains are evaluated on
+# every element and merged with np.where (conditions are computed up front,
+# from the values before the IF, exactly as Fortran would see them).
+
+_re_if_then = re.compile(r"^\s*if\s*\((.*)\)\s*then\s*$", re.I)
+_re_else_if = re.compile(r"^\s*else\s*if\s*\((.*)\)\s*then\s*$", re.I)
+_re_else = re.compile(r"^\s*else\s*$", re.I)
+_re_end_if = re.compile(r"^\s*end\s*if\s*$", re.I)
+
+
+def _parse_kernel_block(lines: List[str], i: int, stop) -> Tuple[list, int]:
+    block: list = []
+    while i < len(lines):
+        line = lines[i]
+        if stop(line):
+            return block, i
+        m = _re_if_then.match(line)
+        if m:
+            branches = []
+            cond = m.group(1)
+            i += 1
+            while True:
+                body, i = _parse_kernel_block(
+                    lines,
+                    i,
+                    lambda s: bool(
+                        _re_else_if.match(s) or _re_else.match(s) or _re_end_if.match(s)
+                    ),
+                )
+                if i >= len(lines):
+                    raise _NotVectorizable("unterminated IF")
+                branches.append((cond, body))
+                nxt = lines[i]
+                i += 1
+                if _re_end_if.match(nxt):
+                    break
+                m2 = _re_else_if.match(nxt)
+                cond = m2.group(1) if m2 else None
+            block.append(("if", branches))
+            continue
+        a = split_assignment(line)
+        if a is None or a[1] is not None:
+            raise _NotVectorizable(f"statement {line.strip()}")
+        block.append(("assign", a[0], a[2]))
+        i += 1
+    return block, i
+
+
+def _assigned(block: list) -> List[str]:
+    names: List[str] = []
+    for st in block:
+        if st[0] == "assign":
+            if st[1] not in names:
+                names.append(st[1])
+        else:
+            for _, body in st[1]:
+                names.extend(n for n in _assigned(body) if n not in names)
+    return names
+
+
+def _emit_kernel(block: list, translate, out: List[str], counter: List[int]):
+    for st in block:
+        if st[0] == "assign":
+            out.append(f"{st[1]} = {translate(st[2])}")
+            continue
+        counter[0] += 1
+        k = counter[0]
+        branches = st[1]
+        names = _assigned([st])
+        conds = []
+        for b, (cond, _) in enumerate(branches):
+            if cond is not None:
+                out.append(f"_c{k}_{b} = {translate(cond)}")
+                conds.append(f"_c{k}_{b}")
+        for n in names:
+            out.append(f"_s{k}_{n} = {n}")
+        has_else = branches[-1][0] is None
+        for b, (_, body) in enumerate(branches):
+            _emit_kernel(body, translate, out, counter)
+            for n in names:
+                out.append(f"_b{k}_{b}_{n} = {n}")
+                out.append(f"{n} = _s{k}_{n}")
+        for n in names:
+            merged = f"_b{k}_{len(branches) - 1}_{n}" if has_else else f"_s{k}_{n}"
+            for b in reversed(range(len(conds))):
+                merged = f"np.where({conds[b]}, _b{k}_{b}_{n}, {merged})"
+            out.append(f"{n} = {merged}")
+
+
+def elemental_kernel_body(lines: List[str], translate) -> Optional[Tuple[List[str], bool]]:
+    # Returns (unindented statements, uses masking) or None when the body has
+    # statements other than scalar assignments and IF/ELSE IF/ELSE blocks.
+    try:
+        block, _ = _parse_kernel_block(lines, 0, lambda s: False)
+        out: List[str] = []
+        counter = [0]
+        _emit_kernel(block, translate, out, counter)
+    except (_NotVectorizable, NotImplementedError):
+        return None
+    return out, counter[0] > 0
@@ -0,0 +1,34 @@
+from __future__ import annotations
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+class Workspace:
+    """
+    Reusable scratch arrays for one generated routine.
+    Usage: a, b = _ws.acquire(); ...; _ws.release((a, b))
+    Every activation gets its own set, so recursive and concurrent calls never share buffers.
+    Generated routines release their set in a `finally`, so it is reused even after an exception.
+    """
+
+    __slots__ = ("specs", "_free", "allocations")
+
+    def __init__(self, *specs: Tuple[Tuple[int, ...], type]):
+        self.specs = specs
+        self._free: List[Tuple[np.ndarray, ...]] = []
+        self.allocations = 0
+
+    def acquire(self) -> Tuple[np.ndarray, ...]:
+        # list.pop/append are atomic, so threads can share a pool without a lock
+        try:
+            return self._free.pop()
+        except IndexError:
+            self.allocations += 1
+            return tuple(np.zeros(shape, dtype=dt, order="F") for shape, dt in self.specs)
+
+    def release(self, bufs: Sequence[np.ndarray]):
+        self._free.append(tuple(bufs))
+
+    def clear(self):
+        self._free.clear()
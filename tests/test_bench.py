@@ -0,0 +1,71 @@
+import json
+import stat
+import pytest
+from fort2py import bench
+from fort2py.bench import (
+    CaseBench, Timing, append_history, format_table, load_history, previous_run, regressions,
+    run_bench,
+)
+from fort2py.harness import SampleCase, VerificationConfig
+
+ENTRY = '''
+import numpy as np
+def main(n):
+    return " ".join(map(str, np.arange(n)))
+'''
+
+@pytest.fixture
+def cfg(tmp_path):
+    # A shell script stands in for the compiled Fortran program
+    exe = tmp_path / "prog"
+    exe.write_text('#!/bin/sh\nseq 0 $(($1 - 1))\n')
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    (tmp_path / "entry.py").write_text(ENTRY)
+    cases = [SampleCase(f"n{n}", exe_args=[str(n)], inputs={"n": n}) for n in (10, 1000)]
+    return VerificationConfig(
+        fortran_exe=str(exe), python_entry_module="entry", python_entry_function="main", cases=cases
+    )
+
+def _bench(name, fort_s, py_s):
+    return CaseBench(name, Timing(fort_s, fort_s, 1024), Timing(py_s, py_s, 2048))
+
+def test_timing_stats():
+    t = Timing.from_samples([0.3, 0.1, 0.2, 0.4, 10.0], 512)
+    assert t.median_s == 0.3 and 0.4 < t.p95_s < 10.0 and t.peak_rss_kb == 512
+    assert _bench("a", 0.01, 0.05).slowdown == pytest.approx(5.0)
+
+def test_run_bench(tmp_path, cfg):
+    results = run_bench(tmp_path, cfg, repeat=3, warmup=0)
+    assert [r.name for r in results] == ["n10", "n1000"]
+    for r in results:
+        assert 0 < r.fortran.median_s <= r.fortran.p95_s
+        assert 0 < r.python.median_s <= r.python.p95_s
+        assert r.fortran.peak_rss_kb > 0 and r.python.peak_rss_kb > 0
+
+def test_needs_posix_timing(tmp_path, cfg, monkeypatch):
+    monkeypatch.setattr(bench, "resource", None)
+    with pytest.raises(RuntimeError, match="POSIX platform"):
+        run_bench(tmp_path, cfg)
+
+def test_failing_exe_raises(tmp_path, cfg):
+    cfg.cases = [SampleCase("bad", exe_args=["x"], inputs={"n": 1})]
+    (tmp_path / "prog").write_text("#!/bin/sh\nexit 3\n")
+    with pytest.raises(RuntimeError, match="status 3"):
+        run_bench(tmp_path, cfg, repeat=1, warmup=0)
+
+def test_history_and_regressions(tmp_path):
+    hist = tmp_path / "h.json"
+    assert load_history(hist) == []
+    append_history(hist, [_bench("a", 0.01, 0.05)], label="numpy", repeat=3)
+    append_history(hist, [_bench("a", 0.01, 0.50)], label="fast", repeat=3)
+    runs = json.loads(hist.read_text())["runs"]
+    assert [r["label"] for r in runs] == ["numpy", "fast"]
+    assert runs[0]["cases"]["a"]["slowdown"] == 5.0 and runs[0]["fort2py"]
+    base = previous_run(load_history(hist), "numpy")
+    assert base == runs[0]
+    assert previous_run(runs, "numba") is None
+    now = [_bench("a", 0.01, 0.08), _bench("new", 0.01, 0.02)]
+    assert regressions(now, base, 1.5) == [("a", pytest.approx(1.6))]
+    assert regressions(now, base, 2.0) == []
+    table = format_table(now, base)
+    assert "vs last" in table and "1.60x" in table
@@ -0,0 +1,58 @@
+import pytest
+from fort2py.codegen_python import generate_module
+from fort2py.fortran_parser import parse_sources
+from fort2py.semantics import Semantics
+from fort2py.types import Ref
+
+SRC = """module st
+contains
+subroutine step(dt, t, e)
+  real(kind=8), intent(in) :: dt
+  real(kind=8), intent(inout) :: t
+  real(kind=8), intent(out) :: e
+  t = t + dt
+  e = 2*t
+end subroutine step
+subroutine drive(n, t)
+  integer, intent(in) :: n
+  real(kind=8), intent(out) :: t
+  real(kind=8) :: e
+  integer :: i
+  t = 0.0d0
+  do i = 1, n
+    call step(0.5d0, t, e)
+  end do
+end subroutine drive
+end module st
+"""
+
+def _module(tmp_path, **kw):
+    src = tmp_path / "st.f90"
+    src.write_text(SRC)
+    ir = parse_sources([src])
+    Semantics(ir).analyze()
+    code = generate_module(ir.modules["st"], **kw)
+    ns = {}
+    exec(code, ns)
+    return code, ns
+
+def test_ref_convention_writes_back(tmp_path):
+    _, ns = _module(tmp_path)
+    t, e = Ref(1.0), Ref(0.0)
+    ns["step"](0.5, t, e)
+    assert (t.v, e.v) == (1.5, 3.0)
+    out = Ref(0.0)
+    ns["drive"](4, out)
+    assert out.v == 2.0
+    with pytest.raises(AssertionError):
+        ns["step"](0.5, 1.0, 0.0)
+
+def test_tuple_convention_returns_scalars(tmp_path):
+    code, ns = _module(tmp_path, convention="tuple", checks=False)
+    assert "Ref(" not in code.split("# Module")[1] and "assert" not in code
+    assert ns["step"](0.5, 1.0) == (1.5, 3.0)
+    assert ns["drive"](4) == 2.0
+
+def test_unknown_convention(tmp_path):
+    with pytest.raises(ValueError):
+        _module(tmp_path, convention="bogus")
@@ -0,0 +1,74 @@
+import io
+import numpy as np
+import pytest
+from fort2py.compare import ArraySpec, Tolerance, compare_arrays, compare_outputs, open_array
+
+FORT = ("  step      energy\n"
+        "     1  1.0000000000000000D+00\n"
+        "     2  2.5000000000000000E-01\n"
+        "  ok 1.234-310\n")
+
+@pytest.mark.parametrize("chunk", [1, 3, 7, 1 << 20])
+def test_formatting_differences_are_not_mismatches(chunk):
+    py = "step energy\n1 1.0\n2 0.25\nok 1.234e-310"
+    assert compare_outputs(FORT, py, chunk_size=chunk) is None
+
+@pytest.mark.parametrize("chunk", [2, 5, 1 << 20])
+def test_first_mismatch_location(chunk):
+    py = "step energy\n1 1.0\n2 0.2500001\nok 1.234e-310"
+    m = compare_outputs(FORT, io.BytesIO(py.encode()), chunk_size=chunk)
+    assert (m.token, m.line, m.column) == (5, 3, 9)
+    assert m.expected == "2.5000000000000000E-01" and m.actual == "0.2500001"
+    assert compare_outputs(FORT, py, Tolerance(rtol=1e-6), chunk_size=chunk) is None
+
+def test_tolerances_and_text():
+    assert compare_outputs("1.0", "1.0000000000000002", Tolerance(ulps=1)) is None
+    assert compare_outputs("1.0", "1.0000000000000004", Tolerance(ulps=1)) is not None
+    assert compare_outputs("100.0", "100.5", Tolerance(atol=0.5)) is None
+    assert compare_outputs("-0.0 NaN", "0.0 NaN") is None
+    # gfortran prints NaN, Python and NumPy nan; both are the same value
+    assert compare_outputs("1.0 NaN -Infinity", "1.0 nan -inf", Tolerance(atol=1)) is None
+    assert compare_outputs("1.0D0 NaN", "1.0 nan") is None
+    assert compare_outputs("NaN", "1.0").reason.startswith("|difference|")
+    assert compare_outputs("converged", "diverged", Tolerance(atol=1.0)).reason == "text differs"
+
+def test_length_mismatch(tmp_path):
+    p = tmp_path / "fort.out"
+    p.write_text("1 2\n3\n")
+    m = compare_outputs(p, "1 2")
+    assert (m.line, m.expected, m.actual, m.reason) == (2, "3", None, "actual output ended")
+    assert compare_outputs("1", "1 2").reason == "expected output ended"
+
+@pytest.mark.parametrize("chunk", [8, 64, 1 << 20])
+def test_binary_arrays_memmapped(tmp_path, chunk):
+    a = np.asfortranarray(np.arange(60.0).reshape(3, 4, 5))
+    b = a.copy(order="F")
+    b[1, 2, 3] += 1e-9
+    p, q = tmp_path / "f.bin", tmp_path / "p.bin"
+    # Single-record sequential file: 4-byte markers around the data
+    marker = np.int32(a.nbytes).tobytes()
+    p.write_bytes(marker + a.tobytes(order="F") + marker)
+    q.write_bytes(b.tobytes(order="F"))
+    spec = ArraySpec("f.bin", shape=(3, 4, 5), offset=4)
+    x = open_array(p, spec)
+    assert isinstance(x, np.memmap) and x.size == 60
+    y = open_array(q, ArraySpec("p.bin", shape=(3, 4, 5)))
+    m = compare_arrays(x, y, shape=spec.shape, name="u", chunk_size=chunk)
+    assert m.index == (2, 3, 4) and m.expected == "33.0"
+    assert str(m).startswith("u(2, 3, 4): expected 33.0")
+    assert compare_arrays(x, b.ravel(order="F"), Tolerance(atol=1e-8), chunk_size=chunk) is None
+
+def test_binary_array_tolerances_and_sizes(tmp_path):
+    f32 = np.float32([1, 2, np.nan])
+    assert compare_arrays(f32, np.nextafter(f32, np.float32(3)), Tolerance(ulps=1)) is None
+    ints = compare_arrays(np.arange(3, dtype=np.int32), np.int64([0, 1, 3]))
+    assert ints.reason == "values differ"
+    assert compare_arrays(np.complex128([1, 2j]), np.complex128([1, 2.1j])).index == (2,)
+    assert compare_arrays(np.zeros(3), np.zeros(2)).reason == "2 values, expected 3"
+    p = tmp_path / "short.bin"
+    p.write_bytes(np.zeros(3).tobytes())
+    with pytest.raises(ValueError, match="expected 32"):
+        open_array(p, ArraySpec("short.bin", shape=(4,)))
+    assert open_array(p, ArraySpec("short.bin")).size == 3
+    with pytest.raises(ValueError, match="order"):
+        ArraySpec.from_dict({"path": "x", "order": "K"})
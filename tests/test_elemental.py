@@ -0,0 +1,58 @@
+import numpy as np
+from fort2py.codegen_python import generate_module
+from fort2py.fortran_parser import parse_sources
+from fort2py.semantics import Semantics
+
+SRC = """module el
+contains
+elemental function ramp(x)
+  real(kind=8), intent(in) :: x
+  real(kind=8) :: ramp
+  if (x > 0.0d0) then
+    ramp = sqrt(x)
+  else if (x > -1.0d0) then
+    ramp = -x
+  else
+    ramp = 1.0d0
+  end if
+end function ramp
+elemental function sq(x)
+  real(kind=4), intent(in) :: x
+  real(kind=4) :: sq
+  sq = x*x
+end function sq
+elemental function cnt(n)
+  integer, intent(in) :: n
+  integer :: cnt
+  integer :: i
+  cnt = 0
+  do i = 1, n
+    cnt = cnt + 2
+  end do
+end function cnt
+end module el
+"""
+
+def _load(tmp_path):
+    src = tmp_path / "el.f90"
+    src.write_text(SRC)
+    ir = parse_sources([src])
+    Semantics(ir).analyze()
+    ns = {}
+    exec(generate_module(ir.modules["el"]), ns)
+    return ns
+
+def test_masked_kernel_matches_scalar(tmp_path):
+    ns = _load(tmp_path)
+    ramp = ns["ramp"]
+    x = np.array([-3.0, -0.5, 0.0, 4.0])
+    want = [ramp(v) for v in x]
+    assert np.allclose(ramp(x), want) and np.allclose(want, [1.0, 0.5, 0.0, 2.0])
+    assert ramp(4.0) == 2.0 and np.ndim(ramp(4.0)) == 0
+    out = np.empty(4)
+    assert ramp(x, out=out) is out and np.allclose(out, want)
+
+def test_declared_kind_and_fallback(tmp_path):
+    ns = _load(tmp_path)
+    assert ns["sq"](np.arange(3)).dtype == np.float32
+    assert ns["cnt"](np.array([0, 1, 3])).tolist() == [0, 2, 6]
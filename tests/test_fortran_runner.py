@@ -0,0 +1,117 @@
+import shutil
+import subprocess
+import pytest
+from fort2py.fortran_runner import (
+    FortranBuild, build_order, compile_and_run_project, find_sources, scan_units
+)
+
+MODS = {
+    "consts.f90": """module consts
+  implicit none
+  real(kind=8), parameter :: scale = 2.0d0
+end module consts
+""",
+    "sub/ops.f90": """module ops
+  use consts
+  implicit none
+contains
+  function twice(x) result(y)
+    real(kind=8), intent(in) :: x
+    real(kind=8) :: y
+    y = scale*x
+  end function twice
+end module ops
+""",
+    "main.f90": """program main
+  use, intrinsic :: iso_fortran_env, only: real64
+  use ops
+  implicit none
+  print *, twice(21.0d0)
+end program main
+""",
+}
+
+def _tree(tmp_path):
+    for name, text in MODS.items():
+        p = tmp_path / "src" / name
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(text)
+    return find_sources(tmp_path / "src")
+
+def test_use_graph_order(tmp_path):
+    order = [u.path.name for u in build_order(scan_units(_tree(tmp_path)))]
+    assert order.index("consts.f90") < order.index("ops.f90") < order.index("main.f90")
+    main = [u for u in scan_units(_tree(tmp_path)) if u.path.name == "main.f90"][0]
+    assert main.uses == ["ops"] and main.provides == []
+
+def test_cycle_is_reported(tmp_path):
+    (tmp_path / "a.f90").write_text("module a\nuse b\nend module a\n")
+    (tmp_path / "b.f90").write_text("module b\nuse a\nend module b\n")
+    with pytest.raises(RuntimeError, match="Circular"):
+        build_order(scan_units([tmp_path / "a.f90", tmp_path / "b.f90"]))
+
+@pytest.mark.skipif(shutil.which("gfortran") is None, reason="gfortran not installed")
+def test_incremental_build(tmp_path):
+    sources = _tree(tmp_path)
+    exe = tmp_path / "bin" / "prog"
+
+    def build(d):
+        return FortranBuild(sources, exe, tmp_path / d, cache_dir=tmp_path / "cache").build(jobs=2)
+
+    first = build("b1")
+    assert len(first.compiled) == 3 and first.linked
+    assert float(subprocess.run([str(exe)], capture_output=True, text=True).stdout) == 42.0
+    again = build("b1")
+    assert not again.compiled and not again.linked
+    # A fresh build directory is served entirely from the shared cache
+    fresh = build("b2")
+    assert not fresh.compiled and len(fresh.cached) == 3
+    # A comment-only edit leaves consts.mod unchanged, so its users stay cached
+    (tmp_path / "src" / "consts.f90").write_text(MODS["consts.f90"] + "! note\n")
+    edited = build("b2")
+    assert [p.name for p in edited.compiled] == ["consts.f90"] and edited.linked
+
+def test_includes_are_scanned(tmp_path):
+    inc = tmp_path / "inc"
+    inc.mkdir()
+    (inc / "uses.h").write_text("use ops\n")
+    (tmp_path / "a.F90").write_text('program a\n#include "uses.h"\n  include "local.inc"\nend\n')
+    (tmp_path / "local.inc").write_text("  include 'uses.h'\n")
+    (a,) = scan_units([tmp_path / "a.F90"], [inc])
+    assert a.includes == [inc / "uses.h", tmp_path / "local.inc"] and a.uses == ["ops"]
+
+@pytest.mark.skipif(shutil.which("gfortran") is None, reason="gfortran not installed")
+def test_edited_include_recompiles(tmp_path):
+    # The include sits under -I, outside the source list; the cache must still see the edit
+    (tmp_path / "inc").mkdir()
+    header = tmp_path / "inc" / "n.inc"
+    header.write_text("integer, parameter :: n = 1\n")
+    src = tmp_path / "p.f90"
+    src.write_text("program p\n  implicit none\n  include 'n.inc'\n  print *, n\nend program p\n")
+    exe = tmp_path / "prog"
+
+    def run():
+        flags = ["-I", str(tmp_path / "inc")]
+        res = FortranBuild([src], exe, tmp_path / "b", flags, cache_dir=tmp_path / "cache").build()
+        out = subprocess.run([str(exe)], capture_output=True, text=True).stdout
+        return res, int(out)
+
+    assert run()[1] == 1 and not run()[0].compiled
+    header.write_text("integer, parameter :: n = 2\n")
+    res, n = run()
+    assert n == 2 and res.compiled == [src] and res.linked
+
+@pytest.mark.skipif(shutil.which("gfortran") is None, reason="gfortran not installed")
+def test_relative_flags(tmp_path, monkeypatch):
+    # gfortran runs in the build directory; relative -I paths must still mean what they say
+    src = tmp_path / "src"
+    (src / "inc").mkdir(parents=True)
+    (src / "inc" / "n.inc").write_text("integer, parameter :: n = 3\n")
+    (src / "p.f90").write_text("program p\n  include 'n.inc'\n  print *, n\nend program p\n")
+    monkeypatch.chdir(tmp_path)
+    exe = tmp_path / "prog"
+    FortranBuild([src / "p.f90"], exe, tmp_path / "b1", flags=["-Isrc/inc"]).build()
+    assert int(subprocess.run([str(exe)], capture_output=True, text=True).stdout) == 3
+    # compile_and_run_project keeps its flags relative to the source directory
+    compile_and_run_project(src, exe, extra_flags=["-I", "inc"], build_dir=tmp_path / "b2")
+    assert int(subprocess.run([str(exe)], capture_output=True, text=True).stdout) == 3
@@ -0,0 +1,68 @@
+import stat
+from fort2py.golden import GoldenStore
+from fort2py.harness import SampleCase, VerificationConfig, run_verification
+
+def _setup(tmp_path):
+    # The stand-in program logs each run and prints its input file
+    exe = tmp_path / "prog"
+    exe.write_text(f"#!/bin/sh\necho run >> {tmp_path}/runs.log\ncat input.txt\n")
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / "input.txt").write_text("1 2 3\n")
+    (tmp_path / "entry.py").write_text("def main():\n    return '1 2 3'\n")
+    cfg = VerificationConfig(
+        fortran_exe=str(exe),
+        python_entry_module="entry",
+        python_entry_function="main",
+        cases=[SampleCase("a", cwd=str(work)), SampleCase("b", exe_args=["-v"], cwd=str(work))],
+    )
+    return exe, work, cfg
+
+def _runs(tmp_path):
+    return len((tmp_path / "runs.log").read_text().split())
+
+def test_second_verify_skips_fortran(tmp_path):
+    exe, work, cfg = _setup(tmp_path)
+    store = GoldenStore(tmp_path / "golden")
+    first = run_verification(tmp_path, cfg, golden=store)
+    second = run_verification(tmp_path, cfg, golden=store, jobs=2)
+    assert first.ok and second.ok and _runs(tmp_path) == 2
+    assert [c.fortran_cached for c in second.cases] == [True, True]
+    assert second.to_dict()["golden_hits"] == 2 and store.stats().entries == 2
+
+def test_changed_inputs_and_invalidation(tmp_path):
+    exe, work, cfg = _setup(tmp_path)
+    store = GoldenStore(tmp_path / "golden")
+    run_verification(tmp_path, cfg, golden=store)
+    # A changed input file keys a new entry; the Python side now disagrees
+    (work / "input.txt").write_text("1 2 4\n")
+    rep = run_verification(tmp_path, cfg, golden=store)
+    assert _runs(tmp_path) == 4 and [c.status for c in rep.cases] == ["mismatch", "mismatch"]
+    run_verification(tmp_path, cfg, golden=store, refresh_golden=True)
+    assert _runs(tmp_path) == 6
+    assert store.invalidate(exe) == 4 and store.stats().entries == 0
+
+def test_inherited_cwd_keys_on_its_files(tmp_path, monkeypatch):
+    # A case without cwd runs in ours; editing a file there must miss the store
+    exe, work, cfg = _setup(tmp_path)
+    monkeypatch.chdir(work)
+    for c in cfg.cases:
+        c.cwd = None
+    store = GoldenStore(tmp_path / "golden")
+    run_verification(tmp_path, cfg, golden=store)
+    (work / "input.txt").write_text("1 2 4\n")
+    rep = run_verification(tmp_path, cfg, golden=store)
+    assert _runs(tmp_path) == 4 and [c.status for c in rep.cases] == ["mismatch", "mismatch"]
+
+def test_inputs_in_subdirectories_key_the_entry(tmp_path):
+    exe, work, cfg = _setup(tmp_path)
+    (work / "data").mkdir()
+    (work / "data" / "mesh.dat").write_text("4\n")
+    # A store inside the tree changes on every run; it must not count as input
+    store = GoldenStore(work / "golden")
+    run_verification(tmp_path, cfg, golden=store)
+    assert all(c.fortran_cached for c in run_verification(tmp_path, cfg, golden=store).cases)
+    (work / "data" / "mesh.dat").write_text("5\n")
+    rep = run_verification(tmp_path, cfg, golden=store)
+    assert _runs(tmp_path) == 4 and not any(c.fortran_cached for c in rep.cases)
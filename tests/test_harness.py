@@ -0,0 +1,199 @@
+import json
+import stat
+import sys
+import pytest
+from fort2py import harness
+from fort2py.golden import GoldenStore
+from fort2py.harness import SampleCase, VerificationConfig, run_verification, verify_equivalence
+
+ENTRY = '''
+def main(n):
+    return "".join(f"{i}\\n" for i in range(n))
+'''
+
+def _config(exe, cases):
+    return VerificationConfig(
+        fortran_exe=str(exe), python_entry_module="entry", python_entry_function="main", cases=cases
+    )
+
+@pytest.fixture
+def cfg(tmp_path):
+    # A shell script stands in for the compiled Fortran program: it prints 0..$1-1
+    exe = tmp_path / "prog"
+    exe.write_text('#!/bin/sh\nseq 0 $(($1 - 1))\n')
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    (tmp_path / "entry.py").write_text(ENTRY)
+    cases = [SampleCase(f"n{n}", exe_args=[str(n)], inputs={"n": n}) for n in (3, 5, 2)]
+    # Python prints one line too many for this case
+    cases.append(SampleCase("bad", exe_args=["2"], inputs={"n": 3}))
+    cases.append(SampleCase("raises", exe_args=["1"], inputs={"m": 1}))
+    return _config(exe, cases)
+
+def test_report_order_and_status_independent_of_jobs(tmp_path, cfg):
+    serial = run_verification(tmp_path, cfg)
+    parallel = run_verification(tmp_path, cfg, jobs=3)
+    assert parallel.jobs == 3
+    statuses = [(c.name, c.status) for c in serial.cases]
+    assert statuses == [(c.name, c.status) for c in parallel.cases]
+    assert statuses == [
+        ("n3", "pass"), ("n5", "pass"), ("n2", "pass"), ("bad", "mismatch"), ("raises", "error")
+    ]
+    assert "TypeError" in parallel.cases[-1].error
+
+def test_json_report(tmp_path, cfg, capsys):
+    report = tmp_path / "out" / "report.json"
+    assert not verify_equivalence(tmp_path, tmp_path, cfg, jobs=2, report=report)
+    data = json.loads(report.read_text())
+    assert data["passed"] == 3 and data["failed"] == 2 and not data["ok"]
+    assert [c["name"] for c in data["cases"]] == ["n3", "n5", "n2", "bad", "raises"]
+    assert all(c["fortran_s"] >= 0 and c["fortran_returncode"] == 0 for c in data["cases"])
+    assert "[Mismatch] case=bad" in capsys.readouterr().err
+
+STATEFUL = '''
+import os
+import numpy as np
+from fort2py.intrinsics import random_number
+with open(os.path.join(os.path.dirname(__file__), "imports.log"), "a") as f:
+    f.write(f"{os.getpid()}\\\\n")
+_save_acc = np.zeros(3, order="F")
+calls = 0
+
+def main(n):
+    global calls
+    calls += 1
+    _save_acc[:] += n
+    return f"{calls} {_save_acc.tolist()} {random_number():.12f}\\\\n"
+'''
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_warm_workers_isolate_cases(tmp_path, jobs):
+    (tmp_path / "entry.py").write_text(STATEFUL)
+    exe = tmp_path / "prog"
+    exe.write_text("#!/bin/sh\necho\n")
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    cases = [SampleCase(f"c{i}", inputs={"n": 2}) for i in range(6)]
+    cfg = _config(exe, cases)
+    rep = run_verification(tmp_path, cfg, jobs=jobs)
+    # Every case starts from the freshly imported state and the same RNG seed
+    assert len({c.python_out for c in rep.cases}) == 1
+    assert rep.cases[0].python_out.startswith("1 [2.0, 2.0, 2.0] ")
+    assert len((tmp_path / "imports.log").read_text().split()) <= jobs
+
+def test_numeric_tolerance(tmp_path):
+    exe = tmp_path / "prog"
+    exe.write_text("#!/bin/sh\necho ' x = 3.1415927E+00'\n")
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    (tmp_path / "entry.py").write_text("def main():\n    return 'x = 3.141592653589793'\n")
+    cases = [SampleCase("strict"), SampleCase("loose", tolerance={"rtol": 1e-7})]
+    cfg = _config(exe, cases)
+    rep = run_verification(tmp_path, cfg)
+    assert [c.status for c in rep.cases] == ["mismatch", "pass"]
+    assert rep.cases[0].mismatch.startswith("line 1, column 6 (token 2)")
+
+BINARY_PROG = '''#!{python}
+import sys
+import numpy as np
+n = int(sys.argv[1])
+np.asfortranarray(np.arange(n * 3, dtype=np.float64).reshape(n, 3)).T.tofile("field.bin")
+print("done")
+'''
+
+BINARY_ENTRY = '''
+import numpy as np
+def main(n, mode, bump=0.0):
+    a = np.asfortranarray(np.arange(n * 3, dtype=np.float64).reshape(n, 3))
+    a[-1, -1] += bump
+    if mode == "file":
+        a.T.tofile("py_field.bin")
+        return "done"
+    return {"stdout": "done", "field": a}
+'''
+
+def test_binary_output_files(tmp_path, monkeypatch):
+    exe = tmp_path / "prog"
+    exe.write_text(BINARY_PROG.format(python=sys.executable))
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    (tmp_path / "entry.py").write_text(BINARY_ENTRY)
+    # The Python entry writes relative to the process cwd; cases use cwd "." here
+    monkeypatch.chdir(tmp_path)
+    # The program writes the transpose in C order, i.e. the (4, 3) array in Fortran order
+    spec = {"name": "field", "path": "field.bin", "dtype": "float64", "shape": [4, 3], "order": "F"}
+    written = dict(spec, python="py_field.bin")
+    cases = [
+        SampleCase("returned", exe_args=["4"], inputs={"n": 4, "mode": "array"},
+                   output_files=[spec]),
+        SampleCase("written", exe_args=["4"], inputs={"n": 4, "mode": "file"},
+                   output_files=[written]),
+        SampleCase("off", exe_args=["4"], inputs={"n": 4, "mode": "array", "bump": 1e-3},
+                   output_files=[spec]),
+        SampleCase("close", exe_args=["4"], inputs={"n": 4, "mode": "array", "bump": 1e-9},
+                   output_files=[spec], tolerance={"atol": 1e-6}),
+        SampleCase("missing", exe_args=["4"], inputs={"n": 4, "mode": "file"},
+                   output_files=[spec]),
+    ]
+    cfg = _config(exe, cases)
+    rep = run_verification(tmp_path, cfg)
+    assert [c.status for c in rep.cases] == ["pass", "pass", "mismatch", "pass", "mismatch"]
+    assert rep.cases[2].mismatch.startswith("field(4, 3): expected 11.0, got 11.001")
+    assert "neither written nor returned" in rep.cases[4].mismatch
+
+    # Golden entries carry a copy of the file, so a cached run compares the same data
+    store = GoldenStore(tmp_path / "golden")
+    run_verification(tmp_path, cfg, golden=store)
+    (tmp_path / "field.bin").unlink()
+    again = run_verification(tmp_path, cfg, golden=store)
+    assert [c.status for c in again.cases] == [c.status for c in rep.cases]
+    assert all(c.fortran_cached for c in again.cases) and not (tmp_path / "field.bin").exists()
+
+def test_output_files_do_not_key_golden_entries(tmp_path, monkeypatch):
+    # Files the case writes sit in its cwd but are not inputs: the rerun must hit the store
+    exe = tmp_path / "prog"
+    exe.write_text(BINARY_PROG.format(python=sys.executable))
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    (tmp_path / "entry.py").write_text(BINARY_ENTRY)
+    monkeypatch.chdir(tmp_path)
+    spec = {"path": "field.bin", "python": "py_field.bin", "shape": [4, 3], "order": "F"}
+    case = SampleCase("written", exe_args=["4"], inputs={"n": 4, "mode": "file"},
+                      cwd=str(tmp_path), output_files=[spec])
+    store = GoldenStore(tmp_path / "golden")
+    first = run_verification(tmp_path, _config(exe, [case]), golden=store)
+    second = run_verification(tmp_path, _config(exe, [case]), golden=store)
+    assert first.ok and second.ok and second.cases[0].fortran_cached
+
+def test_cases_sharing_output_files_run_in_turn(tmp_path, monkeypatch):
+    exe = tmp_path / "prog"
+    exe.write_text(BINARY_PROG.format(python=sys.executable))
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    (tmp_path / "entry.py").write_text(BINARY_ENTRY)
+    monkeypatch.chdir(tmp_path)
+    spec = {"name": "field", "path": "field.bin", "dtype": "float64", "order": "F"}
+    cases = [
+        SampleCase(f"n{n}", exe_args=[str(n)], inputs={"n": n, "mode": "array"},
+                   output_files=[dict(spec, shape=[n, 3])])
+        for n in range(2, 8)
+    ]
+    cases.append(SampleCase("plain", exe_args=["2"], inputs={"n": 2, "mode": "array"}))
+    assert harness._lanes(cases) == [[0, 1, 2, 3, 4, 5], [6]]
+    cfg = _config(exe, cases)
+    rep = run_verification(tmp_path, cfg, jobs=3)
+    assert [c.status for c in rep.cases[:-1]] == ["pass"] * 6
+
+def test_python_timeout(tmp_path, cfg, monkeypatch):
+    # The entry swallows ordinary exceptions; the timeout still ends it
+    (tmp_path / "entry.py").write_text(
+        "import time\ndef main(n):\n    try:\n        time.sleep(30)\n"
+        "    except Exception:\n        pass\n"
+    )
+    monkeypatch.setattr(harness, "PYTHON_TIMEOUT", 0.2)
+    cfg.cases = cfg.cases[:1]
+    (case,) = run_verification(tmp_path, cfg).cases
+    assert case.status == "timeout" and case.error == "python: timeout after 0.2s"
+
+def test_profile_attached_to_cases(tmp_path, cfg):
+    for jobs in (1, 2):
+        report = run_verification(tmp_path, cfg, jobs=jobs, profile=2)
+        by_name = {c.name: c for c in report.cases}
+        assert by_name["n3"].profile is not None and by_name["n3"].status == "pass"
+        assert by_name["raises"].profile is None
+        assert "profile" in report.to_dict()["cases"][0]
+    assert "profile" not in run_verification(tmp_path, cfg).to_dict()["cases"][0]
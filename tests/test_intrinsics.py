@@ -1,5 +1,7 @@
 import numpy as np
-from fort2py.intrinsics import lbound, ubound, size, shape, matmul, dot_product, merge, sign, random_seed, random_number
+from fort2py.intrinsics import (
+    lbound, ubound, size, matmul, merge, sign, random_seed, random_number, transpose, nint, modulo,
+)
 
 def test_bounds():
     a = np.zeros((3,4), order="F")
@@ -16,3 +18,28 @@ def test_random():
     c = np.empty((2,2))
     random_number(c)
     assert np.allclose(b, c)
+
+def test_out_and_fortran_order():
+    a = np.asfortranarray(np.arange(12.0).reshape(3, 4))
+    b = np.asfortranarray(np.arange(20.0).reshape(4, 5))
+    c = matmul(a, b)
+    assert c.flags.f_contiguous and np.allclose(c, a @ b)
+    out = np.zeros((3, 5), order="F")
+    assert matmul(a, b, out=out) is out and np.allclose(out, a @ b)
+    t = transpose(a)
+    assert t.flags.f_contiguous and (t == a.T).all()
+    m = merge(a, -1.0, a > 5)
+    assert m.flags.f_contiguous and (m == np.where(a > 5, a, -1.0)).all()
+    k = np.zeros(3, dtype=np.int32)
+    assert nint(np.array([0.4, 1.6, -2.6]), out=k) is k and k.tolist() == [0, 2, -3]
+    assert modulo(-7, 3) == 2 and modulo(np.array([-7.5, 7.5]), 2.0).tolist() == [0.5, 1.5]
+
+def test_scalar_and_array_paths_agree():
+    x = np.array([2.5, -2.5, 0.49999999999999994, -0.5, 1.4])
+    assert nint(x).tolist() == [nint(float(v)) for v in x] == [3, -3, 0, -1, 1]
+    assert sign(3, -1) == -3 and isinstance(sign(3, -1), int) and sign(-3, 0) == 3
+    assert sign(2.0, -0.0) == -2.0
+    assert sign(np.array([1, -2, 3]), np.array([-1, 1, 0])).tolist() == [-1, 2, 3]
+    assert merge(1.0, 2.0, False) == 2.0 and modulo(-7.5, 2.0) == 0.5
+    b = lbound(np.zeros((2, 3)))
+    assert b.tolist() == [1, 1] and not b.flags.writeable
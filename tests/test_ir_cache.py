@@ -0,0 +1,43 @@
+from pathlib import Path
+from fort2py.fortran_parser import parse_sources
+from fort2py.ir import CompactBody
+from fort2py.ir_cache import IRCache
+
+SRC = (
+    "module m\ncontains\nsubroutine s(n)\n"
+    "  integer, intent(in) :: n\nend subroutine\nend module m\n"
+)
+
+def test_cache_hit_skips_parse(tmp_path: Path):
+    src = tmp_path / "m.f90"
+    src.write_text(SRC)
+    cache = IRCache(tmp_path / "cache")
+    first = parse_sources([src], cache=cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+    moved = tmp_path / "other.f90"
+    moved.write_text(SRC)
+    second = parse_sources([moved], cache=cache)
+    assert cache.hits == 1
+    assert second.modules["m"].subroutines[0].name == first.modules["m"].subroutines[0].name
+    assert second.modules["m"].path == moved
+
+def test_prune_lru(tmp_path: Path):
+    cache = IRCache(tmp_path / "cache")
+    for i in range(3):
+        p = tmp_path / f"m{i}.f90"
+        p.write_text(SRC.replace("module m", f"module m{i}"))
+        parse_sources([p], cache=cache)
+    assert cache.stats().entries == 3
+    assert cache.prune(max_bytes=0) == 3
+    assert cache.stats().entries == 0
+
+def test_compact_and_list_bodies_cached_separately(tmp_path: Path):
+    src = tmp_path / "m.f90"
+    src.write_text(SRC.replace("end subroutine", "  print *, n\nend subroutine"))
+    cache = IRCache(tmp_path / "cache")
+    parse_sources([src], cache=cache)
+    compact = parse_sources([src], cache=cache, compact=True)
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert isinstance(compact.modules["m"].subroutines[0].body, CompactBody)
+    plain = parse_sources([src], cache=cache)
+    assert cache.hits == 1 and isinstance(plain.modules["m"].subroutines[0].body, list)
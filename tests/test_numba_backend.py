@@ -0,0 +1,49 @@
+import importlib.util
+from pathlib import Path
+import numpy as np
+from fort2py.fortran_parser import parse_sources
+from fort2py.semantics import Semantics
+from fort2py.codegen_python import generate_module
+from fort2py.numba_backend import plan_numba
+
+SRC = """module k
+contains
+subroutine prefix(n, x)
+  integer, intent(in) :: n
+  real(kind=8), intent(inout) :: x(8)
+  integer :: i
+  do i = 2, n
+    x(i) = x(i) + x(i-1)
+  end do
+end subroutine prefix
+subroutine bump(n)
+  integer, intent(inout) :: n
+  n = n + 1
+end subroutine bump
+subroutine half(x)
+  real(kind=2), intent(inout) :: x(4)
+  x(1) = x(1) / 2
+end subroutine half
+end module k
+"""
+
+def test_numba_plan_and_fallback(tmp_path: Path):
+    src = tmp_path / "k.f90"
+    src.write_text(SRC)
+    ir = parse_sources([src])
+    Semantics(ir).analyze()
+    mod = ir.modules["k"]
+    plan = plan_numba(mod)
+    assert plan["prefix"] is None
+    assert "Ref" in plan["bump"]
+    assert "float16" in plan["half"]
+    code = generate_module(mod, backend="numba")
+    assert code.count("@njit(cache=True)") == 1
+    out = tmp_path / "k_gen.py"
+    out.write_text(code)
+    spec = importlib.util.spec_from_file_location("k_gen", str(out))
+    m = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(m)
+    x = np.ones(8)
+    m.prefix(8, x)
+    assert x[-1] == 8.0
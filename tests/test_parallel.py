@@ -0,0 +1,149 @@
+import importlib
+import numpy as np
+import pytest
+from fort2py import parallel, rng
+from fort2py.codegen_python import generate_module
+from fort2py.fortran_parser import parse_sources
+from fort2py.intrinsics import random_number
+from fort2py.semantics import Semantics
+
+SRC = """module par
+contains
+subroutine axpy(n, a, x, y, s)
+  integer, intent(in) :: n
+  real(kind=8), intent(in) :: a
+  real(kind=8), intent(in) :: x(1000)
+  real(kind=8), intent(inout) :: y(1000)
+  real(kind=8), intent(out) :: s
+  real(kind=8) :: t
+  integer :: i
+  s = 0.0d0
+  do concurrent (i = 1:n)
+    y(i) = y(i) + a*x(i)
+  end do
+  !$omp parallel do private(t) &
+  !$omp& reduction(+:s)
+  do i = 1, n
+    t = x(i)*y(i)
+    if (t > 0.0d0) then
+      s = s + t
+    end if
+  end do
+  !$omp end parallel do
+end subroutine axpy
+subroutine grid(c)
+  real(kind=8), intent(inout) :: c(20, 30)
+  integer :: i, j
+  do concurrent (i = 1:20, j = 1:30, c(i, j) > 0.5d0)
+    c(i, j) = 2*c(i, j)
+  end do
+end subroutine grid
+subroutine last(n, x, k)
+  integer, intent(in) :: n
+  real(kind=8), intent(inout) :: x(100)
+  integer, intent(out) :: k
+  integer :: i
+  !$omp parallel do lastprivate(k)
+  do i = 1, n
+    x(i) = 2*x(i)
+    k = i
+  end do
+end subroutine last
+end module par
+"""
+
+@pytest.fixture
+def par(tmp_path, monkeypatch):
+    # Written to disk and imported by name so process-mode chunks can find the loop bodies
+    src = tmp_path / "par.f90"
+    src.write_text(SRC)
+    ir = parse_sources([src])
+    Semantics(ir).analyze()
+    code = generate_module(ir.modules["par"], convention="tuple")
+    (tmp_path / "par_gen.py").write_text(code)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield code, importlib.import_module("par_gen")
+    parallel.shutdown()
+    monkeypatch.delitem(importlib.sys.modules, "par_gen")
+
+def test_chunk_bounds():
+    assert parallel.chunk_bounds(1, 10, 1, 4) == [(1, 2), (3, 5), (6, 7), (8, 10)]
+    assert parallel.chunk_bounds(1, 3, 1, 16) == [(1, 1), (2, 2), (3, 3)]
+    assert parallel.chunk_bounds(10, 1, -3, 2) == [(10, 7), (4, 1)]
+
+def test_reduction_independent_of_workers(monkeypatch):
+    def part(lo, hi, x):
+        return (float(np.sum(x[lo - 1:hi])),)
+    x = np.random.default_rng(3).random(1001)
+    results = set()
+    for w in ("1", "3"):
+        monkeypatch.setenv("FORT2PY_NUM_THREADS", w)
+        results.add(parallel.parallel_do(part, 1, 1001, 1, (x,), ops=("+",), init=(0.0,)))
+    assert len(results) == 1 and np.isclose(results.pop()[0], x.sum())
+
+def test_chunk_streams_created_on_draw_and_not_kept(monkeypatch):
+    def noop(lo, hi):
+        pass
+
+    def draw(lo, hi, out):
+        random_number(out[lo - 1:hi])
+
+    fam = rng.seed_streams(5)
+    for _ in range(200):
+        parallel.parallel_do(noop, 1, 64, 1, ())
+    out = {}
+    for w in ("1", "3"):
+        monkeypatch.setenv("FORT2PY_NUM_THREADS", w)
+        rng.seed_streams(5)
+        out[w] = np.zeros(64)
+        parallel.parallel_do(draw, 1, 64, 1, (out[w],))
+    assert np.array_equal(out["1"], out["3"]) and len(np.unique(out["1"])) == 64
+    assert not fam._gens and not rng.streams()._gens
+
+@pytest.mark.parametrize("workers", ["1", "4"])
+def test_generated_loops_match_sequential(par, monkeypatch, workers):
+    code, mod = par
+    assert "parallel_do(_axpy_par" in code and "'process'" in code
+    monkeypatch.setenv("FORT2PY_NUM_THREADS", workers)
+    x = np.linspace(-1.0, 1.0, 1000)
+    y = np.ones(1000)
+    s = mod.axpy(1000, 2.0, x, y)
+    ref = np.ones(1000) + 2.0 * x
+    assert np.array_equal(y, ref)
+    assert np.isclose(s, np.sum(np.where(x * ref > 0, x * ref, 0.0)))
+    c = np.asfortranarray(np.random.default_rng(0).random((20, 30)))
+    c0 = c.copy()
+    mod.grid(c)
+    assert np.array_equal(c, np.where(c0 > 0.5, 2 * c0, c0))
+
+def test_lastprivate_stays_sequential(par):
+    code, mod = par
+    assert "_last_par" not in code
+    x = np.ones(100)
+    assert mod.last(100, x) == 100 and (x == 2).all()
+
+STATEFUL = """
+SCALE = 1.0
+
+def body(lo, hi, x):
+    for i in range(lo, hi + 1):
+        x[i - 1] = SCALE * i
+"""
+
+def test_process_workers_see_current_globals(tmp_path, monkeypatch):
+    # A pool kept from the first loop would still see SCALE = 1.0 in the second
+    (tmp_path / "stateful_gen.py").write_text(STATEFUL)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    mod = importlib.import_module("stateful_gen")
+    monkeypatch.setenv("FORT2PY_NUM_THREADS", "2")
+    for scale in (1.0, 3.0):
+        mod.SCALE = scale
+        x = np.zeros(40)
+        parallel.parallel_do(mod.body, 1, 40, 1, (x,), mode="process")
+        assert np.array_equal(x, scale * np.arange(1, 41))
+    # Without fork the chunks run on threads
+    monkeypatch.setattr(parallel.multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+    x = np.zeros(40)
+    parallel.parallel_do(mod.body, 1, 40, 1, (x,), mode="process")
+    assert np.array_equal(x, 3.0 * np.arange(1, 41))
+    monkeypatch.delitem(importlib.sys.modules, "stateful_gen")
@@ -5,7 +5,7 @@ from fort2py.codegen_python import generate_module
 
 def test_parse_generate_basic(tmp_path: Path):
     src = tmp_path / "m.f90"
-    src.write_text(\"\"\"module m
+    src.write_text("""module m
 implicit none
 contains
 subroutine add_one(n)
@@ -13,10 +13,77 @@ subroutine add_one(n)
   n = n + 1
 end subroutine
 end module m
-\"\"\")
+""")
     ir = parse_sources([src])
     Semantics(ir).analyze()
     mod = next(iter(ir.modules.values()))
     py = generate_module(mod)
     assert "def add_one" in py
     assert "Ref" in py  # because inout scalar requires Ref
+
+def test_classify_line_single_dispatch():
+    from fort2py.fortran_parser import classify_line
+    assert classify_line("  end subroutine foo")[0] == "end"
+    assert classify_line("pure elemental function f(x)")[1].group(3) == "f"
+    assert classify_line("integer(kind=4), intent(in) :: n")[0] == "decl"
+    assert classify_line("real_x = 1.0")[0] == "exec"
+    assert classify_line("end = 2")[0] == "exec"
+
+def test_iter_statements_joins_and_splits(tmp_path: Path):
+    from fort2py.fortran_parser import iter_statements
+    src = tmp_path / "c.f90"
+    src.write_text("a = b + &  ! first\n\n    & c\nx = 1; s = 'p;q'\ncall foo(ab&\n  &cd)\n")
+    for use_mmap in (False, True):
+        stmts = list(iter_statements(src, use_mmap=use_mmap))
+        assert stmts == [(1, "a = b +  c"), (4, "x = 1"), (4, " s = 'p;q'"), (5, "call foo(abcd)")]
+
+def test_parallel_parse_matches_serial(tmp_path: Path):
+    srcs = []
+    for i in range(5):
+        p = tmp_path / f"m{i}.f90"
+        p.write_text(
+            f"module m{i}\ncontains\nsubroutine s{i}(n)\n"
+            f"  integer, intent(in) :: n\nend subroutine\nend module m{i}\n"
+        )
+        srcs.append(p)
+    serial = parse_sources(srcs)
+    parallel = parse_sources(srcs, jobs=2)
+    assert list(parallel.modules) == list(serial.modules)
+    assert [generate_module(m) for m in parallel.modules.values()] == [
+        generate_module(m) for m in serial.modules.values()
+    ]
+
+def test_compact_ir_matches_list_bodies(tmp_path: Path):
+    import pickle
+    from fort2py.ir import CompactBody
+    src = tmp_path / "k.f90"
+    src.write_text(
+        "module k\ncontains\nsubroutine s(n)\n  integer, intent(inout) :: n\n"
+        "  n = n + 1\n  n = n * 2\nend subroutine\nend module k\n"
+    )
+    plain = parse_sources([src])
+    compact = parse_sources([src], compact=True)
+    body = compact.modules["k"].subroutines[0].body
+    assert isinstance(body, CompactBody) and body[-1] == "  n = n * 2"
+    assert body == plain.modules["k"].subroutines[0].body
+    assert pickle.loads(pickle.dumps(compact)) == compact
+    Semantics(plain).analyze()
+    Semantics(compact).analyze()
+    assert generate_module(compact.modules["k"]) == generate_module(plain.modules["k"])
+
+def test_intrinsic_assignment_writes_out(tmp_path):
+    src = tmp_path / "mm.f90"
+    src.write_text("""module mm
+contains
+subroutine prod(a, b, c)
+  real(kind=8), intent(in) :: a(2, 2), b(2, 2)
+  real(kind=8), intent(inout) :: c(2, 2)
+  c = matmul(a, b)
+  c = matmul(c, b)
+end subroutine prod
+end module mm
+""")
+    ir = parse_sources([src])
+    Semantics(ir).analyze()
+    py = generate_module(ir.modules["mm"])
+    assert "matmul(a, b, out=c)" in py and "c[...] = matmul(c, b)" in py
@@ -0,0 +1,54 @@
+from fort2py.converter import convert_project
+from fort2py.harness import PythonEntry, SampleCase
+from fort2py.profiling import format_profile
+
+SRC = """module hot
+  implicit none
+contains
+  subroutine work(n, a, s)
+    integer, intent(in) :: n
+    real(kind=8), intent(inout) :: a(200)
+    real(kind=8), intent(out) :: s
+    integer :: i
+    s = 0.0d0
+    do i = 1, n
+      if (a(i) > 0.5d0) then
+        s = s + sqrt(a(i))
+      end if
+    end do
+  end subroutine work
+end module hot
+"""
+
+ENTRY = '''
+import numpy as np
+from fort2py.types import Ref
+from hot import work
+
+def main(iters):
+    a = np.linspace(0.0, 1.0, 200)
+    s = Ref(0.0)
+    for _ in range(iters):
+        work(200, a, s)
+    return f"{s.v:.6f}"
+'''
+
+def test_hotspots_carry_fortran_lines(tmp_path):
+    src = tmp_path / "hot.f90"
+    src.write_text(SRC)
+    out = tmp_path / "out"
+    convert_project([src], out)
+    (out / "prof_entry.py").write_text(ENTRY)
+    entry = PythonEntry(out / "prof_entry.py", "main")
+    (text, _), cp = entry.profile(SampleCase("c", inputs={"iters": 300}), top=3)
+    # The profiled run still produces the case's output
+    assert text == entry.run(SampleCase("c", inputs={"iters": 300}))[0]
+    assert cp.seconds > 0 and len(cp.routines) <= 3
+    work = next(h for h in cp.routines if h.python == "hot.py:work")
+    assert work.fortran == f"{src.resolve()}:4" and work.calls == 300
+    # The loop dominates; whichever of its lines were sampled map into the DO loop
+    assert cp.samples > 0 and cp.lines
+    assert all(h.fortran is not None for h in cp.lines if h.python.startswith("hot.py"))
+    assert any(int(h.fortran.rsplit(":", 1)[1]) in range(10, 14) for h in cp.lines if h.fortran)
+    assert "hot.py:work" in format_profile("c", cp)
+    assert cp.to_dict()["routines"][0]["python"]
@@ -0,0 +1,49 @@
+import os
+from pathlib import Path
+from fort2py.scanner import scan_fortran_files, FileManifest
+
+def _touch(p: Path, text: str = "module m\nend module m\n"):
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(text)
+
+def test_scan_prunes_and_excludes(tmp_path: Path):
+    _touch(tmp_path / "a.f90")
+    _touch(tmp_path / "src" / "b.F90")
+    _touch(tmp_path / "src" / "old.f")
+    _touch(tmp_path / ".git" / "c.f90")
+    _touch(tmp_path / "build" / "d.f90")
+    _touch(tmp_path / "vendor" / "e.f90")
+    files = scan_fortran_files(tmp_path, exclude=["vendor"])
+    assert [f.relative_to(tmp_path).as_posix() for f in files] == ["a.f90", "src/b.F90"]
+    assert len(scan_fortran_files(tmp_path, include_legacy=True, jobs=1)) == 4
+
+def test_scan_without_patterns_builds_no_relative_paths(tmp_path: Path, monkeypatch):
+    _touch(tmp_path / "src" / "deep" / "a.f90")
+    _touch(tmp_path / "src" / "deep" / "skip.f90")
+
+    def relpath(*args):
+        raise AssertionError("relpath called")
+
+    monkeypatch.setattr(os.path, "relpath", relpath)
+    assert len(scan_fortran_files(tmp_path, jobs=1)) == 2
+    monkeypatch.undo()
+    files = scan_fortran_files(tmp_path, exclude=["src/deep/skip.f90"], jobs=1)
+    assert [f.name for f in files] == ["a.f90"]
+
+def test_manifest_delta(tmp_path: Path):
+    _touch(tmp_path / "a.f90")
+    _touch(tmp_path / "b.f90")
+    mpath = tmp_path / "manifest.json"
+    m = FileManifest.load(mpath, tmp_path)
+    delta = m.update(scan_fortran_files(tmp_path))
+    assert len(delta.added) == 2 and delta.dirty
+    m.save()
+    _touch(tmp_path / "a.f90", "module m\n\nend module m\n")
+    (tmp_path / "b.f90").unlink()
+    _touch(tmp_path / "c.f90")
+    m = FileManifest.load(mpath, tmp_path)
+    delta = m.update(scan_fortran_files(tmp_path))
+    assert [p.name for p in delta.changed] == ["a.f90"]
+    assert [p.name for p in delta.removed] == ["b.f90"]
+    assert [p.name for p in delta.added] == ["c.f90"]
+    assert not m.update(scan_fortran_files(tmp_path)).dirty
@@ -0,0 +1,58 @@
+from pathlib import Path
+from fort2py.converter import convert_project
+from fort2py.sourcemap import SourceMap, load_maps, map_path
+
+SRC = """module k
+  implicit none
+contains
+  subroutine step(n, a, s)
+    integer, intent(in) :: n
+    real(kind=8), intent(inout) :: a(10)
+    real(kind=8), intent(out) :: s
+    real(kind=8) :: tmp(10)
+    integer :: i
+    s = 0.0d0
+    do i = 1, n
+      tmp(i) = 2.0d0 * &
+               a(i)
+    end do
+    do i = 1, n
+      if (a(i) > 1.0d0) then
+        s = s + tmp(i)
+      end if
+    end do
+  end subroutine step
+end module k
+"""
+
+def _convert(tmp_path: Path):
+    src = tmp_path / "k.f90"
+    src.write_text(SRC)
+    out = tmp_path / "out"
+    convert_project([src], out)
+    return src, out / "k.py"
+
+def _line_of(lines, text):
+    return next(i for i, line in enumerate(lines, 1) if text in line)
+
+def test_map_points_at_fortran_lines(tmp_path):
+    src, py = _convert(tmp_path)
+    assert map_path(py).exists()
+    sm = SourceMap.load(py)
+    assert sm.source == str(src.resolve())
+    lines = py.read_text().splitlines()
+    assert sm.lookup(_line_of(lines, "def step(")) == 4
+    assert sm.lookup(_line_of(lines, "s = 0.0")) == 10
+    assert sm.lookup(_line_of(lines, "tmp[0:n] =")) == 11  # vectorised loop -> its DO line
+    assert sm.lookup(_line_of(lines, "if a[i - 1] > 1.0")) == 16
+    assert sm.lookup(_line_of(lines, "s = s + tmp")) == 17
+    assert sm.location(_line_of(lines, "s = s + tmp")) == f"{src.resolve()}:17"
+    # Lines before anything mapped have no location
+    assert sm.lookup(1) is None and sm.location(1) is None
+
+def test_load_maps_keys_resolved_paths(tmp_path):
+    _, py = _convert(tmp_path)
+    maps = load_maps(py.parent)
+    assert list(maps) == [str(py.resolve())]
+    map_path(py).write_text('{"format": 0}')
+    assert load_maps(py.parent) == {}
@@ -0,0 +1,64 @@
+import threading
+import numpy as np
+from fort2py import parallel, threads
+
+def test_scopes_nest_and_restore(monkeypatch):
+    monkeypatch.setenv("FORT2PY_NUM_THREADS", "3")
+    before = threads.blas_threads()
+    assert threads.num_threads() == parallel.num_workers() == 3
+    with threads.thread_limit(2) as n:
+        assert n == 2 and parallel.num_workers() == 2
+        with threads.deterministic():
+            assert parallel.num_workers() == 1
+            assert threads.blas_threads() in (None, 1)
+        assert threads.num_threads() == 2
+    assert threads.num_threads() == 3 and threads.blas_threads() == before
+
+def test_loop_count_is_per_thread():
+    # Only the fort2py.parallel count; BLAS has a single process-wide count
+    seen = []
+    with threads.deterministic():
+        t = threading.Thread(target=lambda: seen.append(threads.num_threads()))
+        t.start()
+        t.join()
+    assert seen == [threads.default_threads()]
+
+def test_deterministic_env_pins_children():
+    env = threads.deterministic_env({"PATH": "/bin", "OMP_NUM_THREADS": "8"})
+    assert env["PATH"] == "/bin" and all(env[k] == "1" for k in threads.THREAD_ENV_VARS)
+
+def test_matmul_same_result_in_both_modes():
+    a = np.asfortranarray(np.random.default_rng(1).random((64, 64)))
+    with threads.deterministic():
+        c1 = a @ a
+    with threads.thread_limit():
+        c2 = a @ a
+    assert np.allclose(c1, c2)
+
+def test_overlapping_scopes_share_blas(monkeypatch):
+    # A fake BLAS; scopes in two threads open and close out of order
+    blas = {"n": 8}
+    monkeypatch.setattr(threads, "HAVE_THREADPOOLCTL", False)
+    monkeypatch.setattr(threads, "_blas_libs", [(lambda: blas["n"], lambda k: blas.update(n=k))])
+    steps = [threading.Event() for _ in range(4)]
+    seen = []
+
+    def scope(n, enter, leave, done):
+        steps[enter].wait()
+        with threads.thread_limit(n):
+            seen.append(blas["n"])
+            steps[enter + 1].set()
+            steps[leave].wait()
+        seen.append(blas["n"])
+        if done is not None:
+            steps[done].set()
+
+    a = threading.Thread(target=scope, args=(1, 0, 2, 3))
+    b = threading.Thread(target=scope, args=(4, 1, 3, None))
+    a.start()
+    b.start()
+    steps[0].set()
+    # b opens while a holds 1 and must not raise it; a closes first, then b
+    b.join(5)
+    a.join(5)
+    assert seen == [1, 1, 4, 8] and blas["n"] == 8
@@ -0,0 +1,72 @@
+import numpy as np
+from fort2py.ir import VarDecl
+from fort2py.vectorize import VectorizedLoop, vectorize_loops
+
+ARRAYS = {n: VarDecl("real", 8, n, dims=(10,)) for n in ("x", "y")}
+ARRAYS["c"] = VarDecl("real", 8, "c", dims=(4, 5))
+
+def _vec(lines):
+    return vectorize_loops(lines, ARRAYS)
+
+def test_elementwise_and_reduction():
+    out = _vec(
+        ["do i = 1, n", "  y(i) = y(i) + a*x(i)", "end do"]
+        + ["do i = 1, n", "  s = s + x(i)*y(i)", "end do"]
+    )
+    assert [o.python[:2] for o in out] == [
+        ["if n >= 1:", "    y[0:n] = y[0:n] + a*x[0:n]"],
+        ["if n >= 1:", "    s = s + np.dot(x[0:n], y[0:n])"],
+    ]
+
+def test_nested_and_stencil():
+    (nest,) = _vec(["do j = 1, 5", "do i = 1, 4", "c(i, j) = 2*c(i, j)", "end do", "end do"])
+    assert nest.python[0] == "c[0:4, 0:5] = 2*c[0:4, 0:5]"
+    (st,) = _vec(["do i = 2, 9", "y(i) = x(i-1) + x(i+1)", "end do"])
+    x = np.arange(10.0)
+    y = np.zeros(10)
+    exec(st.python[0])
+    assert (y[1:9] == x[0:8] + x[2:10]).all()
+
+def test_dependences_fall_back_to_loop():
+    for body in (["x(i) = x(i-1) + 1"], ["s = x(i)", "y(i) = s"], ["y(i) = i"], ["y(i) = f(x(i))"]):
+        lines = ["do i = 2, n"] + body + ["end do"]
+        assert not any(isinstance(o, VectorizedLoop) for o in _vec(lines))
+
+def _run_vectorized(lines, **env):
+    (loop,) = _vec(lines)
+    assert isinstance(loop, VectorizedLoop)
+    exec("\n".join(loop.python), None, env)
+    return env
+
+def test_subtracted_sum_keeps_signs():
+    body = ["do i = 1, n", "  s = s - x(i) - y(i)", "end do"]
+    assert not any(isinstance(o, VectorizedLoop) for o in _vec(body))
+    body = ["do i = 1, n", "  s = s - (x(i) - y(i))", "end do"]
+    env = _run_vectorized(body, np=np, s=0.0, n=4, x=np.ones(10), y=np.full(10, 3.0))
+    assert env["s"] == 8.0
+
+def test_do_variables_get_exit_values():
+    arrays = {"x": np.ones(10), "y": np.zeros(10)}
+    env = _run_vectorized(["do i = 1, n", "  y(i) = x(i)", "end do"], n=4, **arrays)
+    assert env["i"] == 5
+    env = _run_vectorized(["do i = 3, n", "  y(i) = x(i)", "end do"], n=0, **arrays)
+    assert env["i"] == 3
+    nest = ["do j = 1, m", "do i = 1, 4", "c(i, j) = 0", "end do", "end do"]
+    env = _run_vectorized(nest, m=2, c=np.ones((4, 5)))
+    assert (env["j"], env["i"]) == (3, 5)
+    env = _run_vectorized(nest, m=0, i=7, c=np.ones((4, 5)))
+    assert (env["j"], env["i"]) == (1, 7)
+
+def test_zero_and_negative_trip_loops_do_nothing():
+    # x[0:n - 1] with n = 0 would wrap around and update all but the last element
+    for n in (1, 0, -3):
+        env = _run_vectorized(["do i = 1, n-1", "  y(i) = y(i) + a*x(i)", "end do"],
+                              n=n, a=2.0, x=np.ones(10), y=np.zeros(10))
+        assert not env["y"].any() and env["i"] == 1
+        env = _run_vectorized(["do i = 2, n", "  s = s + x(i-1)", "end do"],
+                              np=np, n=n, s=0.0, x=np.ones(10))
+        assert env["s"] == 0.0
+    (loop,) = _vec(["do i = 5, 1", "  y(i) = x(i)", "end do"])
+    env = {"x": np.ones(10), "y": np.zeros(10)}
+    exec("\n".join(loop.python), None, env)
+    assert not env["y"].any() and env["i"] == 5
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from fort2py.codegen_python import generate_module
+from fort2py.fortran_parser import parse_sources
+from fort2py.semantics import Semantics
+from fort2py.types import Ref
+from fort2py.workspace import Workspace
+
+SRC = """module ws
+contains
+subroutine accum(x, y)
+  real(kind=8), intent(in) :: x(8)
+  real(kind=8), intent(out) :: y(8)
+  real(kind=8) :: tmp(8), acc(8)
+  real(kind=8), save :: calls(8)
+  integer :: i
+  tmp = 2*x
+  do i = 1, 8
+    acc(i) = acc(i) + tmp(i)
+  end do
+  calls = calls + 1
+  y = acc + calls
+end subroutine accum
+recursive subroutine depth(n, total)
+  integer, intent(in) :: n
+  integer, intent(inout) :: total
+  integer :: mark(2)
+  mark(1) = n
+  if (n > 1) then
+    call depth(n - 1, total)
+  end if
+  total = total + mark(1)
+end subroutine depth
+function twice(x)
+  real(kind=8), intent(in) :: x(3)
+  real(kind=8) :: twice(3)
+  real(kind=8) :: tmp(3)
+  tmp = x + x
+  twice = tmp
+end function twice
+end module ws
+"""
+
+def _load(tmp_path, **kw):
+    src = tmp_path / "ws.f90"
+    src.write_text(SRC)
+    ir = parse_sources([src])
+    Semantics(ir).analyze()
+    ns = {}
+    exec(generate_module(ir.modules["ws"], **kw), ns)
+    return ns
+
+def test_pool_reuses_buffers():
+    ws = Workspace(((3,), np.float64))
+    (a,) = ws.acquire()
+    ws.release((a,))
+    assert ws.acquire()[0] is a and ws.allocations == 1
+
+def test_scratch_rezeroed_and_save_persists(tmp_path):
+    ns = _load(tmp_path)
+    x, y = np.ones(8), np.zeros(8)
+    ns["accum"](x, y)
+    assert (y == 3.0).all()
+    ns["accum"](x, y)
+    assert (y == 4.0).all()
+    assert ns["_ws_accum"].allocations == 1
+
+def test_recursive_calls_get_own_buffers(tmp_path):
+    ns = _load(tmp_path)
+    total = Ref(0)
+    ns["depth"](4, total)
+    assert total.v == 10 and ns["_ws_depth"].allocations == 4
+    plain = _load(tmp_path, workspace=False)
+    assert "_ws_depth" not in plain
+
+def test_array_result_not_pooled(tmp_path):
+    ns = _load(tmp_path)
+    a = ns["twice"](np.ones(3))
+    b = ns["twice"](np.full(3, 5.0))
+    assert a is not b
+    assert (a == 2.0).all() and (b == 10.0).all()
+
+def test_buffers_released_when_body_raises(tmp_path):
+    ns = _load(tmp_path)
+    with pytest.raises(ValueError):
+        ns["accum"](np.ones(3), np.zeros(8))
+    ns["accum"](np.ones(8), np.zeros(8))
+    assert ns["_ws_accum"].allocations == 1